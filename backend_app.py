@@ -4,11 +4,14 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
 import pandas as pd
+import numpy as np
 import io
 import os
 from datetime import datetime
 import logging
 
+from src.data_processing.dedup import FingerprintStore, row_fingerprints
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,146 @@ app.add_middleware(
 # In-memory storage for uploaded data
 uploaded_data_store = {}
 
+# Accepted rows per SME; the dashboard is computed over all of them so
+# re-uploaded overlapping statements are only counted once
+UPLOAD_DIR = os.environ.get('UPLOAD_DIR', os.path.join('data', 'uploads'))
+fingerprint_store = FingerprintStore(UPLOAD_DIR)
+uploaded_rows_store = {}
+# SMEs whose index has been checked against their saved rows in this process
+synced_sme_ids = set()
+
+# A row is identified by these columns alone, so a re-upload of the same
+# ledger with extra or renamed side columns is still recognised
+UPLOAD_KEY_COLUMNS = ['date', 'revenue', 'expenses']
+
+
+def _history_path(sme_id: int) -> str:
+    return os.path.join(UPLOAD_DIR, f"sme_{sme_id}_rows.pkl")
+
+
+def _load_history(sme_id: int, index):
+    """Accepted rows for an SME, read from disk on first use
+
+    The saved rows are authoritative: on first use in this process an index
+    that disagrees with them (a lost rows file, or a save interrupted between
+    the two files) is rebuilt from the rows. After that the index is kept
+    current by _save_history and not re-checked.
+    """
+    if sme_id not in synced_sme_ids:
+        if os.path.exists(_history_path(sme_id)):
+            uploaded_rows_store[sme_id] = pd.read_pickle(_history_path(sme_id))
+        history = uploaded_rows_store.get(sme_id)
+
+        if history is None:
+            fingerprints = np.array([], dtype='uint64')
+        else:
+            fingerprints = row_fingerprints(history, UPLOAD_KEY_COLUMNS)
+        if not index.matches(fingerprints):
+            logger.warning(f"Fingerprint index for SME {sme_id} out of sync with saved rows, rebuilding")
+            index.rebuild(fingerprints)
+        synced_sme_ids.add(sme_id)
+    return uploaded_rows_store.get(sme_id)
+
+
+def _save_history(sme_id: int, df: pd.DataFrame, index, fingerprints: np.ndarray):
+    """Save the accepted rows, then record their new fingerprints
+
+    Should the index write fail, the next _load_history rebuilds it from the
+    saved rows.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    tmp_path = f"{_history_path(sme_id)}.tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, _history_path(sme_id))
+    uploaded_rows_store[sme_id] = df
+    index.add(fingerprints)
+
+
+def _build_dashboard(df: pd.DataFrame) -> dict:
+    """Compute dashboard metrics from all accepted rows of an SME"""
+    if not df['date'].is_monotonic_increasing:
+        df = df.sort_values('date', kind='stable', ignore_index=True)
+    
+    # Calculate metrics
+    total_revenue = float(df['revenue'].sum())
+    total_expenses = float(df['expenses'].sum())
+    profit = total_revenue - total_expenses
+    margin = (profit / total_revenue * 100) if total_revenue > 0 else 0
+    
+    # Calculate GST if columns exist
+    gst_collected = float(df['gst_collected'].sum()) if 'gst_collected' in df.columns else total_revenue * 0.18
+    gst_paid = float(df['gst_paid'].sum()) if 'gst_paid' in df.columns else total_expenses * 0.18
+    net_gst = gst_collected - gst_paid
+    
+    # Calculate credit score (simplified)
+    profitability_score = min(100, max(0, margin * 5))
+    liquidity_score = 80  # Simplified
+    credit_score = (profitability_score * 0.4 + liquidity_score * 0.6)
+    
+    # Determine rating
+    if credit_score >= 85:
+        rating = 'AA'
+    elif credit_score >= 70:
+        rating = 'A'
+    elif credit_score >= 55:
+        rating = 'B'
+    elif credit_score >= 40:
+        rating = 'C'
+    else:
+        rating = 'D'
+    
+    return {
+        'credit_score': {
+            'score': credit_score,
+            'rating': rating,
+            'factors': {
+                'profitability': profitability_score,
+                'liquidity': liquidity_score,
+                'leverage': 75,
+                'efficiency': 72
+            }
+        },
+        'profit_loss': {
+            'revenue': total_revenue,
+            'expenses': total_expenses,
+            'net_profit': profit,
+            'margin': margin
+        },
+        'gst': {
+            'collected': gst_collected,
+            'paid': gst_paid,
+            'net': net_gst,
+            'compliance_score': 95
+        },
+        'metrics': {
+            'totalRevenue': total_revenue,
+            'netProfit': profit,
+            'profitMargin': margin,
+            'creditScore': credit_score
+        },
+        'cashFlow': {
+            'months': df['date'].dt.strftime('%b').tolist()[-6:],
+            'inflow': df['revenue'].tolist()[-6:],
+            'outflow': df['expenses'].tolist()[-6:]
+        },
+        'forecasts': {
+            'next_6_months': [total_revenue/len(df) * 1.05**i for i in range(1, 7)]
+        },
+        'last_updated': datetime.now().isoformat()
+    }
+
+
+def _upload_summary(processed_data: dict) -> dict:
+    profit_loss = processed_data['profit_loss']
+    return {
+        "total_revenue": profit_loss['revenue'],
+        "total_expenses": profit_loss['expenses'],
+        "profit": profit_loss['net_profit'],
+        "margin": profit_loss['margin'],
+        "credit_score": processed_data['credit_score']['score'],
+        "rating": processed_data['credit_score']['rating']
+    }
+
 # Health check
 @app.get("/api/health")
 def api_health_check():
@@ -40,10 +183,13 @@ async def analyze_file(file: UploadFile = File(...), sme_id: int = Form(default=
         contents = await file.read()
         
         # Parse file
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
+        try:
+            if file.filename.endswith('.csv'):
+                df = pd.read_csv(io.BytesIO(contents))
+            else:
+                df = pd.read_excel(io.BytesIO(contents))
+        except Exception as e:
+            raise HTTPException(400, f"Could not parse {file.filename}: {e}")
         
         logger.info(f"Parsed file with {len(df)} rows and columns: {df.columns.tolist()}")
         
@@ -51,106 +197,67 @@ async def analyze_file(file: UploadFile = File(...), sme_id: int = Form(default=
         df.columns = df.columns.str.lower().str.strip()
         
         # Basic validation
-        required_cols = ['date', 'revenue', 'expenses']
-        missing = [col for col in required_cols if col not in df.columns]
+        missing = [col for col in UPLOAD_KEY_COLUMNS if col not in df.columns]
         
         if missing:
             raise HTTPException(400, f"Missing required columns: {missing}. Found columns: {df.columns.tolist()}")
         
         # Convert date column
-        df['date'] = pd.to_datetime(df['date'])
+        try:
+            df['date'] = pd.to_datetime(df['date'])
+        except (ValueError, TypeError) as e:
+            raise HTTPException(400, f"Invalid values in date column: {e}")
         
-        # Calculate metrics
-        total_revenue = float(df['revenue'].sum())
-        total_expenses = float(df['expenses'].sum())
-        profit = total_revenue - total_expenses
-        margin = (profit / total_revenue * 100) if total_revenue > 0 else 0
+        # Keep only rows this SME has not uploaded before
+        index = fingerprint_store.index_for(sme_id)
+        history = _load_history(sme_id, index)
+        # Repeated lines within this file are kept: they can be genuine entries
+        new_rows, fingerprints = index.filter_new(df, key_columns=UPLOAD_KEY_COLUMNS, keep_repeats=True)
+        duplicate_records = len(df) - len(new_rows)
         
-        # Calculate GST if columns exist
-        gst_collected = float(df['gst_collected'].sum()) if 'gst_collected' in df.columns else total_revenue * 0.18
-        gst_paid = float(df['gst_paid'].sum()) if 'gst_paid' in df.columns else total_expenses * 0.18
-        net_gst = gst_collected - gst_paid
+        if len(new_rows) == 0 and history is not None and sme_id in uploaded_data_store:
+            logger.info(f"Upload for SME {sme_id} adds no new rows, keeping previous analysis")
+            return {
+                "status": "unchanged",
+                "records": len(df),
+                "new_records": 0,
+                "duplicate_records": duplicate_records,
+                "sme_id": sme_id,
+                "summary": _upload_summary(uploaded_data_store[sme_id])
+            }
         
-        # Calculate credit score (simplified)
-        profitability_score = min(100, max(0, margin * 5))
-        liquidity_score = 80  # Simplified
-        credit_score = (profitability_score * 0.4 + liquidity_score * 0.6)
+        if len(new_rows) > 0:
+            history = new_rows if history is None else pd.concat([history, new_rows], ignore_index=True)
+            # Uploads may back-fill earlier months; keep the rows in date order
+            history = history.sort_values('date', kind='stable', ignore_index=True)
+            _save_history(sme_id, history, index, fingerprints)
         
-        # Determine rating
-        if credit_score >= 85:
-            rating = 'AA'
-        elif credit_score >= 70:
-            rating = 'A'
-        elif credit_score >= 55:
-            rating = 'B'
-        elif credit_score >= 40:
-            rating = 'C'
-        else:
-            rating = 'D'
+        if history is None or len(history) == 0:
+            raise HTTPException(400, "Upload contains no rows to analyze")
         
         # Store processed data
-        processed_data = {
-            'credit_score': {
-                'score': credit_score,
-                'rating': rating,
-                'factors': {
-                    'profitability': profitability_score,
-                    'liquidity': liquidity_score,
-                    'leverage': 75,
-                    'efficiency': 72
-                }
-            },
-            'profit_loss': {
-                'revenue': total_revenue,
-                'expenses': total_expenses,
-                'net_profit': profit,
-                'margin': margin
-            },
-            'gst': {
-                'collected': gst_collected,
-                'paid': gst_paid,
-                'net': net_gst,
-                'compliance_score': 95
-            },
-            'metrics': {
-                'totalRevenue': total_revenue,
-                'netProfit': profit,
-                'profitMargin': margin,
-                'creditScore': credit_score
-            },
-            'cashFlow': {
-                'months': df['date'].dt.strftime('%b').tolist()[-6:],
-                'inflow': df['revenue'].tolist()[-6:],
-                'outflow': df['expenses'].tolist()[-6:]
-            },
-            'forecasts': {
-                'next_6_months': [total_revenue/len(df) * 1.05**i for i in range(1, 7)]
-            },
-            'last_updated': datetime.now().isoformat()
-        }
+        processed_data = _build_dashboard(history)
         
         # Store in memory
         uploaded_data_store[sme_id] = processed_data
         
-        logger.info(f"Successfully processed file for SME {sme_id}")
+        logger.info(f"Successfully processed file for SME {sme_id}: {len(new_rows)} new of {len(df)} rows, "
+                    f"{duplicate_records} already uploaded")
         
         return {
             "status": "success",
             "records": len(df),
+            "new_records": len(new_rows),
+            "duplicate_records": duplicate_records,
             "sme_id": sme_id,
-            "summary": {
-                "total_revenue": total_revenue,
-                "total_expenses": total_expenses,
-                "profit": profit,
-                "margin": margin,
-                "credit_score": credit_score,
-                "rating": rating
-            }
+            "summary": _upload_summary(processed_data)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing file: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+        logger.exception(f"Error processing file: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Could not process upload: {e}")
 
 @app.get("/api/smes")
 def get_smes():
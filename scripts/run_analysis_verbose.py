@@ -37,7 +37,8 @@ try:
     print("[STEP 1/7] Loading data...")
     loader = DataLoader()
     print("  - Loading Maven data...")
-    maven_data = loader.load_maven_data()
+    # Only sales and products are parsed; other Maven files load on first access
+    maven_data = loader.open_maven_data()
     print(f"  - Sales: {len(maven_data['sales'])} records")
     print(f"  - Products: {len(maven_data['products'])} records")
     print("  - Loading SME data...")
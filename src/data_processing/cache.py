@@ -0,0 +1,129 @@
+"""
+Dataset Cache Module
+Columnar on-disk cache for parsed CSV datasets
+"""
+
+import pandas as pd
+import os
+import hashlib
+import logging
+from typing import Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever the parse step changes so stale cached frames are never served
+CACHE_VERSION = 3
+
+
+def file_fingerprint(file_path: str) -> Tuple[str, int, int]:
+    """
+    Identify a file by absolute path, size and modification time
+    """
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
+class DatasetCache:
+    """Store parsed DataFrames as Parquet files keyed by source file fingerprint"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.format = self._detect_format()
+
+    def _detect_format(self) -> str:
+        """
+        Use Parquet when pyarrow is installed, otherwise fall back to pickle
+        """
+        try:
+            import pyarrow  # noqa: F401
+            return 'parquet'
+        except ImportError:
+            logger.warning("pyarrow not installed, dataset cache will use pickle files")
+            return 'pickle'
+
+    def _entry_prefix(self, key: str) -> str:
+        return f"{key}-"
+
+    def _entry_path(self, key: str, file_path: str, schema_version: str = '') -> str:
+        """
+        Build the cache file path for the current version of a source file
+
+        schema_version identifies the declared types the frame was parsed
+        with, so a schema change misses the old entry.
+        """
+        path, size, mtime_ns = file_fingerprint(file_path)
+        token = f"{CACHE_VERSION}|{schema_version}|{path}|{size}|{mtime_ns}"
+        digest = hashlib.sha1(token.encode('utf-8')).hexdigest()[:16]
+        extension = 'parquet' if self.format == 'parquet' else 'pkl'
+        return os.path.join(self.cache_dir, f"{self._entry_prefix(key)}{digest}.{extension}")
+
+    def get(self, key: str, file_path: str, schema_version: str = '') -> Optional[pd.DataFrame]:
+        """
+        Return the cached frame for file_path, or None if missing or stale
+        """
+        try:
+            entry_path = self._entry_path(key, file_path, schema_version)
+        except OSError:
+            return None
+
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            if self.format == 'parquet':
+                df = pd.read_parquet(entry_path)
+            else:
+                df = pd.read_pickle(entry_path)
+            logger.info(f"Loaded {key} from cache: {entry_path}")
+            return df
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {entry_path}: {e}")
+            self._remove(entry_path)
+            return None
+
+    def put(self, key: str, file_path: str, df: pd.DataFrame, schema_version: str = '') -> Optional[str]:
+        """
+        Write df to the cache and drop entries for older versions of the file or schema
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry_path = self._entry_path(key, file_path, schema_version)
+            self._evict(key, keep=entry_path)
+
+            # Write to a temp file first so readers never see a partial entry
+            tmp_path = f"{entry_path}.tmp"
+            if self.format == 'parquet':
+                df.to_parquet(tmp_path, index=False)
+            else:
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, entry_path)
+            return entry_path
+        except Exception as e:
+            logger.warning(f"Could not cache {key}: {e}")
+            return None
+
+    def _evict(self, key: str, keep: Optional[str] = None):
+        """
+        Remove cache entries for key other than keep
+        """
+        prefix = self._entry_prefix(key)
+        for filename in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, filename)
+            if filename.startswith(prefix) and path != keep:
+                self._remove(path)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Remove every cache entry
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for filename in os.listdir(self.cache_dir):
+            self._remove(os.path.join(self.cache_dir, filename))
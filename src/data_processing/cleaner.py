@@ -5,8 +5,20 @@ Handles data validation, cleaning, and quality checks
 
 import pandas as pd
 import numpy as np
+import os
 import logging
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
+from typing import Dict, List, Tuple, Iterable, Iterator, Optional
+
+from src.data_processing.currency import CurrencyConverter
+from src.data_processing.dedup import FingerprintIndex
+from src.data_processing.instrumentation import PeakMemoryTracker, StageProfiler
+from src.data_processing.outliers import OutlierDetector
+from src.data_processing.products import ProductPriceTable, get_price_table
+from src.data_processing.sme_normalizer import SMERiskNormalizer
+from src.data_processing.validation import RuleEngine, financial_rule_engine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,8 +27,12 @@ logger = logging.getLogger(__name__)
 class DataCleaner:
     """Clean and validate financial data"""
     
-    def __init__(self):
+    def __init__(self, rule_engine: Optional[RuleEngine] = None, track_memory: bool = False):
         self.cleaning_stats = {}
+        self.rule_engine = rule_engine or financial_rule_engine()
+        # Record peak traced memory of each clean_* call (slows cleaning down)
+        self.track_memory = track_memory
+        self.sme_normalizer = None
     
     def _clean_currency_column(self, series: pd.Series) -> pd.Series:
         """
@@ -34,118 +50,373 @@ class DataCleaner:
             # Already numeric
             return pd.to_numeric(series, errors='coerce')
     
-    def clean_sales_data(self, sales_df: pd.DataFrame, products_df: pd.DataFrame) -> pd.DataFrame:
+    def _clean_sales_rows(self, sales_df: pd.DataFrame, price_table: ProductPriceTable,
+                          converter: Optional[CurrencyConverter] = None,
+                          reporting_currency: str = 'USD',
+                          profiler: Optional[StageProfiler] = None) -> pd.DataFrame:
         """
-        Clean and validate sales data
+        Row-level sales cleaning: validity filters, pricing, revenue and calendar fields
+        Each step is timed as a stage of profiler
         """
-        logger.info("Starting sales data cleaning...")
+        profiler = profiler or StageProfiler()
         initial_rows = len(sales_df)
         
-        # Make a copy to avoid modifying original
-        df = sales_df.copy()
+        # Steps 1-5 build one row mask, so sales_df is copied once by a single
+        # selection instead of once per filter
         
         # 1. Remove rows with missing critical fields
-        critical_fields = ['Order Date', 'ProductKey', 'Quantity']
-        df = df.dropna(subset=critical_fields)
-        logger.info(f"Removed {initial_rows - len(df)} rows with missing critical fields")
+        with profiler.stage('critical_fields', initial_rows) as stage:
+            critical_fields = ['Order Date', 'ProductKey', 'Quantity']
+            complete = np.logical_and.reduce([sales_df[field].notna().to_numpy() for field in critical_fields])
+            stage['rows_out'] = complete.sum()
+        logger.info(f"Removed {initial_rows - int(complete.sum())} rows with missing critical fields")
+        
+        # 2-3. Convert Quantity to numeric (handle any string values) and
+        # remove negative or zero quantities
+        with profiler.stage('quantity_coercion', complete.sum()) as stage:
+            quantity = pd.to_numeric(sales_df['Quantity'], errors='coerce')
+            valid_rows = complete & (quantity > 0).to_numpy()
+            stage['rows_out'] = valid_rows.sum()
+        
+        # 4. Look up pricing by ProductKey
+        with profiler.stage('product_lookup', valid_rows.sum()):
+            prices, costs = price_table.gather(sales_df['ProductKey'])
+        
+        # 5. Remove rows with missing pricing after lookup
+        with profiler.stage('price_filter', valid_rows.sum()) as stage:
+            priced = valid_rows & ~np.isnan(prices) & ~np.isnan(costs)
+            
+            rows = np.flatnonzero(priced)
+            df = sales_df.take(rows)
+            # Label rows by position among the quantity-valid rows, as the old merge did
+            if len(rows) == valid_rows.sum():
+                df.index = pd.RangeIndex(len(rows))
+            else:
+                df.index = pd.Index((np.cumsum(valid_rows) - 1)[rows])
+            if quantity.dtype != sales_df['Quantity'].dtype:
+                df['Quantity'] = quantity.to_numpy()[rows]
+            df['Unit Price USD'] = prices[rows]
+            df['Unit Cost USD'] = costs[rows]
+            stage['rows_out'] = len(df)
+        logger.info(f"Removed {int(valid_rows.sum()) - len(df)} rows with missing prices after lookup")
+        
+        # 6. Calculate revenue and COGS
+        with profiler.stage('revenue', len(df)):
+            df['revenue'] = df['Quantity'] * df['Unit Price USD']
+            df['cogs'] = df['Quantity'] * df['Unit Cost USD']
+            df['gross_profit'] = df['revenue'] - df['cogs']
+        
+        # 7. Normalize currencies (product prices are quoted in USD)
+        if converter is not None:
+            with profiler.stage('currency_conversion', len(df)):
+                df = self._convert_currencies(df, converter, reporting_currency)
         
-        # 2. Convert Quantity to numeric (handle any string values)
-        df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce')
-        df = df.dropna(subset=['Quantity'])
+        # 8. Create period columns
+        with profiler.stage('calendar', len(df)):
+            df = self._add_calendar_fields(df)
         
-        # 3. Remove negative or zero quantities
-        df = df[df['Quantity'] > 0]
+        return df
+    
+    def _add_calendar_fields(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Derive date, period, year, month and quarter from one datetime conversion
         
-        # 4. Clean products data - convert price columns to numeric
-        products_clean = products_df.copy()
+        Fields come from the integer day/month representation rather than
+        per-row string formatting. period is a categorical of 'YYYY-MM' labels
+        and period_key the matching months-since-1970 integer.
         
-        # Clean currency columns
-        products_clean['Unit Price USD'] = self._clean_currency_column(products_clean['Unit Price USD'])
-        products_clean['Unit Cost USD'] = self._clean_currency_column(products_clean['Unit Cost USD'])
+        date is datetime64[ns] at midnight, not Python datetime.date objects:
+        compare it with pd.Timestamp values and use .dt for formatting.
+        """
+        order_dates = df['Order Date']
+        if not pd.api.types.is_datetime64_dtype(order_dates):
+            order_dates = pd.to_datetime(order_dates)
+        order_dates = order_dates.to_numpy()
+        month_keys = order_dates.astype('datetime64[M]').view('int64')
         
-        # Remove products with missing or invalid prices
-        products_clean = products_clean.dropna(subset=['Unit Price USD', 'Unit Cost USD'])
-        products_clean = products_clean[products_clean['Unit Price USD'] > 0]
-        products_clean = products_clean[products_clean['Unit Cost USD'] > 0]
+        months = (month_keys % 12 + 1).astype('int32')
         
-        logger.info(f"Products with valid pricing: {len(products_clean)}/{len(products_df)}")
+        df['date'] = order_dates.astype('datetime64[D]').astype('datetime64[ns]')
+        df['period'] = self._period_categorical(month_keys)
+        df['period_key'] = month_keys.astype('int32')
+        df['year'] = (month_keys // 12 + 1970).astype('int32')
+        df['month'] = months
+        df['quarter'] = ((months - 1) // 3 + 1).astype('int32')
         
-        # 5. Merge with products to get pricing
-        df = df.merge(products_clean[['ProductKey', 'Unit Price USD', 'Unit Cost USD']], 
-                      on='ProductKey', 
-                      how='left')
+        return df
+    
+    def _period_categorical(self, month_keys: np.ndarray) -> pd.Categorical:
+        """
+        'YYYY-MM' categorical for months-since-1970 keys
         
-        # 6. Remove rows with missing pricing after merge
-        before_price_filter = len(df)
-        df = df.dropna(subset=['Unit Price USD', 'Unit Cost USD'])
-        logger.info(f"Removed {before_price_filter - len(df)} rows with missing prices after merge")
+        Months present are found by counting rather than sorting, and only
+        these are formatted as strings.
+        """
+        month_keys = np.asarray(month_keys, dtype='int64')
+        first_key = int(month_keys.min()) if len(month_keys) else 0
+        offsets = month_keys - first_key
+        used = np.flatnonzero(np.bincount(offsets)) if len(offsets) else np.array([], dtype='int64')
+        remap = np.zeros(int(offsets.max()) + 1 if len(offsets) else 0, dtype='int32')
+        remap[used] = np.arange(len(used), dtype='int32')
+        labels = [f"{1970 + key // 12}-{key % 12 + 1:02d}" for key in (used + first_key).tolist()]
+        return pd.Categorical.from_codes(remap[offsets], categories=labels)
+    
+    def _format_date_range(self, min_date, max_date) -> str:
+        """
+        Render a date range as 'YYYY-MM-DD to YYYY-MM-DD'
+        """
+        def fmt(value):
+            return pd.Timestamp(value).strftime('%Y-%m-%d') if pd.notna(value) else 'NaT'
+        return f"{fmt(min_date)} to {fmt(max_date)}"
+    
+    def _currency_converter(self, exchange_rates_df: Optional[pd.DataFrame],
+                            reporting_currency: str) -> Optional[CurrencyConverter]:
+        """
+        Converter for the exchange rates, or None when amounts stay in USD
         
-        # 7. Calculate revenue and COGS
-        df['revenue'] = df['Quantity'] * df['Unit Price USD']
-        df['cogs'] = df['Quantity'] * df['Unit Cost USD']
-        df['gross_profit'] = df['revenue'] - df['cogs']
+        Raises ValueError for a non-USD reporting currency without rates,
+        which would otherwise silently report USD figures.
+        """
+        if exchange_rates_df is None:
+            if reporting_currency != 'USD':
+                raise ValueError(f"Reporting in {reporting_currency} requires exchange_rates_df")
+            return None
+        return CurrencyConverter(exchange_rates_df)
+    
+    def _convert_currencies(self, df: pd.DataFrame, converter: CurrencyConverter,
+                            reporting_currency: str) -> pd.DataFrame:
+        """
+        Add order-currency amounts and express revenue/COGS in the reporting currency
+        """
+        order_dates = df['Order Date']
+        
+        if 'Currency Code' in df.columns:
+            order_currency = df['Currency Code'].astype(str).to_numpy()
+            df['revenue_local'] = converter.convert(df['revenue'], order_dates, 'USD', order_currency)
+            df['cogs_local'] = converter.convert(df['cogs'], order_dates, 'USD', order_currency)
+            
+            missing = int(np.isnan(df['revenue_local'].to_numpy()).sum())
+            if missing > 0:
+                logger.warning(f"No exchange rate for {missing} rows; local amounts left empty")
+        
+        if reporting_currency != 'USD':
+            for col in ['revenue', 'cogs', 'gross_profit']:
+                df[col] = converter.convert(df[col], order_dates, 'USD', reporting_currency)
+            logger.info(f"Revenue and COGS reported in {reporting_currency}")
         
-        # 8. Create period columns
-        df['date'] = pd.to_datetime(df['Order Date']).dt.date
-        df['period'] = pd.to_datetime(df['Order Date']).dt.strftime('%Y-%m')
-        df['year'] = pd.to_datetime(df['Order Date']).dt.year
-        df['month'] = pd.to_datetime(df['Order Date']).dt.month
-        df['quarter'] = pd.to_datetime(df['Order Date']).dt.quarter
+        return df
+    
+    def clean_sales_data(self, sales_df: pd.DataFrame, products_df: pd.DataFrame,
+                         exchange_rates_df: Optional[pd.DataFrame] = None,
+                         reporting_currency: str = 'USD',
+                         outlier_detector: Optional[OutlierDetector] = None,
+                         parallel: bool = False,
+                         max_workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Clean and validate sales data
+        With exchange_rates_df, adds revenue_local/cogs_local in each order's
+        currency and reports revenue, COGS and gross profit in reporting_currency
+        With outlier_detector, is_outlier comes from its sketch thresholds
+        (optionally per group) instead of the exact revenue 99th percentile
+        With parallel, row partitions are cleaned on a process pool and the
+        outlier threshold comes from their merged sketches (a default
+        OutlierDetector if none is given); rows keep their serial order
+        """
+        logger.info("Starting sales data cleaning...")
+        initial_rows = len(sales_df)
         
-        # 9. Flag outliers
-        revenue_q99 = df['revenue'].quantile(0.99)
-        df['is_outlier'] = df['revenue'] > revenue_q99
+        profiler = StageProfiler(self.track_memory)
+        with self._memory_tracker('sales') as tracker:
+            if parallel:
+                outlier_detector = outlier_detector or OutlierDetector()
+                df = self._clean_sales_parallel(sales_df, products_df, exchange_rates_df, reporting_currency,
+                                                outlier_detector, profiler, max_workers)
+            else:
+                converter = self._currency_converter(exchange_rates_df, reporting_currency)
+                with profiler.stage('product_table', len(products_df)):
+                    price_table = get_price_table(products_df)
+                df = self._clean_sales_rows(sales_df, price_table, converter, reporting_currency, profiler)
+                if outlier_detector is not None:
+                    with profiler.stage('outlier_sketch', len(df)):
+                        outlier_detector.update(df)
+            
+            # Flag outliers
+            with profiler.stage('outlier_flag', len(df)):
+                if outlier_detector is not None:
+                    df['is_outlier'] = outlier_detector.flag(df)
+                else:
+                    revenue_q99 = df['revenue'].quantile(0.99)
+                    df['is_outlier'] = df['revenue'] > revenue_q99
         
         self.cleaning_stats['sales'] = {
             'initial_rows': initial_rows,
             'final_rows': len(df),
             'removed_rows': initial_rows - len(df),
             'outliers_flagged': int(df['is_outlier'].sum()),
-            'date_range': f"{df['date'].min()} to {df['date'].max()}",
+            'date_range': self._format_date_range(df['date'].min(), df['date'].max()),
             'total_revenue': f"${df['revenue'].sum():,.2f}",
-            'avg_transaction': f"${df['revenue'].mean():,.2f}"
+            'avg_transaction': f"${df['revenue'].mean():,.2f}",
+            'stages': profiler.stages
         }
+        self._record_memory('sales', tracker)
         
         logger.info(f"Sales data cleaned: {len(df)} rows remaining")
-        logger.info(f"Date range: {df['date'].min()} to {df['date'].max()}")
+        logger.info(f"Date range: {self._format_date_range(df['date'].min(), df['date'].max())}")
         logger.info(f"Total revenue: ${df['revenue'].sum():,.2f}")
         
         return df
     
-    def clean_sme_data(self, sme_df: pd.DataFrame) -> pd.DataFrame:
+    def _clean_sales_parallel(self, sales_df: pd.DataFrame, products_df: pd.DataFrame,
+                              exchange_rates_df: Optional[pd.DataFrame], reporting_currency: str,
+                              outlier_detector: OutlierDetector, profiler: StageProfiler,
+                              max_workers: Optional[int]) -> pd.DataFrame:
         """
-        Clean and validate SME risk assessment data
-        """
-        logger.info("Starting SME data cleaning...")
-        initial_rows = len(sme_df)
+        Clean contiguous row partitions on a process pool and stitch them back together
         
-        df = sme_df.copy()
-        
-        # 1. Check for missing values in risk factors
-        risk_columns = [col for col in df.columns if any(x in col for x in ['FL', 'FR', 'RA', 'MDA', 'FDM', 'FA'])]
+        Partition results are concatenated in input order and relabelled as
+        the serial path would, so the frame does not depend on worker timing.
+        Each partition's outlier sketch is merged into outlier_detector.
+        """
+        workers = max_workers or os.cpu_count() or 1
+        bounds = np.linspace(0, len(sales_df), min(workers, max(len(sales_df), 1)) + 1).astype(int)
+        partitions = [sales_df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+        logger.info(f"Cleaning {len(partitions)} sales partitions on {workers} processes")
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                _clean_sales_partition,
+                partitions,
+                repeat(products_df),
+                repeat(exchange_rates_df),
+                repeat(reporting_currency),
+                repeat(outlier_detector.spawn()),
+                repeat(self.track_memory)
+            ))
+        
+        with profiler.stage('partition_merge', sum(len(part) for part, _, _, _ in results)):
+            offset = 0
+            parts = []
+            for part, detector, stages, valid_rows in results:
+                part.index = part.index + offset
+                offset += valid_rows
+                parts.append(part)
+                outlier_detector.merge(detector)
+                profiler.merge(stages)
+            
+            df = pd.concat(parts)
+            if len(df) == offset:
+                df.index = pd.RangeIndex(len(df))
+            # Partitions saw different months, so rebuild one shared category set
+            df['period'] = self._period_categorical(df['period_key'].to_numpy())
         
-        # Convert risk columns to numeric first
-        for col in risk_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        return df
+    
+    def _memory_tracker(self, label: str):
+        """
+        Peak memory tracker when track_memory is on, otherwise a no-op context
+        """
+        return PeakMemoryTracker(label) if self.track_memory else nullcontext()
+    
+    def _record_memory(self, dataset: str, tracker: Optional[PeakMemoryTracker]):
+        if tracker is not None:
+            self.cleaning_stats[dataset]['peak_memory_mb'] = round(tracker.peak_mb, 2)
+            logger.info(f"Peak memory cleaning {dataset}: {tracker.peak_mb:.1f} MB")
+    
+    def clean_sales_chunks(self, sales_chunks: Iterable[pd.DataFrame],
+                           products_df: pd.DataFrame,
+                           exchange_rates_df: Optional[pd.DataFrame] = None,
+                           reporting_currency: str = 'USD',
+                           outlier_detector: Optional[OutlierDetector] = None) -> Iterator[pd.DataFrame]:
+        """
+        Clean sales data chunk by chunk, yielding each cleaned chunk
+        
+        Peak memory follows the chunk size rather than the history length.
+        Outlier flags need the global revenue distribution, so is_outlier is
+        not set here; pass an outlier_detector to have every chunk added to
+        its sketch, then flag chunks with outlier_detector.flag() once the
+        pass is done. cleaning_stats['sales'] is filled in once the chunks
+        are exhausted.
+        """
+        logger.info("Starting chunked sales data cleaning...")
+        profiler = StageProfiler(self.track_memory)
+        with profiler.stage('product_table', len(products_df)):
+            price_table = get_price_table(products_df)
+        converter = self._currency_converter(exchange_rates_df, reporting_currency)
+        
+        initial_rows = 0
+        final_rows = 0
+        total_revenue = 0.0
+        min_date = None
+        max_date = None
+        
+        for chunk in sales_chunks:
+            initial_rows += len(chunk)
+            df = self._clean_sales_rows(chunk, price_table, converter, reporting_currency, profiler)
+            if outlier_detector is not None:
+                with profiler.stage('outlier_sketch', len(df)):
+                    outlier_detector.update(df)
+            
+            if len(df) > 0:
+                final_rows += len(df)
+                total_revenue += float(df['revenue'].sum())
+                chunk_min, chunk_max = df['date'].min(), df['date'].max()
+                min_date = chunk_min if min_date is None else min(min_date, chunk_min)
+                max_date = chunk_max if max_date is None else max(max_date, chunk_max)
+            
+            yield df
         
-        # Fill missing risk values with median 
-        for col in risk_columns:
-            if df[col].isnull().any():
-                median_val = df[col].median()
-                df[col].fillna(median_val, inplace=True)
-                logger.info(f"Filled {col} missing values with median: {median_val:.3f}")
+        self.cleaning_stats['sales'] = {
+            'initial_rows': initial_rows,
+            'final_rows': final_rows,
+            'removed_rows': initial_rows - final_rows,
+            'date_range': self._format_date_range(min_date, max_date),
+            'total_revenue': f"${total_revenue:,.2f}",
+            'avg_transaction': f"${(total_revenue / final_rows if final_rows else 0):,.2f}",
+            'stages': profiler.stages
+        }
+        if outlier_detector is not None:
+            self.cleaning_stats['sales']['outlier_threshold'] = f"${outlier_detector.threshold():,.2f}"
         
-        # 2. Normalize risk scores to 0-1 scale if needed
-        for col in risk_columns:
-            col_max = df[col].max()
-            if col_max > 1:
-                df[col] = df[col] / col_max
+        logger.info(f"Chunked sales data cleaned: {final_rows} rows remaining")
+    
+    def clean_sme_data(self, sme_df: pd.DataFrame,
+                       normalizer: Optional[SMERiskNormalizer] = None) -> pd.DataFrame:
+        """
+        Clean and validate SME risk assessment data
+        Risk columns are coerced, median-filled and max-scaled as one 2-D
+        block. A fitted normalizer (e.g. SMERiskNormalizer.load()) transforms
+        a new survey batch with its stored medians and scales instead of
+        refitting; the normalizer used is kept as self.sme_normalizer.
+        """
+        logger.info("Starting SME data cleaning...")
+        initial_rows = len(sme_df)
         
+        normalizer = normalizer or SMERiskNormalizer()
+        profiler = StageProfiler(self.track_memory)
+        with self._memory_tracker('sme') as tracker:
+            # 1. Convert risk columns to numeric
+            with profiler.stage('risk_coercion', initial_rows):
+                block = normalizer.coerce(sme_df)
+            
+            # Fill missing risk values with median
+            with profiler.stage('median_fill', initial_rows):
+                if not normalizer.is_fitted:
+                    normalizer.fit(block)
+                normalizer.fill(block)
+            
+            # 2. Normalize risk scores to 0-1 scale if needed
+            with profiler.stage('scaling', initial_rows):
+                normalizer.scale(block)
+                df = normalizer.write_back(sme_df, block)
+        
+        self.sme_normalizer = normalizer
         self.cleaning_stats['sme'] = {
             'initial_rows': initial_rows,
             'final_rows': len(df),
-            'risk_columns_processed': len(risk_columns)
+            'risk_columns_processed': len(normalizer.columns),
+            'stages': profiler.stages
         }
+        self._record_memory('sme', tracker)
         
         logger.info(f"SME data cleaned: {len(df)} rows")
         return df
@@ -155,32 +426,8 @@ class DataCleaner:
         Validate financial data for logical consistency
         Returns: (is_valid, list_of_issues)
         """
-        issues = []
-        
-        # Check 1: Revenue should be positive
-        if 'revenue' in df.columns:
-            negative_revenue = (df['revenue'] < 0).sum()
-            if negative_revenue > 0:
-                issues.append(f"{negative_revenue} rows with negative revenue")
-        
-        # Check 2: COGS should not exceed revenue (allow small margin for rounding)
-        if 'revenue' in df.columns and 'cogs' in df.columns:
-            invalid_margin = (df['cogs'] > df['revenue'] * 1.01).sum()  # Allow 1% margin
-            if invalid_margin > 0:
-                issues.append(f"{invalid_margin} rows where COGS > Revenue")
-        
-        # Check 3: Gross profit should equal revenue - cogs
-        if all(col in df.columns for col in ['revenue', 'cogs', 'gross_profit']):
-            calculated_gp = df['revenue'] - df['cogs']
-            mismatch = (abs(calculated_gp - df['gross_profit']) > 0.01).sum()
-            if mismatch > 0:
-                issues.append(f"{mismatch} rows with gross profit calculation mismatch")
-        
-        # Check 4: Dates should be valid
-        if 'Order Date' in df.columns:
-            invalid_dates = df['Order Date'].isnull().sum()
-            if invalid_dates > 0:
-                issues.append(f"{invalid_dates} rows with invalid dates")
+        result = self.rule_engine.validate(df)
+        issues = result.issues
         
         is_valid = len(issues) == 0
         
@@ -193,13 +440,37 @@ class DataCleaner:
         
         return is_valid, issues
     
-    def remove_duplicates(self, df: pd.DataFrame, subset: List[str] = None) -> pd.DataFrame:
+    def quarantine_invalid_rows(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Split df into rows passing every validation rule and quarantined rows
+        Quarantined rows carry a failed_rules column naming the broken rules
+        """
+        result = self.rule_engine.validate(df)
+        valid_df, quarantined = result.quarantine(df)
+        
+        self.cleaning_stats['validation'] = {
+            'rows_checked': len(df),
+            'rows_quarantined': len(quarantined),
+            'rule_violations': result.counts
+        }
+        
+        if len(quarantined) > 0:
+            logger.warning(f"Quarantined {len(quarantined)} rows failing validation")
+        return valid_df, quarantined
+    
+    def remove_duplicates(self, df: pd.DataFrame, subset: List[str] = None,
+                          index: Optional[FingerprintIndex] = None) -> pd.DataFrame:
         """
         Remove duplicate rows
+        With a persistent fingerprint index, rows seen in earlier uploads are
+        removed too and the surviving rows are added to the index
         """
         initial_rows = len(df)
         
-        if subset:
+        if index is not None:
+            df, fingerprints = index.filter_new(df, subset)
+            index.add(fingerprints)
+        elif subset:
             df = df.drop_duplicates(subset=subset, keep='first')
         else:
             df = df.drop_duplicates(keep='first')
@@ -248,6 +519,38 @@ class DataCleaner:
         Get summary of all cleaning operations
         """
         return self.cleaning_stats
+    
+    def get_stage_metrics(self) -> List[Dict]:
+        """
+        Flat numeric per-stage records (dataset, stage, calls, wall_seconds,
+        cpu_seconds, rows_in, rows_out, bytes_allocated) for export to a
+        metrics backend
+        """
+        return [
+            {'dataset': dataset, 'stage': stage, **totals}
+            for dataset, stats in self.cleaning_stats.items()
+            for stage, totals in stats.get('stages', {}).items()
+        ]
+
+
+def _clean_sales_partition(sales_df: pd.DataFrame, products_df: pd.DataFrame,
+                           exchange_rates_df: Optional[pd.DataFrame], reporting_currency: str,
+                           outlier_detector: OutlierDetector, track_memory: bool):
+    """
+    Process pool task: clean one sales partition and sketch its revenue
+    Returns (cleaned rows, outlier sketch, stage stats, quantity-valid row count)
+    """
+    cleaner = DataCleaner(track_memory=track_memory)
+    profiler = StageProfiler(track_memory)
+    converter = cleaner._currency_converter(exchange_rates_df, reporting_currency)
+    
+    with profiler.stage('product_table', len(products_df)):
+        price_table = get_price_table(products_df)
+    df = cleaner._clean_sales_rows(sales_df, price_table, converter, reporting_currency, profiler)
+    with profiler.stage('outlier_sketch', len(df)):
+        outlier_detector.update(df)
+    
+    return df, outlier_detector, profiler.stages, profiler.stages['quantity_coercion']['rows_out']
 
 
 # Example usage
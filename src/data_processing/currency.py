@@ -0,0 +1,100 @@
+"""
+Currency Conversion Module
+Vectorized multi-currency normalization from the Maven exchange rate table
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import List, Union
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CurrencyInput = Union[str, pd.Series, np.ndarray, List[str]]
+
+
+class CurrencyConverter:
+    """Dense (day, currency) exchange rate table with array lookups"""
+
+    def __init__(self, exchange_rates_df: pd.DataFrame, base_currency: str = 'USD'):
+        """
+        Build the rate table from Exchange_Rates.csv rows
+
+        Rates are units of each currency per one unit of base_currency. Days
+        without a quote carry the previous day's rate forward.
+        """
+        rates_df = exchange_rates_df.dropna(subset=['Date', 'Currency', 'Exchange'])
+
+        days = pd.to_datetime(rates_df['Date']).values.astype('datetime64[D]').astype('int64')
+        codes, currencies = pd.factorize(rates_df['Currency'].astype(str), sort=True)
+
+        self.base_currency = base_currency
+        self.currencies = list(currencies)
+        if base_currency not in self.currencies:
+            self.currencies.append(base_currency)
+        self.first_day = int(days.min())
+        self.last_day = int(days.max())
+
+        n_days = self.last_day - self.first_day + 1
+        table = np.full((n_days, len(self.currencies)), np.nan)
+        table[days - self.first_day, codes] = rates_df['Exchange'].to_numpy(dtype='float64')
+        table[:, self.currencies.index(base_currency)] = 1.0
+
+        self.rate_table = self._forward_fill(table)
+        logger.info(f"Exchange rate table: {n_days} days x {len(self.currencies)} currencies")
+
+    def _forward_fill(self, table: np.ndarray) -> np.ndarray:
+        """
+        Carry the last known rate down each column
+        """
+        rows = np.arange(table.shape[0])[:, None]
+        last_known = np.where(np.isnan(table), 0, rows)
+        np.maximum.accumulate(last_known, axis=0, out=last_known)
+        return table[last_known, np.arange(table.shape[1])]
+
+    def _currency_codes(self, currencies: CurrencyInput, n: int) -> np.ndarray:
+        """
+        Map currency labels to table columns, -1 for unknown currencies
+        """
+        if isinstance(currencies, str):
+            code = self.currencies.index(currencies) if currencies in self.currencies else -1
+            return np.full(n, code, dtype='int64')
+        return pd.Categorical(np.asarray(currencies, dtype=object), categories=self.currencies).codes.astype('int64')
+
+    def rates(self, dates: Union[pd.Series, np.ndarray], currencies: CurrencyInput) -> np.ndarray:
+        """
+        Units of each currency per base unit on each date, in one gather
+
+        Dates after the last quote use the last known rate; dates before the
+        first quote and unknown currencies give NaN.
+        """
+        days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]')
+        valid_day = ~np.isnat(days)
+        offsets = days.astype('int64') - self.first_day
+
+        codes = self._currency_codes(currencies, len(offsets))
+        valid = valid_day & (offsets >= 0) & (codes >= 0)
+
+        rows = np.clip(offsets, 0, self.rate_table.shape[0] - 1)
+        result = self.rate_table[rows, np.maximum(codes, 0)]
+        result[~valid] = np.nan
+        return result
+
+    def convert(self, amounts: Union[pd.Series, np.ndarray], dates: Union[pd.Series, np.ndarray],
+                from_currency: CurrencyInput, to_currency: CurrencyInput) -> np.ndarray:
+        """
+        Convert amounts between currencies at each row's date rate
+        """
+        amounts = np.asarray(amounts, dtype='float64')
+        if isinstance(from_currency, str) and isinstance(to_currency, str) and from_currency == to_currency:
+            return amounts.copy()
+
+        from_rates = self._rates_or_one(dates, from_currency)
+        to_rates = self._rates_or_one(dates, to_currency)
+        return amounts * (to_rates / from_rates)
+
+    def _rates_or_one(self, dates: Union[pd.Series, np.ndarray], currencies: CurrencyInput):
+        if isinstance(currencies, str) and currencies == self.base_currency:
+            return 1.0
+        return self.rates(dates, currencies)
@@ -0,0 +1,130 @@
+"""
+Deduplication Module
+Persistent per-SME row fingerprint index for repeated uploads
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def row_fingerprints(df: pd.DataFrame, key_columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    64-bit hash of each row's key columns
+
+    Columns are taken in sorted name order, and numbers as float64, so the
+    same rows hash alike whatever the column order of the upload or whether
+    a file wrote 1000 or 1000.0. Defaults to every column.
+    """
+    columns = sorted(key_columns if key_columns is not None else df.columns)
+    keys = pd.DataFrame({
+        column: df[column].astype('float64')
+        if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])
+        else df[column]
+        for column in columns
+    })
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype='uint64')
+
+
+class FingerprintIndex:
+    """Sorted uint64 fingerprint array persisted as a .npy file (8 bytes per row)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.fingerprints = np.load(path)
+        else:
+            self.fingerprints = np.array([], dtype='uint64')
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of fingerprints already in the index, by binary search
+        """
+        fingerprints = np.asarray(fingerprints, dtype='uint64')
+        known = self.fingerprints
+        if len(known) == 0:
+            return np.zeros(len(fingerprints), dtype=bool)
+        positions = np.searchsorted(known, fingerprints)
+        return known[np.minimum(positions, len(known) - 1)] == fingerprints
+
+    def add(self, fingerprints: np.ndarray) -> int:
+        """
+        Insert fingerprints and save the index; returns how many were new
+        """
+        with self._lock:
+            before = len(self.fingerprints)
+            self.fingerprints = np.union1d(self.fingerprints, np.asarray(fingerprints, dtype='uint64'))
+            added = len(self.fingerprints) - before
+            if added:
+                self._save()
+        return added
+
+    def matches(self, fingerprints: np.ndarray) -> bool:
+        """
+        True when the index holds exactly these fingerprints
+        """
+        return np.array_equal(self.fingerprints, np.unique(np.asarray(fingerprints, dtype='uint64')))
+
+    def rebuild(self, fingerprints: np.ndarray):
+        """
+        Replace the index with fingerprints, e.g. those of the saved rows
+        """
+        with self._lock:
+            self.fingerprints = np.unique(np.asarray(fingerprints, dtype='uint64'))
+            self._save()
+
+    def _save(self):
+        """
+        Write to a temp file first so readers never see a partial index
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npy"
+        np.save(tmp_path, self.fingerprints)
+        os.replace(tmp_path, self.path)
+
+    def filter_new(self, df: pd.DataFrame, key_columns: Optional[List[str]] = None,
+                   keep_repeats: bool = False) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Rows of df not seen before, and their fingerprints
+
+        Rows repeated within df itself are kept once, or all of them with
+        keep_repeats. The index is not updated; call add() once the rows
+        have been accepted.
+        """
+        fingerprints = row_fingerprints(df, key_columns)
+        new_rows = ~self.contains(fingerprints)
+        if not keep_repeats:
+            first_seen = np.zeros(len(df), dtype=bool)
+            first_seen[np.unique(fingerprints, return_index=True)[1]] = True
+            new_rows &= first_seen
+        return df[new_rows], fingerprints[new_rows]
+
+
+class FingerprintStore:
+    """One fingerprint index per SME under a common directory"""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._indexes: Dict[str, FingerprintIndex] = {}
+        self._lock = threading.Lock()
+
+    def index_for(self, sme_id) -> FingerprintIndex:
+        """
+        Load (once) and return the index for sme_id
+        """
+        key = str(sme_id)
+        with self._lock:
+            if key not in self._indexes:
+                path = os.path.join(self.index_dir, f"sme_{key}.npy")
+                self._indexes[key] = FingerprintIndex(path)
+            return self._indexes[key]
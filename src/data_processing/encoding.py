@@ -0,0 +1,136 @@
+"""
+Encoding Detection Module
+Decides a CSV file's text encoding from a bounded byte sample
+"""
+
+import codecs
+import os
+import threading
+import logging
+from typing import Dict, List, Tuple
+
+from src.data_processing.cache import file_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Byte order marks, longest first so UTF-32 is not mistaken for UTF-16
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Tried in order against the sample; latin-1 decodes any byte so it always matches
+CANDIDATE_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+
+# Encoding used if a full parse still fails after sampling
+FALLBACK_ENCODING = 'latin-1'
+
+# Process-wide memo of detections keyed by file fingerprint
+_detected: Dict[Tuple[str, int, int], Tuple[str, int]] = {}
+_detected_lock = threading.Lock()
+
+
+class EncodingDetector:
+    """Detect text encodings from the head and evenly spaced blocks of a file"""
+
+    def __init__(self, sample_bytes: int = 64 * 1024, blocks: int = 16):
+        self.sample_bytes = sample_bytes
+        self.blocks = blocks
+
+    def detect(self, file_path: str) -> Tuple[str, int]:
+        """
+        Return (encoding, bytes_read) for file_path
+
+        bytes_read is 0 when the answer came from the memo of an unchanged file.
+        """
+        fingerprint = file_fingerprint(file_path)
+        with _detected_lock:
+            if fingerprint in _detected:
+                return _detected[fingerprint][0], 0
+
+        samples = self._read_samples(file_path, fingerprint[1])
+        bytes_read = sum(len(sample) for sample in samples)
+        encoding = self._classify(samples)
+
+        with _detected_lock:
+            _detected[fingerprint] = (encoding, bytes_read)
+
+        logger.info(f"Detected {encoding} for {os.path.basename(file_path)} from {bytes_read} bytes")
+        return encoding, bytes_read
+
+    def remember(self, file_path: str, encoding: str):
+        """
+        Override the memoized encoding, e.g. after a parse needed the fallback
+        """
+        fingerprint = file_fingerprint(file_path)
+        with _detected_lock:
+            bytes_read = _detected.get(fingerprint, (None, 0))[1]
+            _detected[fingerprint] = (encoding, bytes_read)
+
+    def _read_samples(self, file_path: str, file_size: int) -> List[bytes]:
+        """
+        Read the file head plus evenly spaced blocks, within sample_bytes total
+
+        Non-ASCII text often first appears deep into a file, so sampling only
+        the head would miss it.
+        """
+        with open(file_path, 'rb') as f:
+            if file_size <= self.sample_bytes:
+                return [f.read()]
+
+            head_size = self.sample_bytes // 2
+            block_size = max(1, (self.sample_bytes - head_size) // self.blocks)
+            samples = [f.read(head_size)]
+
+            stride = (file_size - head_size) // self.blocks
+            for i in range(1, self.blocks + 1):
+                offset = min(head_size + i * stride - block_size, file_size - block_size)
+                f.seek(max(offset, head_size))
+                samples.append(f.read(block_size))
+
+        return samples
+
+    def _classify(self, samples: List[bytes]) -> str:
+        """
+        Pick the first candidate encoding that decodes every sample
+        """
+        head = samples[0]
+        for bom, encoding in BOMS:
+            if head.startswith(bom):
+                return encoding
+
+        for encoding in CANDIDATE_ENCODINGS:
+            if all(self._decodes(sample, encoding, i > 0) for i, sample in enumerate(samples)):
+                return encoding
+
+        return FALLBACK_ENCODING
+
+    def _decodes(self, sample: bytes, encoding: str, mid_file: bool) -> bool:
+        """
+        Check a sample decodes, tolerating multi-byte characters cut at its edges
+        """
+        if encoding == 'utf-8' and mid_file:
+            # Skip continuation bytes of a character that started before the block
+            start = 0
+            while start < min(3, len(sample)) and 0x80 <= sample[start] <= 0xBF:
+                start += 1
+            sample = sample[start:]
+
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=False)
+            return True
+        except UnicodeDecodeError:
+            return False
+
+
+def clear_detected():
+    """
+    Forget all memoized detections
+    """
+    with _detected_lock:
+        _detected.clear()
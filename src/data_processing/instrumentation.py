@@ -0,0 +1,127 @@
+"""
+Instrumentation Module
+Peak memory measurement and per-stage profiling for pipeline runs
+"""
+
+import time
+import tracemalloc
+import logging
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PeakMemoryTracker:
+    """Context manager recording peak traced allocations (Python and numpy) in a block"""
+    
+    # Open trackers, innermost last; tracemalloc has a single peak counter
+    _active = []
+
+    def __init__(self, label: str = 'block'):
+        self.label = label
+        self.peak_bytes = 0
+        self.net_bytes = 0
+        self._started = False
+        self._nested_peak = 0
+
+    def __enter__(self) -> 'PeakMemoryTracker':
+        # Join an outer trace if one is running instead of stopping it on exit
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        PeakMemoryTracker._active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._nested_peak)
+        self.peak_bytes = max(0, peak - self._baseline)
+        self.net_bytes = current - self._baseline
+        
+        # A nested tracker reset the shared peak, so hand ours to the parent
+        PeakMemoryTracker._active.remove(self)
+        if PeakMemoryTracker._active:
+            parent = PeakMemoryTracker._active[-1]
+            parent._nested_peak = max(parent._nested_peak, peak)
+        
+        if self._started:
+            tracemalloc.stop()
+        return False
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / (1024 * 1024)
+
+    def report(self) -> Dict:
+        """
+        Peak and net memory of the block in bytes
+        """
+        return {
+            'label': self.label,
+            'peak_bytes': self.peak_bytes,
+            'net_bytes': self.net_bytes,
+        }
+
+
+class StageProfiler:
+    """Accumulate wall time, CPU time, row counts and allocations per named stage"""
+
+    def __init__(self, track_memory: bool = False):
+        """
+        With track_memory, each stage also records bytes_allocated, the peak
+        traced allocation above the stage's starting point; tracing slows the
+        pipeline, so it is off by default and bytes_allocated stays None.
+        """
+        self.track_memory = track_memory
+        self.stages: Dict[str, Dict] = {}
+
+    def _totals(self, name: str) -> Dict:
+        return self.stages.setdefault(name, {
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+            'rows_in': 0, 'rows_out': 0, 'bytes_allocated': None,
+        })
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int) -> Iterator[Dict]:
+        """
+        Time a stage; set record['rows_out'] inside the block if rows change
+
+        Repeated stages, e.g. once per chunk, add up into one entry.
+        """
+        record = {'rows_in': int(rows_in), 'rows_out': int(rows_in)}
+        tracker = PeakMemoryTracker(name) if self.track_memory else nullcontext()
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        with tracker as memory:
+            yield record
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+        totals = self._totals(name)
+        totals['calls'] += 1
+        totals['wall_seconds'] += wall
+        totals['cpu_seconds'] += cpu
+        totals['rows_in'] += record['rows_in']
+        totals['rows_out'] += int(record['rows_out'])
+        if memory is not None:
+            totals['bytes_allocated'] = max(totals['bytes_allocated'] or 0, memory.peak_bytes)
+
+    def merge(self, stages: Dict[str, Dict]):
+        """
+        Add stage totals recorded elsewhere, e.g. by a worker process
+        """
+        for name, other in stages.items():
+            totals = self._totals(name)
+            for key in ['calls', 'wall_seconds', 'cpu_seconds', 'rows_in', 'rows_out']:
+                totals[key] += other[key]
+            if other['bytes_allocated'] is not None:
+                totals['bytes_allocated'] = max(totals['bytes_allocated'] or 0, other['bytes_allocated'])
+
+    def report(self) -> List[Dict]:
+        """
+        One flat numeric record per stage, in execution order
+        """
+        return [{'stage': name, **totals} for name, totals in self.stages.items()]
@@ -5,105 +5,195 @@ Handles loading CSV, XLSX, and PDF files
 
 import pandas as pd
 import os
-from typing import Tuple, Optional, Dict
+import time
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Dict, Callable, Iterator, List
 import logging
 
+from src.data_processing.cache import DatasetCache
+from src.data_processing.schema import SchemaRegistry, DATE_FORMAT
+from src.data_processing.encoding import EncodingDetector, FALLBACK_ENCODING
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maven Global Electronics Retailer files by dataset key
+MAVEN_FILES = {
+    'sales': 'Sales.csv',
+    'products': 'Products.csv',
+    'stores': 'Stores.csv',
+    'customers': 'Customers.csv',
+    'exchange_rates': 'Exchange_Rates.csv',
+    'data_dictionary': 'Data_Dictionary.csv'
+}
+
+# Date columns parsed even when the data dictionary does not declare them
+DATE_COLUMNS = ['Order Date', 'Delivery Date', 'Birthday', 'Date', 'Open Date']
+
 
 class DataLoader:
     """Load and validate financial data from various sources"""
     
-    def __init__(self, data_dir: str = r"C:\Users\Bindu\Downloads\HCl AIML project\financial-health-platform\data"):
+    def __init__(self, data_dir: str = r"C:\Users\Bindu\Downloads\HCl AIML project\financial-health-platform\data",
+                 use_cache: bool = True, cache_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None):
         self.data_dir = data_dir
         self.raw_dir = os.path.join(data_dir, "raw")
         self.benchmarks_dir = os.path.join(data_dir, "benchmarks")
+        self.max_workers = max_workers
+        
+        # Parsed frames are cached next to the raw data unless disabled
+        self.cache = None
+        if use_cache:
+            self.cache = DatasetCache(cache_dir or os.path.join(data_dir, "cache"))
+        
+        # Declared dtypes for the Maven datasets
+        self.schemas = SchemaRegistry(os.path.join(self.raw_dir, "Data_Dictionary.csv"))
+        
+        # One encoding decision per file version, shared by every load_* method
+        self.encoding_detector = EncodingDetector()
+        self.load_stats = {}
+    
+    def _read_csv(self, dataset: str, file_path: str, encoding: str,
+                  date_errors: str = 'coerce') -> pd.DataFrame:
+        """
+        Read a CSV with the dataset's declared dtypes and parse its dates
+        """
+        schema = self.schemas.get(dataset)
         
-    def load_maven_data(self) -> Dict[str, pd.DataFrame]:
+        if schema is None:
+            df = pd.read_csv(file_path, encoding=encoding)
+        else:
+            try:
+                df = pd.read_csv(file_path, encoding=encoding, dtype=schema.read_csv_dtypes())
+            except UnicodeDecodeError:
+                raise
+            except ValueError as e:
+                # Integer columns with gaps cannot be int32; retry with nullable ints
+                logger.warning(f"Falling back to nullable integers for {dataset}: {e}")
+                df = pd.read_csv(file_path, encoding=encoding,
+                                 dtype=schema.read_csv_dtypes(nullable_ints=True))
+        
+        return self._parse_frame(dataset, df, date_errors)
+    
+    def _parse_frame(self, dataset: str, df: pd.DataFrame, date_errors: str = 'coerce') -> pd.DataFrame:
+        """
+        Apply the dataset's date and currency parsing to a freshly read frame
+        """
+        schema = self.schemas.get(dataset)
+        if schema is not None:
+            df = schema.parse(df, date_errors=date_errors)
+        
+        for col in DATE_COLUMNS:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], format=DATE_FORMAT, errors=date_errors)
+        
+        return df
+    
+    def _load_dataset(self, dataset: str, filename: str, date_errors: str = 'coerce') -> pd.DataFrame:
+        """
+        Load one raw CSV: cache lookup, encoding detection, then a single parse
+        """
+        file_path = os.path.join(self.raw_dir, filename)
+        logger.info(f"Loading {dataset} data from {file_path}")
+        
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        
+        # Strict date parsing is cached separately from the coercing variant
+        cache_key = dataset if date_errors == 'coerce' else f"{dataset}_{date_errors}"
+        stats = {'file': filename, 'encoding': None, 'encoding_bytes_read': 0, 'from_cache': False}
+        self.load_stats[dataset] = stats
+        
+        schema = self.schemas.get(dataset)
+        schema_version = schema.fingerprint() if schema is not None else ''
+        
+        if self.cache is not None:
+            df = self.cache.get(cache_key, file_path, schema_version)
+            if df is not None:
+                stats.update({'from_cache': True, 'rows': len(df)})
+                return df
+        
+        encoding, bytes_read = self.encoding_detector.detect(file_path)
+        stats.update({'encoding': encoding, 'encoding_bytes_read': bytes_read})
+        
+        try:
+            df = self._read_csv(dataset, file_path, encoding, date_errors=date_errors)
+        except UnicodeDecodeError:
+            # The sample missed a byte the full file contains; parse once more
+            logger.warning(f"{filename} is not valid {encoding}, retrying with {FALLBACK_ENCODING}")
+            df = self._read_csv(dataset, file_path, FALLBACK_ENCODING, date_errors=date_errors)
+            self.encoding_detector.remember(file_path, FALLBACK_ENCODING)
+            stats['encoding'] = FALLBACK_ENCODING
+        
+        if self.cache is not None:
+            self.cache.put(cache_key, file_path, df, schema_version)
+        
+        stats['rows'] = len(df)
+        return df
+        
+    def _load_timed(self, dataset: str, filename: str) -> pd.DataFrame:
+        """
+        Load a dataset and record its wall-clock load time in load_stats
+        """
+        start = time.perf_counter()
+        try:
+            return self._load_dataset(dataset, filename)
+        finally:
+            self.load_stats.setdefault(dataset, {})['load_seconds'] = time.perf_counter() - start
+    
+    def _load_or_none(self, dataset: str, filename: str, load: Callable[[], pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """
+        Run a load, logging and returning None for missing or unreadable files
+        """
+        try:
+            df = load()
+            logger.info(f"Loaded {len(df)} records from {dataset}")
+            return df
+        except FileNotFoundError:
+            logger.warning(f"File not found: {os.path.join(self.raw_dir, filename)} - Skipping {dataset}")
+        except Exception as e:
+            logger.error(f"Error loading {dataset}: {e}")
+        return None
+        
+    def open_maven_data(self) -> 'LazyMavenData':
+        """
+        Return a lazy mapping of the Maven datasets
+        Each dataset is parsed on first access and memoized
+        """
+        return LazyMavenData(self, MAVEN_FILES)
+        
+    def load_maven_data(self, parallel: bool = False, max_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """
         Load Maven Global Electronics Retailer datasets
+        With parallel=True the files are read and date-parsed on a thread pool
         Returns: Dictionary with all Maven dataframes
         """
         try:
-            maven_files = {
-                'sales': 'Sales.csv',
-                'products': 'Products.csv',
-                'stores': 'Stores.csv',
-                'customers': 'Customers.csv',
-                'exchange_rates': 'Exchange_Rates.csv',
-                'data_dictionary': 'Data_Dictionary.csv'
-            }
-            
-            maven_data = {}
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
+            start = time.perf_counter()
+            maven_data = self.open_maven_data().prefetch(parallel=parallel, max_workers=max_workers)
             
-            for key, filename in maven_files.items():
-                file_path = os.path.join(self.raw_dir, filename)
-                logger.info(f"Loading {key} data from {file_path}")
-                
-                try:
-                    df = None
-                    # Try different encodings
-                    for encoding in encodings:
-                        try:
-                            df = pd.read_csv(file_path, encoding=encoding)
-                            break
-                        except UnicodeDecodeError:
-                            continue
-                    
-                    if df is None:
-                        logger.warning(f"Could not load {key} with any encoding")
-                        maven_data[key] = None
-                        continue
-                    
-                    # Convert date columns if present
-                    date_columns = ['Order Date', 'Delivery Date', 'Birthday', 'Date', 'Open Date']
-                    for col in date_columns:
-                        if col in df.columns:
-                            df[col] = pd.to_datetime(df[col], errors='coerce')
-                    
-                    maven_data[key] = df
-                    logger.info(f"Loaded {len(df)} records from {key}")
-                    
-                except FileNotFoundError:
-                    logger.warning(f"File not found: {file_path} - Skipping {key}")
-                    maven_data[key] = None
-                except Exception as e:
-                    logger.error(f"Error loading {key}: {e}")
-                    maven_data[key] = None
-            
-            logger.info(f"Successfully loaded {sum(1 for v in maven_data.values() if v is not None)} Maven datasets")
+            elapsed = time.perf_counter() - start
+            logger.info(f"Successfully loaded {sum(1 for v in maven_data.values() if v is not None)} Maven datasets "
+                        f"in {elapsed:.2f}s")
             return maven_data
             
         except Exception as e:
             logger.error(f"Error loading Maven data: {e}")
             raise
     
+    def get_load_report(self) -> Dict:
+        """
+        Get per-file encoding, cache and timing details for the last loads
+        """
+        return self.load_stats
+    
     def load_sales_data(self) -> pd.DataFrame:
         """Load Sales.csv specifically"""
         try:
-            sales_path = os.path.join(self.raw_dir, "Sales.csv")
-            logger.info(f"Loading sales data from {sales_path}")
-            
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            sales_df = None
-            
-            for encoding in encodings:
-                try:
-                    sales_df = pd.read_csv(sales_path, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if sales_df is None:
-                raise Exception("Could not load sales file with any encoding")
-            
-            if 'Order Date' in sales_df.columns:
-                sales_df['Order Date'] = pd.to_datetime(sales_df['Order Date'])
-            if 'Delivery Date' in sales_df.columns:
-                sales_df['Delivery Date'] = pd.to_datetime(sales_df['Delivery Date'])
-            
+            sales_df = self._load_dataset('sales', "Sales.csv", date_errors='raise')
             logger.info(f"Loaded {len(sales_df)} sales records")
             return sales_df
             
@@ -114,25 +204,71 @@ class DataLoader:
             logger.error(f"Error loading sales data: {e}")
             raise
     
+    def iter_sales_chunks(self, chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream Sales.csv as typed, date-parsed chunks of at most chunksize rows
+        """
+        sales_path = os.path.join(self.raw_dir, "Sales.csv")
+        logger.info(f"Streaming sales data from {sales_path} in chunks of {chunksize}")
+        
+        encoding, bytes_read = self.encoding_detector.detect(sales_path)
+        self.load_stats['sales_stream'] = {'file': "Sales.csv", 'encoding': encoding,
+                                           'encoding_bytes_read': bytes_read, 'chunks': 0, 'rows': 0}
+        
+        schema = self.schemas.get('sales')
+        dtype = schema.read_csv_dtypes() if schema is not None else None
+        
+        with pd.read_csv(sales_path, encoding=encoding, dtype=dtype, chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk = self._parse_frame('sales', chunk, date_errors='coerce')
+                self.load_stats['sales_stream']['chunks'] += 1
+                self.load_stats['sales_stream']['rows'] += len(chunk)
+                yield chunk
+    
+    def iter_sales_by_month(self, chunksize: int = 100000) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Stream Sales.csv as (period, frame) month partitions keyed by Order Date
+        
+        A month is emitted once a later month has been read, so with the file
+        in order-date order at most one month plus one chunk is held in memory.
+        If a month reappears later in the file it is yielded again as an extra
+        partition; consumers should treat partitions of a period additively.
+        Rows without a valid Order Date are skipped.
+        """
+        pending: Dict[int, List[pd.DataFrame]] = {}
+        
+        for chunk in self.iter_sales_chunks(chunksize):
+            month_keys = chunk['Order Date'].values.astype('datetime64[M]').astype('int64')
+            valid = ~chunk['Order Date'].isna().values
+            if not valid.all():
+                logger.warning(f"Skipping {int((~valid).sum())} sales rows without an Order Date")
+                chunk, month_keys = chunk[valid], month_keys[valid]
+            if len(chunk) == 0:
+                continue
+            
+            for month_key, part in chunk.groupby(month_keys, sort=True):
+                pending.setdefault(int(month_key), []).append(part)
+            
+            # Every month before the chunk's last row is complete in an ordered file
+            current = int(month_keys[-1])
+            for month_key in sorted(k for k in pending if k < current):
+                yield self._month_partition(month_key, pending.pop(month_key))
+        
+        for month_key in sorted(pending):
+            yield self._month_partition(month_key, pending.pop(month_key))
+    
+    def _month_partition(self, month_key: int, parts: List[pd.DataFrame]) -> Tuple[str, pd.DataFrame]:
+        """
+        Build a (YYYY-MM, frame) partition from months-since-epoch and its parts
+        """
+        period = f"{1970 + month_key // 12}-{month_key % 12 + 1:02d}"
+        df = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+        return period, df
+    
     def load_products_data(self) -> pd.DataFrame:
         """Load Products.csv specifically"""
         try:
-            products_path = os.path.join(self.raw_dir, "Products.csv")
-            logger.info(f"Loading products data from {products_path}")
-            
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            products_df = None
-            
-            for encoding in encodings:
-                try:
-                    products_df = pd.read_csv(products_path, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if products_df is None:
-                raise Exception("Could not load products file with any encoding")
-            
+            products_df = self._load_dataset('products', "Products.csv")
             logger.info(f"Loaded {len(products_df)} product records")
             return products_df
             
@@ -146,27 +282,7 @@ class DataLoader:
     def load_customers_data(self) -> pd.DataFrame:
         """Load Customers.csv specifically"""
         try:
-            customers_path = os.path.join(self.raw_dir, "Customers.csv")
-            logger.info(f"Loading customers data from {customers_path}")
-            
-            # Try different encodings for special characters
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            customers_df = None
-            
-            for encoding in encodings:
-                try:
-                    customers_df = pd.read_csv(customers_path, encoding=encoding)
-                    logger.info(f"Successfully loaded with {encoding} encoding")
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if customers_df is None:
-                raise Exception("Could not load file with any encoding")
-            
-            if 'Birthday' in customers_df.columns:
-                customers_df['Birthday'] = pd.to_datetime(customers_df['Birthday'], errors='coerce')
-            
+            customers_df = self._load_dataset('customers', "Customers.csv")
             logger.info(f"Loaded {len(customers_df)} customer records")
             return customers_df
             
@@ -180,25 +296,7 @@ class DataLoader:
     def load_stores_data(self) -> pd.DataFrame:
         """Load Stores.csv specifically"""
         try:
-            stores_path = os.path.join(self.raw_dir, "Stores.csv")
-            logger.info(f"Loading stores data from {stores_path}")
-            
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            stores_df = None
-            
-            for encoding in encodings:
-                try:
-                    stores_df = pd.read_csv(stores_path, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if stores_df is None:
-                raise Exception("Could not load stores file with any encoding")
-            
-            if 'Open Date' in stores_df.columns:
-                stores_df['Open Date'] = pd.to_datetime(stores_df['Open Date'], errors='coerce')
-            
+            stores_df = self._load_dataset('stores', "Stores.csv")
             logger.info(f"Loaded {len(stores_df)} store records")
             return stores_df
             
@@ -212,25 +310,7 @@ class DataLoader:
     def load_exchange_rates_data(self) -> pd.DataFrame:
         """Load Exchange_Rates.csv specifically"""
         try:
-            exchange_path = os.path.join(self.raw_dir, "Exchange_Rates.csv")
-            logger.info(f"Loading exchange rates data from {exchange_path}")
-            
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            exchange_df = None
-            
-            for encoding in encodings:
-                try:
-                    exchange_df = pd.read_csv(exchange_path, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if exchange_df is None:
-                raise Exception("Could not load exchange rates file with any encoding")
-            
-            if 'Date' in exchange_df.columns:
-                exchange_df['Date'] = pd.to_datetime(exchange_df['Date'], errors='coerce')
-            
+            exchange_df = self._load_dataset('exchange_rates', "Exchange_Rates.csv")
             logger.info(f"Loaded {len(exchange_df)} exchange rate records")
             return exchange_df
             
@@ -247,23 +327,7 @@ class DataLoader:
         Returns: sme_df
         """
         try:
-            sme_path = os.path.join(self.raw_dir, "sme_financial_decision.csv")
-            
-            logger.info(f"Loading SME data from {sme_path}")
-            
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            sme_df = None
-            
-            for encoding in encodings:
-                try:
-                    sme_df = pd.read_csv(sme_path, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if sme_df is None:
-                raise Exception("Could not load SME file with any encoding")
-            
+            sme_df = self._load_dataset('sme', "sme_financial_decision.csv")
             logger.info(f"Loaded {len(sme_df)} SME records")
             return sme_df
             
@@ -340,10 +404,7 @@ class DataLoader:
         
         try:
             # Check Maven files
-            maven_files = ['Sales.csv', 'Products.csv', 'Stores.csv', 
-                          'Customers.csv', 'Exchange_Rates.csv', 'Data_Dictionary.csv']
-            
-            for filename in maven_files:
+            for filename in MAVEN_FILES.values():
                 file_path = os.path.join(self.raw_dir, filename)
                 if os.path.exists(file_path):
                     file_size = os.path.getsize(file_path)
@@ -384,6 +445,50 @@ class DataLoader:
             return summary
 
 
+
+class LazyMavenData(Mapping):
+    """Read-only mapping of Maven datasets, parsed on first access"""
+    
+    def __init__(self, loader: DataLoader, files: Dict[str, str]):
+        self._loader = loader
+        self._files = dict(files)
+        self._loaded: Dict[str, Optional[pd.DataFrame]] = {}
+        self._locks = {key: threading.Lock() for key in self._files}
+    
+    def __getitem__(self, key: str) -> Optional[pd.DataFrame]:
+        if key not in self._files:
+            raise KeyError(key)
+        if key not in self._loaded:
+            # Concurrent first accesses parse the file only once
+            with self._locks[key]:
+                if key not in self._loaded:
+                    filename = self._files[key]
+                    self._loaded[key] = self._loader._load_or_none(
+                        key, filename, lambda: self._loader._load_timed(key, filename))
+        return self._loaded[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files)
+    
+    def __len__(self) -> int:
+        return len(self._files)
+    
+    def is_loaded(self, key: str) -> bool:
+        return key in self._loaded
+    
+    def prefetch(self, parallel: bool = False, max_workers: Optional[int] = None) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Load every dataset not yet accessed and return them all as a dict
+        """
+        pending = [key for key in self._files if key not in self._loaded]
+        
+        if parallel and len(pending) > 1:
+            workers = max_workers or self._loader.max_workers or len(pending)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(self.__getitem__, pending))
+        
+        return {key: self[key] for key in self._files}
+
 # Example usage
 if __name__ == "__main__":
     loader = DataLoader()
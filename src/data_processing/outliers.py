@@ -0,0 +1,194 @@
+"""
+Outlier Detection Module
+Streaming revenue outlier flags from mergeable relative-error quantile sketches
+"""
+
+import pandas as pd
+import numpy as np
+import math
+import logging
+from typing import Dict, Hashable, Optional, Union
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with a relative error guarantee (DDSketch)"""
+
+    def __init__(self, relative_accuracy: float = 0.005):
+        """
+        Every value x != 0 is counted in bucket ceil(log_gamma(|x|)), with
+        gamma = (1 + alpha) / (1 - alpha), and is estimated back as the bucket
+        midpoint 2 * gamma**i / (gamma + 1), so any order statistic comes back
+        within relative error alpha. Sketches with the same alpha merge by
+        adding bucket counts, giving exactly the sketch of the combined stream.
+        Size grows with log(max / min value) / alpha, not with the row count.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values: Union[pd.Series, np.ndarray]):
+        """
+        Add a batch of values, ignoring NaN
+        """
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.zero_count += int((values == 0).sum())
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+
+    def _bucket_indices(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self.log_gamma).astype('int64')
+
+    def _add(self, store: Dict[int, int], magnitudes: np.ndarray):
+        if len(magnitudes) == 0:
+            return
+        indices, counts = np.unique(self._bucket_indices(magnitudes), return_counts=True)
+        self._add_counts(store, indices, counts)
+
+    def _add_counts(self, store: Dict[int, int], indices: np.ndarray, counts: np.ndarray):
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            store[index] = store.get(index, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Fold another sketch's counts into this one
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative_accuracy")
+        for store, other_store in [(self.positive, other.positive), (self.negative, other.negative)]:
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _estimate(self, indices: np.ndarray) -> np.ndarray:
+        return 2 * np.power(self.gamma, indices.astype('float64')) / (self.gamma + 1)
+
+    def _sorted_buckets(self):
+        """
+        Bucket value estimates in ascending order with their counts
+        """
+        neg_idx = np.array(sorted(self.negative, reverse=True), dtype='int64')
+        pos_idx = np.array(sorted(self.positive), dtype='int64')
+        values = np.concatenate([-self._estimate(neg_idx), [0.0], self._estimate(pos_idx)])
+        counts = np.concatenate([
+            [self.negative[i] for i in neg_idx.tolist()],
+            [self.zero_count],
+            [self.positive[i] for i in pos_idx.tolist()],
+        ]).astype('int64')
+        return values, counts
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-quantile, interpolating between order statistics like pandas
+
+        The result is within relative error alpha of the exact
+        Series.quantile(q) when the bracketing order statistics share a sign.
+        """
+        if self.count == 0:
+            return float('nan')
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+
+        values, counts = self._sorted_buckets()
+        cumulative = np.cumsum(counts)
+        rank = q * (self.count - 1)
+        lower, upper = math.floor(rank), math.ceil(rank)
+
+        lower_value, upper_value = values[np.searchsorted(cumulative, [lower, upper], side='right')]
+        return float(lower_value + (upper_value - lower_value) * (rank - lower))
+
+
+class OutlierDetector:
+    """Flag rows whose value exceeds a streaming quantile, globally or per group"""
+
+    def __init__(self, quantile: float = 0.99, value_column: str = 'revenue',
+                 group_by: Optional[str] = None,
+                 group_quantiles: Optional[Dict[Hashable, float]] = None,
+                 relative_accuracy: float = 0.005):
+        """
+        group_by names a column such as 'StoreKey' to get one threshold per
+        group; group_quantiles overrides the quantile for particular groups.
+        Rows in groups never seen by update() fall back to the global threshold.
+        """
+        self.quantile = quantile
+        self.value_column = value_column
+        self.group_by = group_by
+        self.group_quantiles = group_quantiles or {}
+        self.relative_accuracy = relative_accuracy
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.group_sketches: Dict[Hashable, QuantileSketch] = {}
+
+    def spawn(self) -> 'OutlierDetector':
+        """
+        Empty detector with the same settings, e.g. for one partition
+        """
+        return OutlierDetector(self.quantile, self.value_column, self.group_by,
+                               self.group_quantiles, self.relative_accuracy)
+
+    def update(self, df: pd.DataFrame) -> 'OutlierDetector':
+        """
+        Add a chunk of rows to the global and per-group sketches
+        """
+        values = df[self.value_column].to_numpy(dtype='float64')
+        self.sketch.update(values)
+
+        if self.group_by is not None:
+            codes, groups = pd.factorize(df[self.group_by])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+            for code, group in enumerate(groups):
+                sketch = self.group_sketches.setdefault(group, QuantileSketch(self.relative_accuracy))
+                sketch.update(values[order[bounds[code]:bounds[code + 1]]])
+
+        return self
+
+    def merge(self, other: 'OutlierDetector') -> 'OutlierDetector':
+        """
+        Fold a detector built over another chunk or partition into this one
+        """
+        self.sketch.merge(other.sketch)
+        for group, sketch in other.group_sketches.items():
+            if group in self.group_sketches:
+                self.group_sketches[group].merge(sketch)
+            else:
+                self.group_sketches[group] = QuantileSketch(self.relative_accuracy).merge(sketch)
+        return self
+
+    def threshold(self) -> float:
+        """
+        Global outlier threshold
+        """
+        return self.sketch.quantile(self.quantile)
+
+    def thresholds(self) -> Dict[Hashable, float]:
+        """
+        Outlier threshold for each group seen so far
+        """
+        return {
+            group: sketch.quantile(self.group_quantiles.get(group, self.quantile))
+            for group, sketch in self.group_sketches.items()
+        }
+
+    def flag(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Boolean outlier mask for df against the current thresholds
+        """
+        values = df[self.value_column].to_numpy(dtype='float64')
+        if self.group_by is None:
+            return values > self.threshold()
+
+        limits = df[self.group_by].map(self.thresholds()).to_numpy(dtype='float64')
+        limits = np.where(np.isnan(limits), self.threshold(), limits)
+        return values > limits
@@ -0,0 +1,145 @@
+"""
+Product Pricing Module
+Cleaned product price table, built once per catalog and indexed by ProductKey
+"""
+
+import pandas as pd
+import numpy as np
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Tuple
+
+from src.data_processing.schema import parse_currency
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMN = 'Unit Price USD'
+COST_COLUMN = 'Unit Cost USD'
+
+# Dense key-indexed arrays are used up to this many slots per priced product
+# (or MIN_DENSE_SIZE slots, whichever is larger); sparser catalogs fall back
+# to a sorted-key lookup
+MAX_SLOTS_PER_PRODUCT = 8
+MIN_DENSE_SIZE = 4096
+
+# Process-wide memo of built tables keyed by catalog content fingerprint,
+# least recently used first; a long-running backend sees many catalogs
+MAX_PRICE_TABLES = 8
+_tables: 'OrderedDict[str, ProductPriceTable]' = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def catalog_fingerprint(products_df: pd.DataFrame) -> str:
+    """
+    Hash the key, price and cost columns of a product catalog
+    """
+    columns = products_df[['ProductKey', PRICE_COLUMN, COST_COLUMN]]
+    row_hashes = pd.util.hash_pandas_object(columns, index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+
+class ProductPriceTable:
+    """Unit price and cost arrays where position i holds ProductKey i (sorted keys when sparse)"""
+
+    def __init__(self, products_df: pd.DataFrame):
+        """
+        Clean the price columns and scatter valid products into dense arrays
+
+        Products with a missing or non-positive price or cost are left out, so
+        their keys gather as NaN. If a ProductKey repeats, its first row wins.
+        When the keys are too sparse for a dense array (a stray huge key would
+        allocate gigabytes), prices are kept against the sorted keys instead
+        and looked up by binary search.
+        """
+        prices = parse_currency(products_df[PRICE_COLUMN]).to_numpy()
+        costs = parse_currency(products_df[COST_COLUMN]).to_numpy()
+        keys = pd.to_numeric(products_df['ProductKey'], errors='coerce').to_numpy(dtype='float64')
+
+        valid = (prices > 0) & (costs > 0) & (keys >= 0) & (keys == np.floor(keys))
+        keys = keys[valid].astype('int64')
+        prices, costs = prices[valid], costs[valid]
+        keys, first = np.unique(keys, return_index=True)
+        self.n_products = len(keys)
+
+        size = int(keys.max()) + 1 if len(keys) else 0
+        if size <= max(MIN_DENSE_SIZE, MAX_SLOTS_PER_PRODUCT * len(keys)):
+            self.keys = None
+            self.prices = np.full(size, np.nan)
+            self.costs = np.full(size, np.nan)
+            self.prices[keys] = prices[first]
+            self.costs[keys] = costs[first]
+        else:
+            logger.info(f"ProductKey range {size} too sparse for {len(keys)} products, using sorted lookup")
+            self.keys = keys
+            self.prices = prices[first]
+            self.costs = costs[first]
+
+        logger.info(f"Products with valid pricing: {self.n_products}/{len(products_df)}")
+
+    def gather(self, product_keys) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (price, cost) arrays for each key, NaN where a key has no price
+        """
+        keys = np.asarray(product_keys)
+        if self.keys is not None:
+            return self._gather_sorted(keys)
+
+        in_range = (keys >= 0) & (keys < len(self.prices))
+        if not np.issubdtype(keys.dtype, np.integer):
+            in_range &= keys == np.floor(keys)
+        positions = np.where(in_range, keys, 0).astype('int64', copy=False)
+
+        if len(self.prices) == 0:
+            return np.full(len(keys), np.nan), np.full(len(keys), np.nan)
+        prices = self.prices[positions]
+        costs = self.costs[positions]
+        prices[~in_range] = np.nan
+        costs[~in_range] = np.nan
+        return prices, costs
+
+    def _gather_sorted(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sparse-table gather: binary search each key among the sorted keys
+        """
+        whole = keys >= 0
+        if not np.issubdtype(keys.dtype, np.integer):
+            whole &= keys == np.floor(keys)
+        lookup = np.where(whole, keys, -1).astype('int64', copy=False)
+
+        positions = np.minimum(np.searchsorted(self.keys, lookup), len(self.keys) - 1)
+        found = whole & (self.keys[positions] == lookup)
+        return np.where(found, self.prices[positions], np.nan), np.where(found, self.costs[positions], np.nan)
+
+
+def get_price_table(products_df: pd.DataFrame) -> ProductPriceTable:
+    """
+    Return the price table for a catalog, building it only on first sight
+
+    At most MAX_PRICE_TABLES catalogs are kept; the least recently used one
+    is dropped to make room.
+    """
+    fingerprint = catalog_fingerprint(products_df)
+    with _tables_lock:
+        table = _tables.get(fingerprint)
+        if table is not None:
+            _tables.move_to_end(fingerprint)
+            return table
+
+    table = ProductPriceTable(products_df)
+    with _tables_lock:
+        table = _tables.setdefault(fingerprint, table)
+        _tables.move_to_end(fingerprint)
+        while len(_tables) > MAX_PRICE_TABLES:
+            _tables.popitem(last=False)
+        return table
+
+
+def clear_price_tables():
+    """
+    Forget all memoized price tables
+    """
+    with _tables_lock:
+        _tables.clear()
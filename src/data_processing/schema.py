@@ -0,0 +1,190 @@
+"""
+Dataset Schema Module
+Declared column types for the Maven datasets, applied at parse time
+"""
+
+import pandas as pd
+import os
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# All Maven date columns use month/day/year without zero padding
+DATE_FORMAT = '%m/%d/%Y'
+
+# Column kinds understood by DatasetSchema
+KIND_DTYPES = {
+    'key': 'int32',
+    'int': 'int32',
+    'float': 'float32',
+    'money': 'float64',
+    'category': 'category',
+    'text': 'object',
+}
+
+# Data_Dictionary.csv table names mapped to DataLoader dataset keys
+DICTIONARY_TABLES = {
+    'Sales': 'sales',
+    'Customers': 'customers',
+    'Products': 'products',
+    'Stores': 'stores',
+    'Exchange Rates': 'exchange_rates',
+}
+
+# Explicit overrides on top of the kinds inferred from the data dictionary.
+# Currency amounts stay float64: float32 cannot hold cent precision once
+# multiplied out into monthly revenue totals.
+SCHEMA_OVERRIDES = {
+    'sales': {
+        'Order Number': 'key',
+        'Line Item': 'int',
+        'Quantity': 'int',
+    },
+    'customers': {
+        'Name': 'text',
+        'City': 'text',
+        'Zip Code': 'text',
+    },
+    'products': {
+        'Product Name': 'text',
+        'Unit Cost USD': 'currency',
+        'Unit Price USD': 'currency',
+    },
+    'stores': {
+        'Square Meters': 'float',
+    },
+    'exchange_rates': {
+        'Exchange': 'money',
+    },
+}
+
+
+def parse_currency(series: pd.Series) -> pd.Series:
+    """
+    Convert "$1,234.50 " style strings to float64
+    """
+    if series.dtype != 'object':
+        return pd.to_numeric(series, errors='coerce').astype('float64')
+    cleaned = series.str.replace('$', '', regex=False).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors='coerce').astype('float64')
+
+
+def infer_kind(field: str, description: str) -> str:
+    """
+    Infer a column kind from its data dictionary entry
+    """
+    description = str(description).lower()
+    if field == 'Birthday' or 'date' in field.lower():
+        return 'date'
+    if field.endswith('Key'):
+        return 'key'
+    if 'USD' in field:
+        return 'currency'
+    if 'number of' in description:
+        return 'int'
+    return 'category'
+
+
+class DatasetSchema:
+    """Declared column kinds for one dataset"""
+
+    def __init__(self, name: str, columns: Dict[str, str]):
+        self.name = name
+        self.columns = dict(columns)
+
+    def columns_of_kind(self, *kinds: str) -> List[str]:
+        return [col for col, kind in self.columns.items() if kind in kinds]
+
+    @property
+    def date_columns(self) -> List[str]:
+        return self.columns_of_kind('date')
+
+    def read_csv_dtypes(self, nullable_ints: bool = False) -> Dict[str, str]:
+        """
+        Build the dtype mapping passed to pd.read_csv
+
+        Dates and currency strings are read as text and converted in parse().
+        With nullable_ints, integer columns use pandas' Int32 so missing values
+        do not abort the parse.
+        """
+        dtypes = {}
+        for col, kind in self.columns.items():
+            if kind in ('date', 'currency'):
+                dtypes[col] = 'object'
+            elif kind in ('key', 'int') and nullable_ints:
+                dtypes[col] = 'Int32'
+            else:
+                dtypes[col] = KIND_DTYPES[kind]
+        return dtypes
+
+    def fingerprint(self) -> str:
+        """
+        Short hash of the declared kinds and the dtypes they resolve to
+
+        Frames cached under one fingerprint were parsed with those types, so
+        editing SCHEMA_OVERRIDES, KIND_DTYPES, DATE_FORMAT or the data
+        dictionary changes it.
+        """
+        declaration = repr((self.name, sorted(self.columns.items()),
+                            sorted(self.read_csv_dtypes().items()), DATE_FORMAT))
+        return hashlib.sha1(declaration.encode('utf-8')).hexdigest()[:16]
+
+    def parse(self, df: pd.DataFrame, date_errors: str = 'coerce') -> pd.DataFrame:
+        """
+        Convert date and currency columns of a freshly read frame in place
+        """
+        for col in self.date_columns:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], format=DATE_FORMAT, errors=date_errors)
+        for col in self.columns_of_kind('currency'):
+            if col in df.columns:
+                df[col] = parse_currency(df[col])
+        return df
+
+
+class SchemaRegistry:
+    """Registry of dataset schemas seeded from Data_Dictionary.csv"""
+
+    def __init__(self, dictionary_path: Optional[str] = None,
+                 overrides: Optional[Dict[str, Dict[str, str]]] = None):
+        self.schemas: Dict[str, DatasetSchema] = {}
+        columns = self._load_dictionary(dictionary_path)
+
+        for dataset, dataset_overrides in (overrides if overrides is not None else SCHEMA_OVERRIDES).items():
+            columns.setdefault(dataset, {}).update(dataset_overrides)
+
+        for dataset, dataset_columns in columns.items():
+            self.schemas[dataset] = DatasetSchema(dataset, dataset_columns)
+
+    def _load_dictionary(self, dictionary_path: Optional[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Read column kinds per dataset from the data dictionary
+        """
+        columns: Dict[str, Dict[str, str]] = {}
+        if not dictionary_path or not os.path.exists(dictionary_path):
+            if dictionary_path:
+                logger.warning(f"Data dictionary not found at {dictionary_path}, using overrides only")
+            return columns
+
+        try:
+            dictionary = pd.read_csv(dictionary_path, encoding='utf-8-sig')
+        except Exception as e:
+            logger.warning(f"Could not read data dictionary: {e}")
+            return columns
+
+        for row in dictionary.itertuples(index=False):
+            dataset = DICTIONARY_TABLES.get(row.Table)
+            if dataset is None:
+                continue
+            columns.setdefault(dataset, {})[row.Field] = infer_kind(row.Field, row.Description)
+
+        return columns
+
+    def get(self, dataset: str) -> Optional[DatasetSchema]:
+        return self.schemas.get(dataset)
+
+    def register(self, schema: DatasetSchema):
+        self.schemas[schema.name] = schema
@@ -0,0 +1,143 @@
+"""
+SME Survey Normalization Module
+Median imputation and max-scaling of risk factor columns as one 2-D block
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import os
+import warnings
+import logging
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Substrings marking risk factor columns in the SME survey
+RISK_MARKERS = ['FL', 'FR', 'RA', 'MDA', 'FDM', 'FA']
+
+
+def risk_columns(columns) -> List[str]:
+    """
+    Survey columns holding risk factor answers
+    """
+    return [col for col in columns if any(marker in col for marker in RISK_MARKERS)]
+
+
+class SMERiskNormalizer:
+    """Fitted medians and scales for the SME risk factor block"""
+
+    def __init__(self, columns: Optional[List[str]] = None,
+                 medians: Optional[Dict[str, float]] = None,
+                 scales: Optional[Dict[str, float]] = None):
+        self.columns = list(columns or [])
+        self.medians = np.array([medians[col] for col in self.columns], dtype='float64') if medians else None
+        self.scales = np.array([scales[col] for col in self.columns], dtype='float64') if scales else None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.medians is not None
+
+    def coerce(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Risk columns as one float64 (rows x columns) array, non-numbers as NaN
+
+        Numeric columns are copied in one block; only text columns need
+        pd.to_numeric.
+        """
+        if not self.is_fitted:
+            self.columns = risk_columns(df.columns)
+
+        block = np.empty((len(df), len(self.columns)), dtype='float64')
+        for i, col in enumerate(self.columns):
+            series = df[col]
+            if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                series = pd.to_numeric(series, errors='coerce')
+            block[:, i] = series.to_numpy(dtype='float64', na_value=np.nan)
+        return block
+
+    def fit(self, block: np.ndarray) -> 'SMERiskNormalizer':
+        """
+        Learn column medians, then max-scales of the median-filled block
+
+        Columns whose maximum is at most 1 keep a scale of 1.
+        """
+        # All-NaN columns stay NaN, as pandas median/max would leave them
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.medians = np.nanmedian(block, axis=0) if len(block) else np.full(block.shape[1], np.nan)
+            filled = np.where(np.isnan(block), self.medians, block)
+            col_max = np.nanmax(filled, axis=0) if len(block) else np.full(block.shape[1], np.nan)
+        self.scales = np.where(col_max > 1, col_max, 1.0)
+        return self
+
+    def fill(self, block: np.ndarray) -> np.ndarray:
+        """
+        Replace missing answers with the fitted medians, in place
+        """
+        missing = np.isnan(block)
+        rows, cols = np.nonzero(missing)
+        block[rows, cols] = self.medians[cols]
+
+        for i in np.flatnonzero(missing.any(axis=0)):
+            logger.info(f"Filled {self.columns[i]} missing values with median: {self.medians[i]:.3f}")
+        return block
+
+    def scale(self, block: np.ndarray) -> np.ndarray:
+        """
+        Divide each column by its fitted scale, in place
+        """
+        block /= self.scales
+        return block
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Normalize a survey batch with the fitted parameters, without refitting
+        """
+        return self.write_back(df, self.scale(self.fill(self.coerce(df))))
+
+    def write_back(self, df: pd.DataFrame, block: np.ndarray) -> pd.DataFrame:
+        """
+        Return a shallow copy of df with the risk columns replaced by block
+
+        Columns that were already numeric and needed neither filling nor
+        scaling keep their original values and dtype.
+        """
+        df = df.copy(deep=False)
+        for i, col in enumerate(self.columns):
+            original = df[col]
+            unchanged = (
+                pd.api.types.is_numeric_dtype(original)
+                and not pd.api.types.is_bool_dtype(original)
+                and self.scales[i] == 1
+                and not original.isna().any()
+            )
+            if not unchanged:
+                df[col] = block[:, i]
+        return df
+
+    def to_dict(self) -> Dict:
+        return {
+            'columns': self.columns,
+            'medians': dict(zip(self.columns, self.medians.tolist())),
+            'scales': dict(zip(self.columns, self.scales.tolist())),
+        }
+
+    def save(self, path: str):
+        """
+        Write the fitted parameters as JSON
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'SMERiskNormalizer':
+        """
+        Read parameters written by save()
+        """
+        with open(path) as f:
+            params = json.load(f)
+        return cls(params['columns'], params['medians'], params['scales'])
+
@@ -0,0 +1,286 @@
+"""
+Validation Rule Module
+Declarative row-level rules compiled into one vectorized evaluation
+"""
+
+import pandas as pd
+import numpy as np
+import ast
+import re
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Functions rule expressions may call, all elementwise over numpy columns
+RULE_FUNCTIONS = {
+    'abs': np.abs,
+    'isnull': pd.isnull,
+    'notnull': pd.notnull,
+    'round': np.round,
+}
+
+# Syntax allowed in rule expressions; anything else is rejected at registration
+ALLOWED_NODES = (
+    ast.Expression, ast.Tuple, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call,
+    ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow,
+    ast.USub, ast.UAdd, ast.Invert, ast.BitAnd, ast.BitOr, ast.BitXor,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+# `Column Name` lets expressions refer to columns that are not identifiers
+QUOTED_COLUMN = re.compile(r'`([^`]+)`')
+
+RuleCheck = Union[str, Callable[[pd.DataFrame], np.ndarray]]
+
+
+class ValidationRule:
+    """One condition every valid row must satisfy"""
+
+    def __init__(self, name: str, check: RuleCheck, message: str,
+                 columns: Optional[List[str]] = None, skip_missing: bool = True):
+        """
+        check is an expression such as "cogs <= revenue * 1.01" or a callable
+        returning a boolean mask of valid rows. message is formatted with
+        {count}, the number of offending rows. With skip_missing, rows where a
+        referenced column is null are not counted as offending, matching
+        pandas comparison semantics. Callables must list their columns.
+        """
+        self.name = name
+        self.message = message
+        self.skip_missing = skip_missing
+        self._aliases: Dict[str, str] = {}
+
+        if callable(check):
+            self.func = check
+            self.expression = None
+            self.columns = list(columns or [])
+            return
+
+        self.func = None
+        self.columns = list(columns or [])
+        tree = ast.parse(self._rewrite(check), mode='eval')
+        self._check_syntax(tree)
+        tree = self._split_chained_comparisons(tree)
+        self.expression = ast.unparse(tree)
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id not in RULE_FUNCTIONS:
+                column = self._aliases.get(node.id, node.id)
+                if column not in self.columns:
+                    self.columns.append(column)
+
+    def _rewrite(self, expression: str) -> str:
+        """
+        Replace `quoted` column names with identifier aliases
+        """
+        def alias(match):
+            # Derived from the column name so aliases agree across rules
+            name = '_col_' + match.group(1).encode('utf-8').hex()
+            self._aliases[name] = match.group(1)
+            return name
+
+        return QUOTED_COLUMN.sub(alias, expression)
+
+    def _check_syntax(self, tree: ast.AST):
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(f"Rule {self.name}: unsupported syntax {type(node).__name__}")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in RULE_FUNCTIONS:
+                    raise ValueError(f"Rule {self.name}: only {sorted(RULE_FUNCTIONS)} can be called")
+
+    def _split_chained_comparisons(self, tree: ast.AST) -> ast.AST:
+        """
+        Rewrite "a <= b < c" as "(a <= b) & (b < c)"
+
+        Python chains comparisons with `and`, which is ambiguous for whole
+        columns; the elementwise & keeps the meaning row by row.
+        """
+        class Splitter(ast.NodeTransformer):
+            def visit_Compare(self, node):
+                self.generic_visit(node)
+                if len(node.ops) == 1:
+                    return node
+                operands = [node.left] + node.comparators
+                pairs = [ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+                         for i, op in enumerate(node.ops)]
+                combined = pairs[0]
+                for pair in pairs[1:]:
+                    combined = ast.BinOp(left=combined, op=ast.BitAnd(), right=pair)
+                return combined
+
+        return ast.fix_missing_locations(Splitter().visit(tree))
+
+    def applies_to(self, columns) -> bool:
+        return all(column in columns for column in self.columns)
+
+
+class ValidationResult:
+    """Per-rule offending masks and row indices for one validated frame"""
+
+    def __init__(self, index: pd.Index, masks: Dict[str, np.ndarray], rules: Dict[str, ValidationRule]):
+        self.index = index
+        self.masks = masks
+        self.rules = rules
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {name: int(mask.sum()) for name, mask in self.masks.items()}
+
+    @property
+    def offending_rows(self) -> Dict[str, pd.Index]:
+        """
+        Index labels of the rows breaking each rule
+        """
+        return {name: self.index[mask] for name, mask in self.masks.items()}
+
+    @property
+    def invalid_mask(self) -> np.ndarray:
+        """
+        Rows breaking at least one rule
+        """
+        invalid = np.zeros(len(self.index), dtype=bool)
+        for mask in self.masks.values():
+            invalid |= mask
+        return invalid
+
+    @property
+    def is_valid(self) -> bool:
+        return not any(mask.any() for mask in self.masks.values())
+
+    @property
+    def issues(self) -> List[str]:
+        """
+        One message per broken rule, in registration order
+        """
+        return [
+            self.rules[name].message.format(count=count)
+            for name, count in self.counts.items() if count > 0
+        ]
+
+    def quarantine(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Split df into (valid rows, invalid rows), tagging invalid rows with the rules they break
+        """
+        invalid = self.invalid_mask
+        quarantined = df[invalid].copy()
+        quarantined['failed_rules'] = [
+            ','.join(name for name, mask in self.masks.items() if mask[i])
+            for i in np.flatnonzero(invalid)
+        ]
+        return df[~invalid], quarantined
+
+    def merge(self, other: 'ValidationResult') -> 'ValidationResult':
+        """
+        Combine results from consecutive chunks into one
+        """
+        names = list(dict.fromkeys(list(self.masks) + list(other.masks)))
+        masks = {
+            name: np.concatenate([
+                self.masks.get(name, np.zeros(len(self.index), dtype=bool)),
+                other.masks.get(name, np.zeros(len(other.index), dtype=bool)),
+            ])
+            for name in names
+        }
+        return ValidationResult(self.index.append(other.index), masks, {**self.rules, **other.rules})
+
+
+class RuleEngine:
+    """Registry of validation rules evaluated together over frames or chunks"""
+
+    def __init__(self, rules: Optional[Iterable[ValidationRule]] = None):
+        self.rules: Dict[str, ValidationRule] = {}
+        self._compiled = {}
+        for rule in rules or []:
+            self.register(rule)
+
+    def register(self, rule: ValidationRule) -> 'RuleEngine':
+        """
+        Add or replace a rule
+        """
+        self.rules[rule.name] = rule
+        self._compiled.clear()
+        return self
+
+    def _compile(self, names: Tuple[str, ...]):
+        """
+        Compile the expression rules in names into a single tuple expression
+        """
+        if names not in self._compiled:
+            source = '(' + ''.join(f"({self.rules[name].expression}), " for name in names) + ')'
+            self._compiled[names] = compile(source, '<validation rules>', 'eval')
+        return self._compiled[names]
+
+    def _column_arrays(self, df: pd.DataFrame, columns: List[str]) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for column in columns:
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                arrays[column] = series.to_numpy(dtype='float64', na_value=np.nan)
+            else:
+                arrays[column] = series.to_numpy()
+        return arrays
+
+    def validate(self, df: pd.DataFrame) -> ValidationResult:
+        """
+        Evaluate every applicable rule over df in one pass
+
+        Rules whose columns are missing from df are skipped.
+        """
+        applicable = [rule for rule in self.rules.values() if rule.applies_to(df.columns)]
+        expression_rules = tuple(rule.name for rule in applicable if rule.expression is not None)
+
+        columns = list(dict.fromkeys(column for rule in applicable for column in rule.columns))
+        arrays = self._column_arrays(df, columns)
+        missing = {column: pd.isnull(values) for column, values in arrays.items()}
+
+        valid = {}
+        if expression_rules:
+            namespace = dict(RULE_FUNCTIONS)
+            for name in expression_rules:
+                for alias, column in self.rules[name]._aliases.items():
+                    namespace[alias] = arrays[column]
+            namespace.update({column: values for column, values in arrays.items() if column.isidentifier()})
+            with np.errstate(invalid='ignore'):
+                outcomes = eval(self._compile(expression_rules), {'__builtins__': {}}, namespace)
+            valid.update(zip(expression_rules, outcomes))
+
+        masks = {}
+        for rule in applicable:
+            passed = valid[rule.name] if rule.func is None else rule.func(df)
+            offending = ~np.broadcast_to(np.asarray(passed, dtype=bool), (len(df),))
+            if rule.skip_missing:
+                for column in rule.columns:
+                    offending = offending & ~missing[column]
+            masks[rule.name] = offending
+
+        return ValidationResult(df.index, masks, self.rules)
+
+    def validate_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, ValidationResult]]:
+        """
+        Validate streamed chunks, yielding each chunk with its result
+        """
+        for chunk in chunks:
+            yield chunk, self.validate(chunk)
+
+
+# Checks behind DataCleaner.validate_financial_data, in reporting order
+FINANCIAL_RULES = [
+    ValidationRule('negative_revenue', 'revenue >= 0', "{count} rows with negative revenue"),
+    # Allow 1% margin for rounding
+    ValidationRule('cogs_exceeds_revenue', 'cogs <= revenue * 1.01', "{count} rows where COGS > Revenue"),
+    ValidationRule('gross_profit_mismatch', 'abs(revenue - cogs - gross_profit) <= 0.01',
+                   "{count} rows with gross profit calculation mismatch"),
+    ValidationRule('invalid_dates', 'notnull(`Order Date`)', "{count} rows with invalid dates",
+                   skip_missing=False),
+]
+
+
+def financial_rule_engine() -> RuleEngine:
+    """
+    Rule engine preloaded with the standard financial consistency checks
+    """
+    return RuleEngine(FINANCIAL_RULES)
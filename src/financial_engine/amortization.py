@@ -0,0 +1,145 @@
+"""
+Loan Amortization Module
+Closed-form monthly schedules and DSCR for grids of loan scenarios
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def annuity_payment(amount, annual_rate, term_years) -> np.ndarray:
+    """
+    Level monthly payment (EMI) repaying amount over term_years; broadcasts
+    """
+    amount, monthly_rate = np.asarray(amount, dtype='float64'), np.asarray(annual_rate, dtype='float64') / 12
+    n_payments = np.asarray(term_years, dtype='float64') * 12
+
+    growth = (1 + monthly_rate) ** n_payments
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payment = amount * monthly_rate * growth / (growth - 1)
+    return np.where(monthly_rate > 0, payment, amount / n_payments)
+
+
+class AmortizationSchedule:
+    """Monthly balance, interest and principal of S loans over T months, as (S, T) arrays"""
+
+    def __init__(self, amounts, annual_rates, term_years, n_periods: Optional[int] = None):
+        """
+        One scenario per element after broadcasting amounts, rates and terms
+
+        Month k (1-based) pays interest on the balance left after month k-1.
+        Months past a loan's term have zero payment and zero balance. The
+        horizon defaults to the longest term.
+        """
+        amounts, rates, terms = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(amounts, dtype='float64')),
+            np.atleast_1d(np.asarray(annual_rates, dtype='float64')),
+            np.atleast_1d(np.asarray(term_years, dtype='float64')),
+        )
+        self.amounts, self.annual_rates, self.term_years = amounts.ravel(), rates.ravel(), terms.ravel()
+        self.n_payments = np.rint(self.term_years * 12).astype('int64')
+        if (self.amounts < 0).any() or (self.annual_rates < 0).any() or (self.n_payments <= 0).any():
+            raise ValueError("Loan amounts and rates must be non-negative and terms positive")
+
+        self.n_periods = int(n_periods if n_periods is not None else self.n_payments.max())
+        self.payment = annuity_payment(self.amounts, self.annual_rates, self.n_payments / 12)
+        self._build()
+
+    @classmethod
+    def grid(cls, amounts, annual_rates, term_years, n_periods: Optional[int] = None) -> 'AmortizationSchedule':
+        """
+        Every combination of amount x rate x term, amounts varying slowest
+        """
+        amount_grid, rate_grid, term_grid = np.meshgrid(
+            np.atleast_1d(amounts), np.atleast_1d(annual_rates), np.atleast_1d(term_years), indexing='ij')
+        return cls(amount_grid.ravel(), rate_grid.ravel(), term_grid.ravel(), n_periods)
+
+    def _build(self):
+        """
+        Fill the (S, T) schedule arrays from the closed-form balance
+        """
+        rate = (self.annual_rates / 12)[:, None]
+        amount, payment = self.amounts[:, None], self.payment[:, None]
+        months_paid = np.arange(self.n_periods + 1)[None, :]
+
+        # Balance after k payments: P(1+r)^k - EMI((1+r)^k - 1)/r, or P - EMI*k at r = 0
+        growth = (1 + rate) ** months_paid
+        with np.errstate(divide='ignore', invalid='ignore'):
+            compounding = np.where(rate > 0, (growth - 1) / rate, months_paid)
+        balance = amount * growth - payment * compounding
+        balance = np.where(months_paid >= self.n_payments[:, None], 0.0, np.maximum(balance, 0.0))
+
+        self.opening_balance = balance[:, :-1]
+        self.closing_balance = balance[:, 1:]
+        self.interest = self.opening_balance * rate
+        self.principal = self.opening_balance - self.closing_balance
+        # Equals the EMI while the loan runs (the last month clears the balance), 0 after
+        self.payments = self.interest + self.principal
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def scenarios(self) -> pd.DataFrame:
+        """
+        One row per loan scenario with its EMI and lifetime interest
+        """
+        return pd.DataFrame({
+            'loan_amount': self.amounts,
+            'interest_rate': self.annual_rates,
+            'term_years': self.term_years,
+            'monthly_payment': self.payment,
+            'total_interest': self.interest.sum(axis=1),
+        })
+
+    def to_frame(self, scenario: int = 0) -> pd.DataFrame:
+        """
+        The month-by-month schedule of one scenario
+        """
+        return pd.DataFrame({
+            'month': np.arange(1, self.n_periods + 1),
+            'loan_balance': self.opening_balance[scenario],
+            'loan_payment': self.payments[scenario],
+            'loan_interest': self.interest[scenario],
+            'loan_principal': self.principal[scenario],
+            'closing_balance': self.closing_balance[scenario],
+        })
+
+    def dscr(self, ebitda) -> np.ndarray:
+        """
+        (S, T) debt service coverage of an EBITDA series, NaN once a loan is repaid
+
+        The series is aligned to the first months of the schedule; months
+        beyond it are NaN.
+        """
+        ebitda = np.asarray(ebitda, dtype='float64')[:self.n_periods]
+        payments = self.payments[:, :len(ebitda)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coverage = np.where(payments > 0, ebitda[None, :] / payments, np.nan)
+
+        if len(ebitda) < self.n_periods:
+            coverage = np.pad(coverage, ((0, 0), (0, self.n_periods - len(ebitda))), constant_values=np.nan)
+        return coverage
+
+    def dscr_summary(self, ebitda, threshold: float = 1.25) -> pd.DataFrame:
+        """
+        Scenario table with minimum and average DSCR and months below threshold
+        """
+        coverage = self.dscr(ebitda)
+        observed = ~np.isnan(coverage)
+        has_observed = observed.any(axis=1)
+
+        min_dscr, avg_dscr = np.full(len(self), np.nan), np.full(len(self), np.nan)
+        min_dscr[has_observed] = np.nanmin(coverage[has_observed], axis=1)
+        avg_dscr[has_observed] = np.nanmean(coverage[has_observed], axis=1)
+
+        summary = self.scenarios()
+        summary['min_dscr'] = min_dscr
+        summary['avg_dscr'] = avg_dscr
+        summary['months_below_threshold'] = (observed & (coverage < threshold)).sum(axis=1)
+        summary['meets_threshold'] = min_dscr >= threshold
+        return summary
@@ -8,9 +8,22 @@ import numpy as np
 import logging
 from typing import Dict, Tuple
 
+from src.financial_engine.pnl_cube import month_keys as pnl_month_keys
+from src.financial_engine.run_length import find_runs
+from src.financial_engine.ratios import RATIOS, with_ratios
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Month key of 1970-01 (year * 12 + month - 1), where datetime64[M] counts from
+EPOCH_MONTH_KEY = 1970 * 12
+
+DAILY_CASH_FLOW_COLUMNS = [
+    'date', 'cash_inflow', 'cash_outflow_cogs', 'gross_profit', 'period', 'operating_expenses',
+    'days_in_month', 'cash_outflow_operating', 'total_cash_outflow', 'net_cash_flow',
+    'cumulative_cash_flow', 'cash_balance', 'has_sales',
+]
+
 
 class CashFlowAnalyzer:
     """Analyze cash flow patterns and working capital"""
@@ -19,52 +32,83 @@ class CashFlowAnalyzer:
         pass
     
     def generate_daily_cash_flow(self, sales_df: pd.DataFrame, 
-                                 monthly_financials: pd.DataFrame) -> pd.DataFrame:
+                                 monthly_financials: pd.DataFrame,
+                                 starting_cash: float = 100000) -> pd.DataFrame:
         """
         Generate daily cash flow statement
+        
+        Every calendar day from the first to the last sale gets a row, so days
+        without sales (has_sales False) still carry their share of monthly
+        operating expenses and the cash balance stays continuous.
         """
         logger.info("Generating daily cash flow...")
         
-        # Aggregate sales to daily level
-        daily = sales_df.groupby('date').agg({
-            'revenue': 'sum',
-            'cogs': 'sum',
-            'gross_profit': 'sum'
-        }).reset_index()
-        
-        daily.rename(columns={
-            'revenue': 'cash_inflow',
-            'cogs': 'cash_outflow_cogs'
-        }, inplace=True)
-        
-        # Convert date to datetime
-        daily['date'] = pd.to_datetime(daily['date'])
-        daily['period'] = daily['date'].dt.strftime('%Y-%m')
-        
-        # Merge with monthly operating expenses
-        monthly_ops = monthly_financials[['period', 'operating_expenses']].copy()
-        daily = daily.merge(monthly_ops, on='period', how='left')
-        
-        # Calculate days in month
-        daily['days_in_month'] = daily['date'].dt.days_in_month
-        
-        # Distribute monthly operating expenses daily
-        daily['cash_outflow_operating'] = daily['operating_expenses'] / daily['days_in_month']
-        
-        # Calculate total cash outflow
-        daily['total_cash_outflow'] = daily['cash_outflow_cogs'] + daily['cash_outflow_operating']
-        
-        # Calculate net cash flow
-        daily['net_cash_flow'] = daily['cash_inflow'] - daily['total_cash_outflow']
-        
-        # Calculate cumulative cash flow
-        daily['cumulative_cash_flow'] = daily['net_cash_flow'].cumsum()
-        
-        # Calculate cash balance (assume starting with $100k)
-        starting_cash = 100000
-        daily['cash_balance'] = starting_cash + daily['cumulative_cash_flow']
-        
-        logger.info(f"Generated daily cash flow for {len(daily)} days")
+        # Integer day keys (days since epoch); rows without a date are dropped
+        dates = sales_df['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates)
+        days = dates.to_numpy().astype('datetime64[D]')
+        dated = ~np.isnat(days)
+        days = days[dated].view('int64')
+        
+        if len(days) == 0:
+            return pd.DataFrame(columns=DAILY_CASH_FLOW_COLUMNS)
+        
+        # Aggregate sales onto a dense calendar: position = days since first sale
+        first_day = int(days.min())
+        n_days = int(days.max()) - first_day + 1
+        positions = days - first_day
+        
+        def daily_sum(column):
+            values = np.nan_to_num(sales_df[column].to_numpy(dtype='float64')[dated])
+            return np.bincount(positions, weights=values, minlength=n_days)
+        
+        calendar = np.arange(first_day, first_day + n_days).astype('datetime64[D]')
+        months = calendar.astype('datetime64[M]')
+        days_in_month = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype('int32')
+        
+        # Broadcast monthly operating expenses to days by month position
+        month_keys = months.view('int64')
+        first_month = int(month_keys[0])
+        month_positions = month_keys - first_month
+        n_months = int(month_positions[-1]) + 1
+        
+        opex_by_month = np.full(n_months, np.nan)
+        statement_months = pnl_month_keys(monthly_financials['period']) - EPOCH_MONTH_KEY - first_month
+        in_range = (statement_months >= 0) & (statement_months < n_months)
+        opex_by_month[statement_months[in_range]] = monthly_financials['operating_expenses'].to_numpy(dtype='float64')[in_range]
+        operating_expenses = opex_by_month[month_positions]
+        
+        month_labels = np.array(np.arange(first_month, first_month + n_months).astype('datetime64[M]').astype(str), dtype=object)
+        
+        cash_inflow = daily_sum('revenue')
+        cash_outflow_cogs = daily_sum('cogs')
+        cash_outflow_operating = operating_expenses / days_in_month
+        total_cash_outflow = cash_outflow_cogs + cash_outflow_operating
+        net_cash_flow = cash_inflow - total_cash_outflow
+        
+        # Running total skips (but keeps) NaN days, like a pandas cumsum
+        cumulative_cash_flow = np.nancumsum(net_cash_flow)
+        cumulative_cash_flow[np.isnan(net_cash_flow)] = np.nan
+        
+        daily = pd.DataFrame({
+            'date': calendar.astype('datetime64[ns]'),
+            'cash_inflow': cash_inflow,
+            'cash_outflow_cogs': cash_outflow_cogs,
+            'gross_profit': daily_sum('gross_profit'),
+            'period': month_labels[month_positions],
+            'operating_expenses': operating_expenses,
+            'days_in_month': days_in_month,
+            'cash_outflow_operating': cash_outflow_operating,
+            'total_cash_outflow': total_cash_outflow,
+            'net_cash_flow': net_cash_flow,
+            'cumulative_cash_flow': cumulative_cash_flow,
+            'cash_balance': starting_cash + cumulative_cash_flow,
+            'has_sales': np.bincount(positions, minlength=n_days) > 0,
+        })
+        
+        gap_days = int((~daily['has_sales']).sum())
+        logger.info(f"Generated daily cash flow for {len(daily)} days ({gap_days} without sales)")
         return daily
     
     def calculate_monthly_cash_flow(self, daily_cash_flow: pd.DataFrame) -> pd.DataFrame:
@@ -122,29 +166,13 @@ class CashFlowAnalyzer:
     def analyze_working_capital(self, monthly_financials: pd.DataFrame) -> pd.DataFrame:
         """
         Analyze working capital requirements
+        
+        Receivables are 30 days of revenue, inventory 45 days and payables
+        30 days of COGS; the formulas live in the ratios registry.
         """
         logger.info("Analyzing working capital...")
         
-        df = monthly_financials.copy()
-        
-        # Estimate working capital components
-        # Accounts Receivable: Assume 30 days collection period (1 month revenue)
-        df['accounts_receivable'] = df['total_revenue']
-        
-        # Inventory: Assume 45 days inventory (1.5 months COGS)
-        df['inventory'] = df['total_cogs'] * 1.5
-        
-        # Accounts Payable: Assume 30 days payment period (1 month COGS)
-        df['accounts_payable'] = df['total_cogs']
-        
-        # Calculate working capital
-        df['working_capital'] = df['accounts_receivable'] + df['inventory'] - df['accounts_payable']
-        
-        # Calculate working capital as % of revenue
-        df['working_capital_pct_revenue'] = df['working_capital'] / df['total_revenue']
-        
-        # Calculate changes in working capital
-        df['change_in_working_capital'] = df['working_capital'].diff()
+        df = with_ratios(monthly_financials, RATIOS.group('working_capital'))
         
         logger.info("Working capital analysis complete")
         return df
@@ -155,19 +183,7 @@ class CashFlowAnalyzer:
         """
         logger.info("Calculating cash conversion cycle...")
         
-        df = monthly_financials_with_wc.copy()
-        
-        # Days Inventory Outstanding (DIO) = (Inventory / COGS) * 365
-        df['DIO'] = (df['inventory'] / df['total_cogs']) * 365
-        
-        # Days Sales Outstanding (DSO) = (Accounts Receivable / Revenue) * 365
-        df['DSO'] = (df['accounts_receivable'] / df['total_revenue']) * 365
-        
-        # Days Payable Outstanding (DPO) = (Accounts Payable / COGS) * 365
-        df['DPO'] = (df['accounts_payable'] / df['total_cogs']) * 365
-        
-        # Cash Conversion Cycle = DIO + DSO - DPO
-        df['cash_conversion_cycle'] = df['DIO'] + df['DSO'] - df['DPO']
+        df = with_ratios(monthly_financials_with_wc, RATIOS.group('cash_conversion_cycle'))
         
         logger.info(f"Average CCC: {df['cash_conversion_cycle'].mean():.1f} days")
         return df
@@ -184,15 +200,9 @@ class CashFlowAnalyzer:
         if negative_days > 0:
             issues.append(f"Negative cash balance on {negative_days} days")
         
-        # Check for consecutive negative cash flow days
-        consecutive_negative = 0
-        max_consecutive_negative = 0
-        for net_flow in daily_cash_flow['net_cash_flow']:
-            if net_flow < 0:
-                consecutive_negative += 1
-                max_consecutive_negative = max(max_consecutive_negative, consecutive_negative)
-            else:
-                consecutive_negative = 0
+        # Check for consecutive negative cash flow days, in the frame's row order
+        streaks = find_runs(daily_cash_flow['net_cash_flow'].to_numpy(dtype='float64') < 0)
+        max_consecutive_negative = int(streaks['length'].max()) if len(streaks['length']) else 0
         
         if max_consecutive_negative > 7:
             warnings.append(f"Maximum {max_consecutive_negative} consecutive days with negative cash flow")
@@ -0,0 +1,177 @@
+"""
+Formula Graph Module
+Column formulas as a dependency graph, recomputed only where inputs change
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Formula:
+    """One derived column: func(*input_arrays, *param_values) -> array"""
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str], params: Sequence[str] = ()):
+        """
+        func must be row-wise (output row i depends only on input row i), so
+        any subset of rows can be recomputed on its own. Parameter values are
+        scalars, or arrays holding one value per row.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = list(params)
+
+    def compute(self, values: Dict[str, np.ndarray], params: Dict, rows=None) -> np.ndarray:
+        """
+        Evaluate on all rows, or only on the given row positions
+        """
+        param_values = [params[name] for name in self.params]
+        if rows is None:
+            args = [values[col] for col in self.inputs]
+        else:
+            args = [values[col][rows] for col in self.inputs]
+            # Per-row parameters (one value per row) follow the row subset
+            param_values = [value[rows] if np.ndim(value) else value for value in param_values]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.asarray(self.func(*args, *param_values), dtype='float64')
+
+
+class FormulaGraph:
+    """Derived columns evaluated in dependency order, with row-level dirty tracking"""
+
+    def __init__(self, formulas: Optional[Iterable[Formula]] = None):
+        self.formulas: Dict[str, Formula] = {}
+        self.params: Dict = {}
+        self.values: Dict[str, np.ndarray] = {}
+        self.index = None
+        self.source_columns: List[str] = []
+        self.last_recompute: Dict[str, int] = {}
+        self._order: Optional[List[str]] = None
+        for formula in formulas or []:
+            self.add(formula)
+
+    def add(self, formula: Formula) -> 'FormulaGraph':
+        """
+        Register a formula; a later formula with the same name replaces it
+        """
+        self.formulas[formula.name] = formula
+        self._order = None
+        return self
+
+    @property
+    def order(self) -> List[str]:
+        """
+        Formula names sorted so every formula follows its inputs
+
+        Otherwise registration order is kept, which fixes the output column order.
+        """
+        if self._order is None:
+            order, visiting = [], set()
+
+            def visit(name):
+                if name in order or name not in self.formulas:
+                    return
+                if name in visiting:
+                    raise ValueError(f"Formula cycle through '{name}'")
+                visiting.add(name)
+                for col in self.formulas[name].inputs:
+                    visit(col)
+                visiting.discard(name)
+                order.append(name)
+
+            for name in self.formulas:
+                visit(name)
+            self._order = order
+        return self._order
+
+    def evaluate(self, df: pd.DataFrame, params: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Compute every formula over df and keep the result for incremental updates
+        """
+        self.params = dict(params or {})
+        self.index = df.index
+        self.source_columns = [col for col in df.columns if col not in self.formulas]
+        self.values = {col: df[col].to_numpy(copy=True) for col in self.source_columns}
+
+        missing = {col for name in self.order for col in self.formulas[name].inputs
+                   if col not in self.formulas and col not in self.values}
+        if missing:
+            raise KeyError(f"Formula inputs not in frame: {sorted(missing)}")
+
+        for name in self.order:
+            self.values[name] = self.formulas[name].compute(self.values, self.params)
+        self.last_recompute = {name: len(df) for name in self.order}
+        return self.frame()
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Current source and formula columns as a DataFrame
+        """
+        columns = self.source_columns + self.order
+        return pd.DataFrame({col: self.values[col] for col in columns}, index=self.index)
+
+    def update(self, column: str, values, rows=None) -> pd.DataFrame:
+        """
+        Overwrite source column values at row positions and recompute dependents
+
+        Only formulas downstream of column are evaluated, and only on rows.
+        """
+        if column in self.formulas:
+            raise ValueError(f"'{column}' is a formula; update its inputs instead")
+        if column not in self.values:
+            raise KeyError(f"Unknown source column '{column}'")
+
+        # Widen the column first (e.g. int units_sold given floats) so no value is truncated
+        values = np.asarray(values)
+        dtype = np.result_type(self.values[column], values)
+        if dtype != self.values[column].dtype:
+            self.values[column] = self.values[column].astype(dtype)
+
+        if rows is None:
+            self.values[column][:] = values
+        else:
+            rows = np.atleast_1d(np.asarray(rows, dtype='int64'))
+            self.values[column][rows] = values
+        self._recompute({column: rows}, set())
+        return self.frame()
+
+    def set_params(self, **params) -> pd.DataFrame:
+        """
+        Change parameters and recompute the formulas that read them, on all rows
+        """
+        changed = {name for name, value in params.items()
+                   if name not in self.params or not np.array_equal(self.params[name], value)}
+        self.params.update(params)
+        self._recompute({}, changed)
+        return self.frame()
+
+    def _recompute(self, dirty_rows: Dict[str, np.ndarray], changed_params: set):
+        """
+        Walk formulas in order, evaluating each on the union of its inputs' dirty rows
+        """
+        n_rows = len(self.index)
+        self.last_recompute = {}
+        for name in self.order:
+            formula = self.formulas[name]
+            if any(param in changed_params for param in formula.params):
+                rows = None
+            else:
+                touched = [dirty_rows[col] for col in formula.inputs if col in dirty_rows]
+                if not touched:
+                    continue
+                rows = None if any(r is None for r in touched) else np.unique(np.concatenate(touched))
+
+            if rows is None:
+                self.values[name] = formula.compute(self.values, self.params)
+            else:
+                self.values[name][rows] = formula.compute(self.values, self.params, rows)
+            dirty_rows[name] = rows
+            self.last_recompute[name] = n_rows if rows is None else len(rows)
+
+        if self.last_recompute:
+            logger.info(f"Recomputed {len(self.last_recompute)} formula columns")
@@ -0,0 +1,119 @@
+"""
+P&L Cube Module
+Month-grain P&L totals rolled up to quarters, calendar years and fiscal years
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Additive P&L lines; margins and growth are recomputed after each roll-up
+SUM_COLUMNS = [
+    'total_revenue', 'total_cogs', 'gross_profit', 'operating_expenses', 'ebitda',
+    'depreciation', 'interest_expense', 'tax_expense', 'net_profit', 'units_sold',
+]
+
+# Roll-up grain -> label column of the resulting statement
+GRAINS = {
+    'month': 'period',
+    'quarter': 'quarter',
+    'year': 'year',
+    'fiscal_year': 'fiscal_year',
+}
+
+
+def month_keys(periods) -> np.ndarray:
+    """
+    Months since year 0 (year * 12 + month - 1) for 'YYYY-MM' period labels
+    """
+    months = pd.PeriodIndex(pd.Index(periods).astype(str), freq='M')
+    return (months.year.to_numpy() * 12 + months.month.to_numpy() - 1).astype('int64')
+
+
+class PnLCube:
+    """Monthly P&L totals held as arrays, rolled up without touching transactions"""
+
+    def __init__(self, monthly_df: pd.DataFrame, fiscal_year_start: int = 4):
+        """
+        Keep the additive lines of a monthly statement keyed by month
+
+        fiscal_year_start is the first calendar month of the fiscal year
+        (4 = April-March). The monthly frame is read, never modified.
+        """
+        if not 1 <= fiscal_year_start <= 12:
+            raise ValueError(f"fiscal_year_start must be a month 1-12, got {fiscal_year_start}")
+
+        self.fiscal_year_start = fiscal_year_start
+        self.month_keys = month_keys(monthly_df['period'])
+        self.totals = {col: monthly_df[col].to_numpy() for col in SUM_COLUMNS}
+        self._rollups: Dict[tuple, pd.DataFrame] = {}
+
+    def __len__(self) -> int:
+        return len(self.month_keys)
+
+    def _buckets(self, grain: str, fiscal_year_start: int) -> np.ndarray:
+        """
+        Integer bucket of each month at the requested grain
+        """
+        keys = self.month_keys
+        if grain == 'month':
+            return keys
+        if grain == 'quarter':
+            return keys // 3
+        if grain == 'year':
+            return keys // 12
+        # Fiscal years are numbered by the calendar year they start in
+        return (keys - (fiscal_year_start - 1)) // 12
+
+    def _labels(self, grain: str, buckets: np.ndarray, fiscal_year_start: int) -> list:
+        """
+        Statement labels matching what pandas periods would print
+        """
+        if grain == 'month':
+            return [f"{key // 12}-{key % 12 + 1:02d}" for key in buckets]
+        if grain == 'quarter':
+            return [f"{key // 4}Q{key % 4 + 1}" for key in buckets]
+        if grain == 'year':
+            return buckets.tolist()
+        if fiscal_year_start == 1:
+            return [f"FY{year}" for year in buckets]
+        return [f"FY{year}-{(year + 1) % 100:02d}" for year in buckets]
+
+    def rollup(self, grain: str = 'quarter', fiscal_year_start: Optional[int] = None) -> pd.DataFrame:
+        """
+        Sum the monthly lines into grain buckets and recompute the margins
+
+        Annual grains ('year', 'fiscal_year') also get year-over-year growth.
+        Results are cached per grain; callers receive their own copy.
+        """
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain '{grain}', expected one of {list(GRAINS)}")
+        fiscal_year_start = fiscal_year_start or self.fiscal_year_start
+        cache_key = (grain, fiscal_year_start if grain == 'fiscal_year' else None)
+
+        if cache_key not in self._rollups:
+            buckets, inverse = np.unique(self._buckets(grain, fiscal_year_start), return_inverse=True)
+
+            rolled = {GRAINS[grain]: self._labels(grain, buckets, fiscal_year_start)}
+            for col, values in self.totals.items():
+                # Missing months add nothing, as in a groupby sum
+                sums = np.bincount(inverse, weights=np.nan_to_num(values.astype('float64')),
+                                   minlength=len(buckets))
+                rolled[col] = sums.astype(values.dtype) if np.issubdtype(values.dtype, np.integer) else sums
+
+            result = pd.DataFrame(rolled)
+            result['gross_margin'] = result['gross_profit'] / result['total_revenue']
+            result['operating_margin'] = result['ebitda'] / result['total_revenue']
+            result['net_profit_margin'] = result['net_profit'] / result['total_revenue']
+
+            if grain in ('year', 'fiscal_year'):
+                result['revenue_growth_yoy'] = result['total_revenue'].pct_change()
+                result['profit_growth_yoy'] = result['net_profit'].pct_change()
+
+            self._rollups[cache_key] = result
+
+        return self._rollups[cache_key].copy()
@@ -0,0 +1,120 @@
+"""
+Ratio Registry Module
+Named ratio definitions resolved on demand from their declared inputs
+"""
+
+import numpy as np
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RatioDefinition:
+    """One ratio: func(*input_arrays) -> array, with the names of its inputs"""
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str], group: Optional[str] = None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.group = group
+
+
+class RatioRegistry:
+    """Ratio definitions in registration order; inputs are other ratios or source columns"""
+
+    def __init__(self):
+        self.definitions: Dict[str, RatioDefinition] = {}
+        self._section: Optional[str] = None
+
+    def section(self, group: str) -> 'RatioRegistry':
+        """
+        Put the ratios added from here on in group
+        """
+        self._section = group
+        return self
+
+    def add(self, name: str, func: Callable, inputs: Sequence[str], group: Optional[str] = None) -> 'RatioRegistry':
+        """
+        Register (or replace) a ratio, in group or else the current section
+        """
+        self.definitions[name] = RatioDefinition(name, func, inputs, group or self._section)
+        return self
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.definitions
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.definitions)
+
+    def group(self, group: str) -> List[str]:
+        """
+        Names registered under group, in registration order
+        """
+        return [name for name, definition in self.definitions.items() if definition.group == group]
+
+    def dependencies(self, names: Sequence[str]) -> List[str]:
+        """
+        Registered ratios needed for names, each after its own inputs
+        """
+        order, visiting = [], set()
+
+        def visit(name):
+            if name in order or name not in self.definitions:
+                return
+            if name in visiting:
+                raise ValueError(f"Ratio cycle through '{name}'")
+            visiting.add(name)
+            for input_name in self.definitions[name].inputs:
+                visit(input_name)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in names:
+            if name not in self.definitions:
+                raise KeyError(f"Unknown ratio '{name}'")
+            visit(name)
+        return order
+
+    def run(self, source: Callable[[str], np.ndarray], given: Sequence[str] = ()) -> 'RatioRun':
+        """
+        Start a run reading source columns through source(name)
+
+        Registered names listed in given are read from source as well,
+        instead of being recomputed.
+        """
+        return RatioRun(self, source, given)
+
+
+class RatioRun:
+    """One evaluation pass: every ratio and source column is computed at most once"""
+
+    def __init__(self, registry: RatioRegistry, source: Callable[[str], np.ndarray], given: Sequence[str] = ()):
+        self.registry = registry
+        self.source = source
+        self.given = set(given)
+        self.values: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str) -> np.ndarray:
+        """
+        Value of a ratio or source column, computing its inputs first
+        """
+        if name not in self.values:
+            definition = None if name in self.given else self.registry.definitions.get(name)
+            if definition is None:
+                self.values[name] = self.source(name)
+            else:
+                args = [self.get(input_name) for input_name in definition.inputs]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    self.values[name] = definition.func(*args)
+        return self.values[name]
+
+    def compute(self, names: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        The requested ratios, by name, in the order asked for
+        """
+        # Resolving the order up front rejects unknown names and cycles
+        self.registry.dependencies(names)
+        return {name: self.get(name) for name in names}
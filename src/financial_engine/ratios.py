@@ -6,12 +6,188 @@ Calculates liquidity, profitability, efficiency, and leverage ratios
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
+
+from src.financial_engine.ratio_registry import RatioRegistry, RatioRun
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _diff(values: np.ndarray) -> np.ndarray:
+    """
+    Change from the previous row, NaN for the first (Series.diff)
+    """
+    out = np.full(len(values), np.nan)
+    out[1:] = values[1:] - values[:-1]
+    return out
+
+
+def _cumsum(values: np.ndarray) -> np.ndarray:
+    """
+    Running total that skips NaN rows but leaves them NaN (Series.cumsum)
+    """
+    out = np.nancumsum(values)
+    out[np.isnan(values)] = np.nan
+    return out
+
+
+def _pct_change(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """
+    Relative change over periods rows (Series.pct_change)
+    """
+    if np.isnan(values).any():
+        # pandas pads missing values before comparing; defer to it for exactness
+        return pd.Series(values).ffill().pct_change(periods=periods).to_numpy()
+    out = np.full(len(values), np.nan)
+    if len(values) > periods:
+        out[periods:] = values[periods:] / values[:-periods] - 1
+    return out
+
+
+def _rolling_mean_3(values: np.ndarray) -> np.ndarray:
+    """
+    Mean of each row and the two before it, NaN if any is missing
+
+    Infinite values count as missing, as in pandas rolling windows.
+    """
+    values = np.where(np.isinf(values), np.nan, values)
+    out = np.full(len(values), np.nan)
+    if len(values) >= 3:
+        out[2:] = (values[2:] + values[1:-1] + values[:-2]) / 3
+    return out
+
+
+def _insert_before(columns: Dict, anchor: str, name: str, values):
+    """
+    Yield the items of columns with (name, values) placed right before anchor
+    """
+    for col, col_values in columns.items():
+        if col == anchor:
+            yield name, values
+        yield col, col_values
+
+
+def _period_cash_balance(periods: pd.Series, monthly_cash_flow: pd.DataFrame) -> np.ndarray:
+    """
+    Last ending cash balance of each period in the cash flow, NaN if absent
+    """
+    cash_periods = monthly_cash_flow['period']
+    if cash_periods.is_unique:
+        balance = pd.Series(monthly_cash_flow['ending_cash_balance'].to_numpy(), index=cash_periods.to_numpy())
+    else:
+        balance = monthly_cash_flow.groupby('period')['ending_cash_balance'].last()
+    return balance.reindex(periods.to_numpy()).to_numpy(dtype='float64')
+
+
+# Every ratio column, with its inputs; names not registered here are read
+# from the monthly statement (or, for ending_cash_balance, the cash flow)
+RATIOS = (
+    RatioRegistry()
+    # Working capital: 30 days receivables, 45 days inventory, 30 days payables
+    .section('working_capital')
+    .add('accounts_receivable', lambda revenue: revenue, ['total_revenue'])
+    .add('inventory', lambda cogs: cogs * 1.5, ['total_cogs'])
+    .add('accounts_payable', lambda cogs: cogs, ['total_cogs'])
+    .add('working_capital', lambda ar, inv, ap: ar + inv - ap, ['accounts_receivable', 'inventory', 'accounts_payable'])
+    .add('working_capital_pct_revenue', lambda wc, revenue: wc / revenue, ['working_capital', 'total_revenue'])
+    .add('change_in_working_capital', _diff, ['working_capital'])
+    # Cash conversion cycle
+    .section('cash_conversion_cycle')
+    .add('DIO', lambda inv, cogs: (inv / cogs) * 365, ['inventory', 'total_cogs'])
+    .add('DSO', lambda ar, revenue: (ar / revenue) * 365, ['accounts_receivable', 'total_revenue'])
+    .add('DPO', lambda ap, cogs: (ap / cogs) * 365, ['accounts_payable', 'total_cogs'])
+    .add('cash_conversion_cycle', lambda dio, dso, dpo: dio + dso - dpo, ['DIO', 'DSO', 'DPO'])
+    # Profitability
+    .section('profitability')
+    .add('gross_profit_margin', lambda gp, revenue: (gp / revenue) * 100, ['gross_profit', 'total_revenue'])
+    .add('operating_profit_margin', lambda ebitda, revenue: (ebitda / revenue) * 100, ['ebitda', 'total_revenue'])
+    .add('net_profit_margin_pct', lambda margin: margin * 100, ['net_profit_margin'])
+    .add('return_on_sales', lambda net, revenue: (net / revenue) * 100, ['net_profit', 'total_revenue'])
+    .add('ebitda_margin', lambda ebitda, revenue: (ebitda / revenue) * 100, ['ebitda', 'total_revenue'])
+    # Liquidity
+    .section('liquidity')
+    .add('current_assets', lambda cash, ar, inv: cash + ar + inv, ['ending_cash_balance', 'accounts_receivable', 'inventory'])
+    .add('current_liabilities', lambda ap: ap, ['accounts_payable'])
+    .add('current_ratio', lambda ca, cl: ca / cl, ['current_assets', 'current_liabilities'])
+    .add('quick_ratio', lambda ca, inv, cl: (ca - inv) / cl, ['current_assets', 'inventory', 'current_liabilities'])
+    .add('cash_ratio', lambda cash, cl: cash / cl, ['ending_cash_balance', 'current_liabilities'])
+    .add('working_capital_ratio', lambda wc, revenue: wc / revenue, ['working_capital', 'total_revenue'])
+    # Efficiency
+    .section('efficiency')
+    .add('estimated_fixed_assets', lambda revenue: revenue * 3, ['total_revenue'])
+    .add('total_assets', lambda wc, fixed: wc + fixed, ['working_capital', 'estimated_fixed_assets'])
+    .add('asset_turnover', lambda revenue, assets: revenue / assets, ['total_revenue', 'total_assets'])
+    .add('inventory_turnover', lambda cogs, inv: cogs / inv, ['total_cogs', 'inventory'])
+    .add('days_inventory_outstanding', lambda turnover: 365 / turnover, ['inventory_turnover'])
+    .add('receivables_turnover', lambda revenue, ar: revenue / ar, ['total_revenue', 'accounts_receivable'])
+    .add('days_sales_outstanding', lambda turnover: 365 / turnover, ['receivables_turnover'])
+    .add('payables_turnover', lambda cogs, ap: cogs / ap, ['total_cogs', 'accounts_payable'])
+    .add('days_payable_outstanding', lambda turnover: 365 / turnover, ['payables_turnover'])
+    # Leverage: debt assumed 1.5x revenue, equity $500k plus accumulated profits
+    .section('leverage')
+    .add('estimated_debt', lambda revenue: revenue * 1.5, ['total_revenue'])
+    .add('estimated_equity', lambda net: 500000 + _cumsum(net), ['net_profit'])
+    .add('debt_to_equity', lambda debt, equity: debt / equity, ['estimated_debt', 'estimated_equity'])
+    .add('debt_ratio', lambda debt, assets: debt / assets, ['estimated_debt', 'total_assets'])
+    .add('equity_ratio', lambda equity, assets: equity / assets, ['estimated_equity', 'total_assets'])
+    .add('interest_coverage_ratio', lambda ebitda, interest: ebitda / interest, ['ebitda', 'interest_expense'])
+    .add('principal_payment', lambda debt: (debt * 0.10) / 12, ['estimated_debt'])
+    .add('debt_service_coverage_ratio', lambda ebitda, interest, principal: ebitda / (interest + principal),
+         ['ebitda', 'interest_expense', 'principal_payment'])
+    # Growth
+    .section('growth')
+    .add('revenue_growth_mom', lambda revenue: _pct_change(revenue) * 100, ['total_revenue'])
+    .add('profit_growth_mom', lambda net: _pct_change(net) * 100, ['net_profit'])
+    .add('ebitda_growth_mom', lambda ebitda: _pct_change(ebitda) * 100, ['ebitda'])
+    .add('revenue_growth_3m_avg', _rolling_mean_3, ['revenue_growth_mom'])
+    .add('revenue_growth_yoy', lambda revenue: _pct_change(revenue, 12) * 100, ['total_revenue'])
+    .add('profit_growth_yoy', lambda net: _pct_change(net, 12) * 100, ['net_profit'])
+)
+
+# Year-over-year growth is only reported with at least a year of history
+YOY_RATIOS = ['revenue_growth_yoy', 'profit_growth_yoy']
+
+
+def _ratio_run(df: pd.DataFrame, monthly_cash_flow: Optional[pd.DataFrame], names: List[str]) -> RatioRun:
+    """
+    Registry run for names over df, reading the cash balance on first use
+
+    Registered columns df already has, other than names, are taken as given.
+    """
+    def source(name):
+        if name == 'ending_cash_balance' and name not in df.columns:
+            return _period_cash_balance(df['period'], monthly_cash_flow)
+        return df[name].to_numpy(dtype='float64')
+
+    given = [col for col in df.columns if col in RATIOS and col not in names]
+    return RATIOS.run(source, given)
+
+
+def with_ratios(df: pd.DataFrame, names: List[str],
+                monthly_cash_flow: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    df with the named RATIOS columns added, or recomputed in place
+
+    A cash balance looked up from monthly_cash_flow is placed before its
+    first user, and the rows renumbered, as a merge on period would.
+    """
+    run = _ratio_run(df, monthly_cash_flow, names)
+    ratios = run.compute(names)
+
+    index = df.index
+    if 'ending_cash_balance' in run.values and 'ending_cash_balance' not in df.columns:
+        anchor = next((name for name in names if 'ending_cash_balance' in RATIOS.definitions[name].inputs),
+                      names[0])
+        ratios = dict(_insert_before(ratios, anchor, 'ending_cash_balance', run.values['ending_cash_balance']))
+        index = pd.RangeIndex(len(df))
+
+    # Recomputed columns keep their place, new ones are appended in order
+    columns = {col: df[col] for col in df.columns}
+    columns.update(ratios)
+    return pd.DataFrame({col: np.asarray(values) for col, values in columns.items()}, index=index)
+
+
 class FinancialRatioCalculator:
     """Calculate comprehensive financial ratios"""
     
@@ -24,22 +200,7 @@ class FinancialRatioCalculator:
         """
         logger.info("Calculating profitability ratios...")
         
-        df = financials_df.copy()
-        
-        # Gross Profit Margin (already calculated, but ensure consistency)
-        df['gross_profit_margin'] = (df['gross_profit'] / df['total_revenue']) * 100
-        
-        # Operating Profit Margin
-        df['operating_profit_margin'] = (df['ebitda'] / df['total_revenue']) * 100
-        
-        # Net Profit Margin (already calculated)
-        df['net_profit_margin_pct'] = df['net_profit_margin'] * 100
-        
-        # Return on Sales (ROS)
-        df['return_on_sales'] = (df['net_profit'] / df['total_revenue']) * 100
-        
-        # EBITDA Margin
-        df['ebitda_margin'] = (df['ebitda'] / df['total_revenue']) * 100
+        df = with_ratios(financials_df, RATIOS.group('profitability'))
         
         logger.info("Profitability ratios calculated")
         return df
@@ -48,34 +209,13 @@ class FinancialRatioCalculator:
                                    cash_flow_df: pd.DataFrame) -> pd.DataFrame:
         """
         Calculate liquidity ratios
+        
+        The ending cash balance is taken from cash_flow_df by period unless
+        the statement already carries one.
         """
         logger.info("Calculating liquidity ratios...")
         
-        df = financials_with_wc.copy()
-        
-        # Merge with cash flow data to get cash balance
-        if 'ending_cash_balance' not in df.columns:
-            # Get ending cash balance from cash flow
-            cash_balance = cash_flow_df.groupby('period')['ending_cash_balance'].last().reset_index()
-            df = df.merge(cash_balance, on='period', how='left')
-        
-        # Current Assets = Cash + Accounts Receivable + Inventory
-        df['current_assets'] = df['ending_cash_balance'] + df['accounts_receivable'] + df['inventory']
-        
-        # Current Liabilities = Accounts Payable (simplified)
-        df['current_liabilities'] = df['accounts_payable']
-        
-        # Current Ratio
-        df['current_ratio'] = df['current_assets'] / df['current_liabilities']
-        
-        # Quick Ratio (Acid Test) = (Current Assets - Inventory) / Current Liabilities
-        df['quick_ratio'] = (df['current_assets'] - df['inventory']) / df['current_liabilities']
-        
-        # Cash Ratio = Cash / Current Liabilities
-        df['cash_ratio'] = df['ending_cash_balance'] / df['current_liabilities']
-        
-        # Working Capital Ratio
-        df['working_capital_ratio'] = df['working_capital'] / df['total_revenue']
+        df = with_ratios(financials_with_wc, RATIOS.group('liquidity'), cash_flow_df)
         
         logger.info("Liquidity ratios calculated")
         return df
@@ -86,32 +226,7 @@ class FinancialRatioCalculator:
         """
         logger.info("Calculating efficiency ratios...")
         
-        df = financials_with_wc.copy()
-        
-        # Asset Turnover (Revenue / Assets)
-        # Assume assets = working capital + fixed assets (estimated as 3x monthly revenue)
-        df['estimated_fixed_assets'] = df['total_revenue'] * 3
-        df['total_assets'] = df['working_capital'] + df['estimated_fixed_assets']
-        df['asset_turnover'] = df['total_revenue'] / df['total_assets']
-        
-        # Inventory Turnover = COGS / Average Inventory
-        df['inventory_turnover'] = df['total_cogs'] / df['inventory']
-        
-        # Days Inventory Outstanding (already calculated in cash flow)
-        # DIO = 365 / Inventory Turnover
-        df['days_inventory_outstanding'] = 365 / df['inventory_turnover']
-        
-        # Receivables Turnover = Revenue / Accounts Receivable
-        df['receivables_turnover'] = df['total_revenue'] / df['accounts_receivable']
-        
-        # Days Sales Outstanding = 365 / Receivables Turnover
-        df['days_sales_outstanding'] = 365 / df['receivables_turnover']
-        
-        # Payables Turnover = COGS / Accounts Payable
-        df['payables_turnover'] = df['total_cogs'] / df['accounts_payable']
-        
-        # Days Payable Outstanding = 365 / Payables Turnover
-        df['days_payable_outstanding'] = 365 / df['payables_turnover']
+        df = with_ratios(financials_with_wc, RATIOS.group('efficiency'))
         
         logger.info("Efficiency ratios calculated")
         return df
@@ -122,31 +237,7 @@ class FinancialRatioCalculator:
         """
         logger.info("Calculating leverage ratios...")
         
-        df = financials_df.copy()
-        
-        # Estimate debt (simplified - assume debt = 1.5x annual revenue)
-        df['estimated_debt'] = df['total_revenue'] * 1.5
-        
-        # Estimate equity (simplified - assume equity = accumulated profits + initial capital)
-        initial_equity = 500000  # Assume $500k starting equity
-        df['estimated_equity'] = initial_equity + df['net_profit'].cumsum()
-        
-        # Debt-to-Equity Ratio
-        df['debt_to_equity'] = df['estimated_debt'] / df['estimated_equity']
-        
-        # Debt Ratio = Total Debt / Total Assets
-        df['debt_ratio'] = df['estimated_debt'] / df['total_assets']
-        
-        # Equity Ratio = Total Equity / Total Assets
-        df['equity_ratio'] = df['estimated_equity'] / df['total_assets']
-        
-        # Interest Coverage Ratio = EBITDA / Interest Expense
-        df['interest_coverage_ratio'] = df['ebitda'] / df['interest_expense']
-        
-        # Debt Service Coverage Ratio = EBITDA / (Interest + Principal payments)
-        # Assume principal payments = 10% of debt annually / 12
-        df['principal_payment'] = (df['estimated_debt'] * 0.10) / 12
-        df['debt_service_coverage_ratio'] = df['ebitda'] / (df['interest_expense'] + df['principal_payment'])
+        df = with_ratios(financials_df, RATIOS.group('leverage'))
         
         logger.info("Leverage ratios calculated")
         return df
@@ -157,24 +248,10 @@ class FinancialRatioCalculator:
         """
         logger.info("Calculating growth ratios...")
         
-        df = financials_df.copy()
-        
-        # Revenue Growth (Month-over-Month)
-        df['revenue_growth_mom'] = df['total_revenue'].pct_change() * 100
-        
-        # Profit Growth (Month-over-Month)
-        df['profit_growth_mom'] = df['net_profit'].pct_change() * 100
-        
-        # EBITDA Growth
-        df['ebitda_growth_mom'] = df['ebitda'].pct_change() * 100
-        
-        # Calculate rolling 3-month average growth
-        df['revenue_growth_3m_avg'] = df['revenue_growth_mom'].rolling(window=3).mean()
-        
-        # Calculate Year-over-Year growth (if enough data)
-        if len(df) >= 12:
-            df['revenue_growth_yoy'] = df['total_revenue'].pct_change(periods=12) * 100
-            df['profit_growth_yoy'] = df['net_profit'].pct_change(periods=12) * 100
+        names = RATIOS.group('growth')
+        if len(financials_df) < 12:
+            names = [name for name in names if name not in YOY_RATIOS]
+        df = with_ratios(financials_df, names)
         
         logger.info("Growth ratios calculated")
         return df
@@ -183,28 +260,37 @@ class FinancialRatioCalculator:
                             monthly_cash_flow: pd.DataFrame) -> pd.DataFrame:
         """
         Calculate all financial ratios
+        
+        Produces the same columns as chaining analyze_working_capital,
+        calculate_cash_conversion_cycle and the five ratio methods, but in
+        one registry run with a single output frame.
         """
         logger.info("Calculating all financial ratios...")
         
-        # Start with base financials
-        df = monthly_financials.copy()
-        
-        # Add working capital components
-        from src.financial_engine.cash_flow import CashFlowAnalyzer
-        cash_analyzer = CashFlowAnalyzer()
-        df = cash_analyzer.analyze_working_capital(df)
-        df = cash_analyzer.calculate_cash_conversion_cycle(df)
-        
-        # Calculate all ratio categories
-        df = self.calculate_profitability_ratios(df)
-        df = self.calculate_liquidity_ratios(df, monthly_cash_flow)
-        df = self.calculate_efficiency_ratios(df)
-        df = self.calculate_leverage_ratios(df)
-        df = self.calculate_growth_ratios(df)
+        names = RATIOS.names
+        if len(monthly_financials) < 12:
+            names = [name for name in names if name not in YOY_RATIOS]
+        df = with_ratios(monthly_financials, names, monthly_cash_flow)
         
         logger.info("All ratios calculated successfully")
         return df
     
+    def calculate_ratios(self, monthly_financials: pd.DataFrame, monthly_cash_flow: pd.DataFrame,
+                         ratios: List[str]) -> pd.DataFrame:
+        """
+        Calculate only the named ratios and whatever they depend on
+        
+        Returns the requested columns (plus period, when present) on the
+        statement's index; unknown ratio names raise KeyError.
+        """
+        values = _ratio_run(monthly_financials, monthly_cash_flow, ratios).compute(ratios)
+        
+        columns = {}
+        if 'period' in monthly_financials.columns:
+            columns['period'] = monthly_financials['period'].to_numpy()
+        columns.update(values)
+        return pd.DataFrame(columns, index=monthly_financials.index)
+    
     def get_ratio_summary(self, ratios_df: pd.DataFrame) -> Dict:
         """
         Get summary statistics for all ratios
@@ -0,0 +1,157 @@
+"""
+Run-Length Analysis Module
+Negative cash-flow streaks, low-balance episodes and drawdowns in array passes
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _group_starts(groups: Optional[np.ndarray], n: int) -> np.ndarray:
+    """
+    Boolean mask of rows that open a new group (row 0 always does)
+    """
+    starts = np.zeros(n, dtype=bool)
+    if n:
+        starts[0] = True
+        if groups is not None:
+            starts[1:] = groups[1:] != groups[:-1]
+    return starts
+
+
+def find_runs(mask: np.ndarray, groups: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Maximal stretches of consecutive True values, never crossing a group change
+
+    Returns start and end row positions (inclusive) and lengths, in row order.
+    Rows must already be ordered by group, then time.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    new_group = _group_starts(groups, len(mask))
+
+    previous = np.concatenate([[False], mask[:-1]])
+    following = np.concatenate([mask[1:], [False]])
+    last_in_group = np.concatenate([new_group[1:], [True]])
+
+    starts = np.flatnonzero(mask & (~previous | new_group))
+    ends = np.flatnonzero(mask & (~following | last_in_group))
+    return {'start': starts, 'end': ends, 'length': ends - starts + 1}
+
+
+def _sorted_frame(df: pd.DataFrame, group_column: Optional[str], date_column: str) -> pd.DataFrame:
+    """
+    df ordered by group then date, without copying when it already is
+    """
+    keys = [group_column, date_column] if group_column else [date_column]
+    if group_column is None and df[date_column].is_monotonic_increasing:
+        return df
+    return df.sort_values(keys, kind='stable')
+
+
+def _run_frame(df: pd.DataFrame, mask: np.ndarray, values: np.ndarray,
+               group_column: Optional[str], date_column: str) -> pd.DataFrame:
+    """
+    One row per run of mask with its dates, length, and the sum and minimum of values
+    """
+    groups = df[group_column].to_numpy() if group_column else None
+    runs = find_runs(mask, groups)
+    starts, ends, lengths = runs['start'], runs['end'], runs['length']
+
+    # The masked rows are exactly the runs laid end to end, so reduce at run offsets
+    run_values = values[mask]
+    offsets = np.cumsum(lengths) - lengths
+    if len(starts):
+        totals, minimums = np.add.reduceat(run_values, offsets), np.minimum.reduceat(run_values, offsets)
+    else:
+        totals, minimums = np.array([], dtype='float64'), np.array([], dtype='float64')
+
+    result = {}
+    if group_column:
+        result[group_column] = groups[starts]
+    dates = df[date_column].to_numpy()
+    result.update({
+        'start_date': dates[starts],
+        'end_date': dates[ends],
+        'length': lengths,
+        'total': totals,
+        'minimum': minimums,
+    })
+    return pd.DataFrame(result)
+
+
+def negative_flow_streaks(daily_cash_flow: pd.DataFrame, value_column: str = 'net_cash_flow',
+                          group_column: Optional[str] = None, date_column: str = 'date') -> pd.DataFrame:
+    """
+    Every streak of consecutive days with negative net cash flow
+
+    Columns: [group_column,] start_date, end_date, length, depth (worst single
+    day) and cumulative_drawdown (sum of the streak's flows). Missing flows
+    break a streak.
+    """
+    df = _sorted_frame(daily_cash_flow, group_column, date_column)
+    values = df[value_column].to_numpy(dtype='float64')
+
+    streaks = _run_frame(df, values < 0, values, group_column, date_column)
+    return streaks.rename(columns={'minimum': 'depth', 'total': 'cumulative_drawdown'})
+
+
+def below_threshold_episodes(daily_cash_flow: pd.DataFrame, threshold: float = 0.0,
+                             value_column: str = 'cash_balance', group_column: Optional[str] = None,
+                             date_column: str = 'date') -> pd.DataFrame:
+    """
+    Every episode of consecutive days with the balance below threshold
+
+    Columns: [group_column,] start_date, end_date, length and trough (lowest
+    balance in the episode).
+    """
+    df = _sorted_frame(daily_cash_flow, group_column, date_column)
+    values = df[value_column].to_numpy(dtype='float64')
+
+    episodes = _run_frame(df, values < threshold, values, group_column, date_column)
+    return episodes.drop(columns='total').rename(columns={'minimum': 'trough'})
+
+
+def max_drawdown(daily_cash_flow: pd.DataFrame, value_column: str = 'cash_balance',
+                 group_column: Optional[str] = None, date_column: str = 'date') -> pd.DataFrame:
+    """
+    Largest peak-to-trough fall of the balance, per group
+
+    Columns: [group_column,] max_drawdown, max_drawdown_pct (of the peak),
+    peak_date and trough_date. A balance that never falls has drawdown 0.
+    """
+    df = _sorted_frame(daily_cash_flow, group_column, date_column)
+    values = df[value_column].to_numpy(dtype='float64')
+    positions = np.arange(len(df))
+
+    if group_column:
+        grouped = pd.Series(values).groupby(df[group_column].to_numpy(), sort=False)
+        running_peak = grouped.cummax().to_numpy()
+        peak_positions = pd.Series(np.where(values == running_peak, positions, -1)).groupby(
+            df[group_column].to_numpy(), sort=False).cummax().to_numpy()
+    else:
+        running_peak = pd.Series(values).cummax().to_numpy()
+        peak_positions = np.maximum.accumulate(np.where(values == running_peak, positions, -1))
+    drawdown = running_peak - values
+
+    # Deepest point per group: argmax of drawdown within each group
+    frame = pd.DataFrame({'group': df[group_column].to_numpy() if group_column else 0, 'drawdown': drawdown})
+    troughs = frame.groupby('group', sort=False)['drawdown'].idxmax().to_numpy()
+    peaks = peak_positions[troughs]
+
+    dates = df[date_column].to_numpy()
+    result = {}
+    if group_column:
+        result[group_column] = df[group_column].to_numpy()[troughs]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result.update({
+            'max_drawdown': drawdown[troughs],
+            'max_drawdown_pct': drawdown[troughs] / running_peak[troughs],
+            'peak_date': dates[peaks],
+            'trough_date': dates[troughs],
+        })
+    return pd.DataFrame(result)
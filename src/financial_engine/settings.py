@@ -0,0 +1,208 @@
+"""
+Settings Module
+Process-wide, validated and read-only financial settings from config files
+"""
+
+import json
+import os
+import threading
+import logging
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+import yaml
+
+from src.data_processing.cache import file_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+DEFAULT_EXPENSE_RATIOS_PATH = "config/expense_ratios.json"
+
+DEFAULT_FINANCIAL = {
+    'expense_ratios': {
+        'salaries': 0.12,
+        'rent': 0.06,
+        'utilities': 0.02,
+        'marketing': 0.04,
+        'logistics': 0.05,
+        'insurance': 0.01,
+        'other': 0.05
+    },
+    'tax_rate': 0.25,
+    'depreciation_rate': 0.02,
+    'interest_rate': 0.03,
+}
+
+DEFAULT_INDUSTRY_EXPENSE_RATIOS = {
+    'retail_electronics': DEFAULT_FINANCIAL['expense_ratios'],
+}
+
+# Loaded stores keyed by (config path, expense ratios path)
+_stores: Dict[Tuple[str, str], 'SettingsStore'] = {}
+_stores_lock = threading.Lock()
+
+
+def _frozen_ratios(ratios: Mapping, label: str) -> Mapping[str, float]:
+    """
+    Validate a name -> ratio mapping and return a read-only copy
+    """
+    if not isinstance(ratios, Mapping):
+        raise ValueError(f"{label} must be a mapping of expense name to ratio")
+    frozen = {}
+    for name, ratio in ratios.items():
+        if isinstance(ratio, bool) or not isinstance(ratio, (int, float)) or not 0 <= ratio < 1:
+            raise ValueError(f"{label}.{name} must be a number in [0, 1), got {ratio!r}")
+        frozen[str(name)] = float(ratio)
+    if sum(frozen.values()) >= 1:
+        raise ValueError(f"{label} add up to {sum(frozen.values()):.2f}; expenses must stay below revenue")
+    return MappingProxyType(frozen)
+
+
+@dataclass(frozen=True)
+class FinancialSettings:
+    """Immutable financial assumptions shared by statement and synthetic data generators"""
+
+    expense_ratios: Mapping[str, float]
+    tax_rate: float
+    depreciation_rate: float
+    interest_rate: float
+    industry_expense_ratios: Mapping[str, Mapping[str, float]] = field(
+        default_factory=lambda: MappingProxyType({}))
+    config: Mapping = field(default_factory=lambda: MappingProxyType({}), compare=False)
+
+    def __post_init__(self):
+        """
+        Validate rates and freeze the ratio mappings
+        """
+        for name in ['tax_rate', 'depreciation_rate', 'interest_rate']:
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value < 1:
+                raise ValueError(f"financial.{name} must be a number in [0, 1), got {value!r}")
+            object.__setattr__(self, name, float(value))
+
+        object.__setattr__(self, 'expense_ratios', _frozen_ratios(self.expense_ratios, 'financial.expense_ratios'))
+        object.__setattr__(self, 'industry_expense_ratios', MappingProxyType({
+            industry: _frozen_ratios(ratios, f"expense_ratios.{industry}")
+            for industry, ratios in self.industry_expense_ratios.items()
+        }))
+        object.__setattr__(self, 'config', MappingProxyType(dict(self.config)))
+
+    @classmethod
+    def from_config(cls, config: Optional[Mapping] = None,
+                    industry_expense_ratios: Optional[Mapping] = None) -> 'FinancialSettings':
+        """
+        Build settings from parsed config.yaml and expense_ratios.json content
+        """
+        config = config or {}
+        financial = config.get('financial') or {}
+        missing = [key for key in DEFAULT_FINANCIAL if key not in financial]
+        if config and missing:
+            raise ValueError(f"config.yaml financial section is missing: {missing}")
+        financial = {**DEFAULT_FINANCIAL, **financial}
+
+        return cls(
+            expense_ratios=financial['expense_ratios'],
+            tax_rate=financial['tax_rate'],
+            depreciation_rate=financial['depreciation_rate'],
+            interest_rate=financial['interest_rate'],
+            industry_expense_ratios=industry_expense_ratios or DEFAULT_INDUSTRY_EXPENSE_RATIOS,
+            config=config,
+        )
+
+    def with_overrides(self, expense_ratios: Optional[Mapping[str, float]] = None, **changes) -> 'FinancialSettings':
+        """
+        Copy with tenant-specific values; expense_ratios entries are merged in
+        """
+        if expense_ratios:
+            changes['expense_ratios'] = {**self.expense_ratios, **expense_ratios}
+        return replace(self, **changes)
+
+
+class SettingsStore:
+    """Settings parsed once per file version, re-read only when a file's mtime or size changes"""
+
+    def __init__(self, config_path: str = DEFAULT_CONFIG_PATH,
+                 expense_ratios_path: str = DEFAULT_EXPENSE_RATIOS_PATH):
+        self.config_path = config_path
+        self.expense_ratios_path = expense_ratios_path
+        self._settings: Optional[FinancialSettings] = None
+        self._stamps = None
+        self._lock = threading.Lock()
+
+    def _file_stamps(self) -> Tuple:
+        """
+        (path, size, mtime) of each file, or None for a file that is absent
+        """
+        stamps = []
+        for path in [self.config_path, self.expense_ratios_path]:
+            try:
+                stamps.append(file_fingerprint(path))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _load(self, stamps: Tuple) -> FinancialSettings:
+        """
+        Parse and validate both files; absent files fall back to defaults
+        """
+        config, industry_ratios = {}, None
+        if stamps[0] is None:
+            logger.warning(f"Config file not found at {self.config_path}, using defaults")
+        else:
+            with open(self.config_path, 'r') as f:
+                config = yaml.safe_load(f) or {}
+        if stamps[1] is None:
+            logger.warning(f"Expense ratio file not found at {self.expense_ratios_path}, using defaults")
+        else:
+            with open(self.expense_ratios_path, 'r') as f:
+                industry_ratios = json.load(f)
+        return FinancialSettings.from_config(config, industry_ratios)
+
+    def get(self) -> FinancialSettings:
+        """
+        Current settings; a stat of each file per call, parsing only on change
+
+        If an edited file fails to parse or validate, the previous settings
+        stay in use and the error is logged. The first load raises instead.
+        """
+        stamps = self._file_stamps()
+        if stamps == self._stamps:
+            return self._settings
+
+        with self._lock:
+            if stamps != self._stamps:
+                try:
+                    settings = self._load(stamps)
+                except (ValueError, yaml.YAMLError) as exc:
+                    if self._settings is None:
+                        raise
+                    logger.error(f"Ignoring invalid settings change, keeping previous: {exc}")
+                    settings = self._settings
+                else:
+                    if self._stamps is not None:
+                        logger.info(f"Reloaded settings from {self.config_path}")
+                self._settings, self._stamps = settings, stamps
+            return self._settings
+
+
+def get_settings(config_path: str = DEFAULT_CONFIG_PATH,
+                 expense_ratios_path: str = DEFAULT_EXPENSE_RATIOS_PATH) -> FinancialSettings:
+    """
+    Shared settings for a pair of config files, loaded once per process
+    """
+    key = (os.path.abspath(config_path), os.path.abspath(expense_ratios_path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SettingsStore(config_path, expense_ratios_path)
+    return store.get()
+
+
+def clear_settings():
+    """
+    Forget all loaded settings, e.g. between tests
+    """
+    with _stores_lock:
+        _stores.clear()
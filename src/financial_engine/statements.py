@@ -6,8 +6,11 @@ Generates P&L, Balance Sheet, and financial metrics
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict
-import yaml
+from typing import Dict, Iterable, List, Optional
+
+from src.financial_engine.formula_graph import Formula, FormulaGraph
+from src.financial_engine.pnl_cube import PnLCube
+from src.financial_engine.settings import FinancialSettings, get_settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,29 +19,16 @@ logger = logging.getLogger(__name__)
 class FinancialStatementGenerator:
     """Generate financial statements from transaction data"""
     
-    def __init__(self, config_path: str = "config/config.yaml"):
-        # Load configuration
-        try:
-            with open(config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
-            self.expense_ratios = self.config['financial']['expense_ratios']
-            self.tax_rate = self.config['financial']['tax_rate']
-            self.depreciation_rate = self.config['financial']['depreciation_rate']
-            self.interest_rate = self.config['financial']['interest_rate']
-        except FileNotFoundError:
-            logger.warning(f"Config file not found at {config_path}, using defaults")
-            self.expense_ratios = {
-                'salaries': 0.12,
-                'rent': 0.06,
-                'utilities': 0.02,
-                'marketing': 0.04,
-                'logistics': 0.05,
-                'insurance': 0.01,
-                'other': 0.05
-            }
-            self.tax_rate = 0.25
-            self.depreciation_rate = 0.02
-            self.interest_rate = 0.03
+    def __init__(self, config_path: str = "config/config.yaml", settings: Optional[FinancialSettings] = None):
+        # Shared settings parsed once per config file version; pass settings
+        # (e.g. get_settings().with_overrides(...)) to inject a tenant's own
+        self.settings = settings or get_settings(config_path)
+        self.config = self.settings.config
+        self.expense_ratios = self.settings.expense_ratios
+        self.tax_rate = self.settings.tax_rate
+        self.depreciation_rate = self.settings.depreciation_rate
+        self.interest_rate = self.settings.interest_rate
+        self.pnl_graph = None
     
     def generate_monthly_financials(self, sales_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -47,13 +37,52 @@ class FinancialStatementGenerator:
         logger.info("Generating monthly financial statements...")
         
         # Aggregate by period
-        monthly = sales_df.groupby('period').agg({
+        monthly = self._aggregate_by_period(sales_df)
+        
+        monthly = self._build_monthly_statement(monthly)
+        
+        logger.info(f"Generated financials for {len(monthly)} periods")
+        return monthly
+    
+    def generate_monthly_financials_from_chunks(self, sales_chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Generate the monthly P&L from cleaned sales chunks or month partitions
+        
+        Only per-period partial sums are kept between chunks, so memory does
+        not grow with the length of the sales history.
+        """
+        logger.info("Generating monthly financial statements from chunks...")
+        
+        partials = []
+        for chunk in sales_chunks:
+            if len(chunk) > 0:
+                partials.append(self._aggregate_by_period(chunk))
+        
+        if not partials:
+            raise ValueError("No sales rows to aggregate")
+        
+        # Periods split across chunks are combined by summing their partials
+        monthly = pd.concat(partials, ignore_index=True).groupby('period').sum().reset_index()
+        
+        monthly = self._build_monthly_statement(monthly)
+        
+        logger.info(f"Generated financials for {len(monthly)} periods")
+        return monthly
+    
+    def _aggregate_by_period(self, sales_df: pd.DataFrame, keys: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Sum revenue, COGS, gross profit and units per period (or per keys)
+        """
+        monthly = sales_df.groupby(keys or 'period', observed=True).agg({
             'revenue': 'sum',
             'cogs': 'sum',
             'gross_profit': 'sum',
             'Quantity': 'sum'
         }).reset_index()
         
+        # Cleaned sales carry period as a categorical; statements use plain labels
+        monthly['period'] = monthly['period'].astype(str)
+        
         # Rename columns for clarity
         monthly.rename(columns={
             'revenue': 'total_revenue',
@@ -62,57 +91,111 @@ class FinancialStatementGenerator:
             'Quantity': 'units_sold'
         }, inplace=True)
         
-        # Calculate gross margin
-        monthly['gross_margin'] = monthly['gross_profit'] / monthly['total_revenue']
+        return monthly
+    
+    def _build_monthly_statement(self, monthly: pd.DataFrame) -> pd.DataFrame:
+        """
+        Derive the P&L lines below gross profit from per-period totals
+        
+        The evaluated graph is kept on self.pnl_graph, so a changed month or
+        assumption can be applied with update()/set_params() without a rebuild.
+        """
+        self.pnl_graph = self.build_pnl_graph()
+        return self.pnl_graph.evaluate(monthly, self.pnl_params())
+    
+    def generate_portfolio_financials(self, sales_df: pd.DataFrame,
+                                      tenant_params: Optional[pd.DataFrame] = None,
+                                      id_column: str = 'sme_id') -> pd.DataFrame:
+        """
+        Generate monthly P&L for every SME in one long sales frame
+        
+        Rows are aggregated per (id_column, period) in one groupby and the P&L
+        formulas run once over all tenants. tenant_params overrides the
+        generator's rates per SME: it is indexed by SME id (or has an
+        id_column column) and its columns are pnl_params() names such as
+        tax_rate or expense_ratio_rent. Missing SMEs or NaN cells fall back to
+        the generator's own values.
+        """
+        logger.info("Generating portfolio monthly financial statements...")
+        
+        monthly = self._aggregate_by_period(sales_df, [id_column, 'period'])
+        params = self.pnl_params()
+        
+        if tenant_params is not None:
+            if id_column in tenant_params.columns:
+                tenant_params = tenant_params.set_index(id_column)
+            unknown = set(tenant_params.columns) - set(params)
+            if unknown:
+                raise ValueError(f"Unknown tenant parameters: {sorted(unknown)}")
+            
+            # Join once: one value per statement row, defaults where not overridden
+            per_row = tenant_params.reindex(monthly[id_column].to_numpy())
+            for name in tenant_params.columns:
+                params[name] = per_row[name].fillna(params[name]).to_numpy(dtype='float64')
         
-        # Calculate operating expenses (synthetic)
-        monthly = self._add_operating_expenses(monthly)
+        self.pnl_graph = self.build_pnl_graph()
+        portfolio = self.pnl_graph.evaluate(monthly, params)
         
-        # Calculate EBITDA
-        monthly['ebitda'] = monthly['gross_profit'] - monthly['operating_expenses']
+        logger.info(f"Generated financials for {monthly[id_column].nunique()} SMEs, {len(portfolio)} SME-periods")
+        return portfolio
+    
+    def pnl_params(self) -> Dict:
+        """
+        Rates and expense ratios read by the P&L formulas
+        """
+        params = {
+            'tax_rate': self.tax_rate,
+            'depreciation_rate': self.depreciation_rate,
+            'interest_rate': self.interest_rate,
+        }
+        for expense_type, ratio in self.expense_ratios.items():
+            params[f'expense_ratio_{expense_type}'] = ratio
+        return params
+    
+    def build_pnl_graph(self) -> FormulaGraph:
+        """
+        P&L lines from gross margin down to ROA as row-wise formulas
+        """
+        expense_columns = [f'expense_{exp}' for exp in self.expense_ratios.keys()]
         
-        # Calculate depreciation
-        monthly['depreciation'] = monthly['total_revenue'] * self.depreciation_rate
+        graph = FormulaGraph()
+        graph.add(Formula('gross_margin', lambda gp, rev: gp / rev, ['gross_profit', 'total_revenue']))
         
-        # Calculate interest expense (assume some debt financing)
-        monthly['interest_expense'] = monthly['total_revenue'] * self.interest_rate
+        # Synthetic operating expenses as fixed shares of revenue
+        for expense_type, column in zip(self.expense_ratios.keys(), expense_columns):
+            graph.add(Formula(column, lambda rev, ratio: rev * ratio,
+                              ['total_revenue'], [f'expense_ratio_{expense_type}']))
+        # Starts from zero so settings without expense ratios still get a column
+        graph.add(Formula('operating_expenses', lambda rev, *expenses: sum(expenses, np.zeros_like(rev)),
+                          ['total_revenue'] + expense_columns))
         
-        # Calculate EBT (Earnings Before Tax)
-        monthly['ebt'] = monthly['ebitda'] - monthly['depreciation'] - monthly['interest_expense']
+        graph.add(Formula('ebitda', lambda gp, opex: gp - opex, ['gross_profit', 'operating_expenses']))
+        graph.add(Formula('depreciation', lambda rev, rate: rev * rate, ['total_revenue'], ['depreciation_rate']))
         
-        # Calculate tax expense
-        monthly['tax_expense'] = monthly['ebt'].apply(lambda x: max(0, x * self.tax_rate))
+        # Interest expense (assume some debt financing)
+        graph.add(Formula('interest_expense', lambda rev, rate: rev * rate, ['total_revenue'], ['interest_rate']))
+        graph.add(Formula('ebt', lambda ebitda, dep, interest: ebitda - dep - interest,
+                          ['ebitda', 'depreciation', 'interest_expense']))
         
-        # Calculate net profit
-        monthly['net_profit'] = monthly['ebt'] - monthly['tax_expense']
+        # No tax on losses; NaN earnings are taxed at 0 as well
+        graph.add(Formula('tax_expense', lambda ebt, rate: np.where(ebt * rate > 0, ebt * rate, 0.0),
+                          ['ebt'], ['tax_rate']))
+        graph.add(Formula('net_profit', lambda ebt, tax: ebt - tax, ['ebt', 'tax_expense']))
         
-        # Calculate margins
-        monthly['operating_margin'] = monthly['ebitda'] / monthly['total_revenue']
-        monthly['net_profit_margin'] = monthly['net_profit'] / monthly['total_revenue']
+        graph.add(Formula('operating_margin', lambda ebitda, rev: ebitda / rev, ['ebitda', 'total_revenue']))
+        graph.add(Formula('net_profit_margin', lambda net, rev: net / rev, ['net_profit', 'total_revenue']))
         
-        # Calculate ROA (Return on Assets) - simplified
-        # Assume assets = 2x monthly revenue
-        monthly['estimated_assets'] = monthly['total_revenue'] * 2
-        monthly['roa'] = (monthly['net_profit'] / monthly['estimated_assets']) * 12  # Annualized
+        # ROA (simplified): assume assets = 2x monthly revenue, annualized
+        graph.add(Formula('estimated_assets', lambda rev: rev * 2, ['total_revenue']))
+        graph.add(Formula('roa', lambda net, assets: (net / assets) * 12, ['net_profit', 'estimated_assets']))
         
-        logger.info(f"Generated financials for {len(monthly)} periods")
-        return monthly
+        return graph
     
-    def _add_operating_expenses(self, df: pd.DataFrame) -> pd.DataFrame:
+    def generate_pnl_cube(self, sales_df: pd.DataFrame, fiscal_year_start: int = 4) -> PnLCube:
         """
-        Add synthetic operating expenses based on revenue
+        Aggregate sales once into a monthly P&L cube for every roll-up grain
         """
-        df = df.copy()
-        
-        # Calculate individual expense categories
-        for expense_type, ratio in self.expense_ratios.items():
-            df[f'expense_{expense_type}'] = df['total_revenue'] * ratio
-        
-        # Calculate total operating expenses
-        expense_columns = [f'expense_{exp}' for exp in self.expense_ratios.keys()]
-        df['operating_expenses'] = df[expense_columns].sum(axis=1)
-        
-        return df
+        return PnLCube(self.generate_monthly_financials(sales_df), fiscal_year_start)
     
     def generate_quarterly_financials(self, monthly_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -120,66 +203,33 @@ class FinancialStatementGenerator:
         """
         logger.info("Generating quarterly financials...")
         
-        # Add quarter column
-        monthly_df['quarter'] = pd.to_datetime(monthly_df['period']).dt.to_period('Q').astype(str)
-        
-        # Aggregate to quarterly
-        quarterly = monthly_df.groupby('quarter').agg({
-            'total_revenue': 'sum',
-            'total_cogs': 'sum',
-            'gross_profit': 'sum',
-            'operating_expenses': 'sum',
-            'ebitda': 'sum',
-            'depreciation': 'sum',
-            'interest_expense': 'sum',
-            'tax_expense': 'sum',
-            'net_profit': 'sum',
-            'units_sold': 'sum'
-        }).reset_index()
-        
-        # Recalculate margins
-        quarterly['gross_margin'] = quarterly['gross_profit'] / quarterly['total_revenue']
-        quarterly['operating_margin'] = quarterly['ebitda'] / quarterly['total_revenue']
-        quarterly['net_profit_margin'] = quarterly['net_profit'] / quarterly['total_revenue']
+        quarterly = PnLCube(monthly_df).rollup('quarter')
         
         logger.info(f"Generated {len(quarterly)} quarterly periods")
         return quarterly
     
     def generate_annual_financials(self, monthly_df: pd.DataFrame) -> pd.DataFrame:
         """
-        Aggregate monthly data to annual
+        Aggregate monthly data to annual, with year-over-year growth
         """
         logger.info("Generating annual financials...")
         
-        # Add year column
-        monthly_df['year'] = pd.to_datetime(monthly_df['period']).dt.year
-        
-        # Aggregate to annual
-        annual = monthly_df.groupby('year').agg({
-            'total_revenue': 'sum',
-            'total_cogs': 'sum',
-            'gross_profit': 'sum',
-            'operating_expenses': 'sum',
-            'ebitda': 'sum',
-            'depreciation': 'sum',
-            'interest_expense': 'sum',
-            'tax_expense': 'sum',
-            'net_profit': 'sum',
-            'units_sold': 'sum'
-        }).reset_index()
-        
-        # Recalculate margins
-        annual['gross_margin'] = annual['gross_profit'] / annual['total_revenue']
-        annual['operating_margin'] = annual['ebitda'] / annual['total_revenue']
-        annual['net_profit_margin'] = annual['net_profit'] / annual['total_revenue']
-        
-        # Calculate year-over-year growth
-        annual['revenue_growth_yoy'] = annual['total_revenue'].pct_change()
-        annual['profit_growth_yoy'] = annual['net_profit'].pct_change()
+        annual = PnLCube(monthly_df).rollup('year')
         
         logger.info(f"Generated {len(annual)} annual periods")
         return annual
     
+    def generate_fiscal_financials(self, monthly_df: pd.DataFrame, fiscal_year_start: int = 4) -> pd.DataFrame:
+        """
+        Aggregate monthly data to fiscal years starting in fiscal_year_start
+        """
+        logger.info("Generating fiscal year financials...")
+        
+        fiscal = PnLCube(monthly_df, fiscal_year_start).rollup('fiscal_year')
+        
+        logger.info(f"Generated {len(fiscal)} fiscal years")
+        return fiscal
+    
     def get_financial_summary(self, monthly_df: pd.DataFrame) -> Dict:
         """
         Get key financial metrics summary
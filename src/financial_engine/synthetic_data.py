@@ -6,8 +6,10 @@ Creates realistic financial data for missing components
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict
-import json
+from typing import Dict, Optional
+
+from src.financial_engine.amortization import AmortizationSchedule
+from src.financial_engine.settings import FinancialSettings, get_settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,28 +18,10 @@ logger = logging.getLogger(__name__)
 class SyntheticDataGenerator:
     """Generate synthetic financial data based on industry benchmarks"""
     
-    def __init__(self, config_path: str = "config/expense_ratios.json"):
-        # Load expense ratios by industry
-        try:
-            with open(config_path, 'r') as f:
-                self.expense_ratios = json.load(f)
-        except FileNotFoundError:
-            logger.warning(f"Config file not found, using defaults")
-            self.expense_ratios = self._get_default_ratios()
-    
-    def _get_default_ratios(self) -> Dict:
-        """Default expense ratios if config not found"""
-        return {
-            "retail_electronics": {
-                "salaries": 0.12,
-                "rent": 0.06,
-                "utilities": 0.02,
-                "marketing": 0.04,
-                "logistics": 0.05,
-                "insurance": 0.01,
-                "other": 0.05
-            }
-        }
+    def __init__(self, config_path: str = "config/expense_ratios.json", settings: Optional[FinancialSettings] = None):
+        # Expense ratios by industry, from the shared settings
+        self.settings = settings or get_settings(expense_ratios_path=config_path)
+        self.expense_ratios = self.settings.industry_expense_ratios
     
     def generate_tax_data(self, financials_df: pd.DataFrame, 
                          gst_rate: float = 0.18) -> pd.DataFrame:
@@ -82,38 +66,40 @@ class SyntheticDataGenerator:
                           term_years: int = 5) -> pd.DataFrame:
         """
         Generate synthetic loan/credit data
+        
+        The loan is drawn before the first period: each row shows the balance
+        it opens with, the interest on that balance and the principal repaid.
+        Rows after the term have no payment, and no DSCR.
         """
         logger.info("Generating synthetic loan data...")
         
-        df = financials_df.copy()
-        
-        # Calculate monthly loan payment (EMI)
-        monthly_rate = interest_rate / 12
-        num_payments = term_years * 12
+        df = financials_df.copy(deep=False)
+        schedule = AmortizationSchedule(loan_amount, interest_rate, term_years, n_periods=len(df))
         
-        if monthly_rate > 0:
-            emi = loan_amount * monthly_rate * (1 + monthly_rate)**num_payments / \
-                  ((1 + monthly_rate)**num_payments - 1)
-        else:
-            emi = loan_amount / num_payments
-        
-        # Generate loan schedule
-        df['loan_balance'] = loan_amount
-        df['loan_payment'] = emi
-        df['loan_interest'] = df['loan_balance'] * monthly_rate
-        df['loan_principal'] = df['loan_payment'] - df['loan_interest']
-        
-        # Calculate remaining balance (simplified - assumes constant balance for now)
-        # In reality, this should decrease each month
-        for i in range(1, len(df)):
-            df.loc[i, 'loan_balance'] = max(0, df.loc[i-1, 'loan_balance'] - df.loc[i-1, 'loan_principal'])
+        df['loan_balance'] = schedule.opening_balance[0]
+        df['loan_payment'] = schedule.payments[0]
+        df['loan_interest'] = schedule.interest[0]
+        df['loan_principal'] = schedule.principal[0]
         
         # Debt Service Coverage Ratio
-        df['dscr'] = df['ebitda'] / df['loan_payment']
+        df['dscr'] = schedule.dscr(df['ebitda'])[0]
         
-        logger.info(f"Generated loan schedule with EMI: ${emi:,.2f}")
+        logger.info(f"Generated loan schedule with EMI: ${schedule.payment[0]:,.2f}")
         return df
     
+    def generate_loan_scenarios(self, financials_df: pd.DataFrame,
+                                loan_amounts, interest_rates, term_years,
+                                dscr_threshold: float = 1.25) -> pd.DataFrame:
+        """
+        DSCR summary of every amount x rate x term loan structure against EBITDA
+        """
+        schedule = AmortizationSchedule.grid(loan_amounts, interest_rates, term_years)
+        summary = schedule.dscr_summary(financials_df['ebitda'], threshold=dscr_threshold)
+        
+        logger.info(f"Evaluated {len(schedule)} loan scenarios, "
+                    f"{int(summary['meets_threshold'].sum())} meet DSCR {dscr_threshold}")
+        return summary
+    
     def generate_compliance_flags(self, financials_df: pd.DataFrame,
                                   tax_df: pd.DataFrame = None) -> pd.DataFrame:
         """
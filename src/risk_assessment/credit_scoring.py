@@ -29,7 +29,7 @@ class CreditScorer:
         """
         Score based on profitability metrics (0-100)
         """
-        df = ratios_df.copy()
+        df = ratios_df
         
         # Normalize metrics to 0-100 scale
         gross_margin_score = np.clip(df['gross_profit_margin'] / 60 * 100, 0, 100)
@@ -45,7 +45,7 @@ class CreditScorer:
         """
         Score based on liquidity metrics (0-100)
         """
-        df = ratios_df.copy()
+        df = ratios_df
         
         # Current ratio score (ideal: 2.0, max credit: 3.0)
         current_ratio_score = np.clip((df['current_ratio'] / 3.0) * 100, 0, 100)
@@ -66,7 +66,7 @@ class CreditScorer:
         Score based on leverage metrics (0-100)
         Lower debt = higher score
         """
-        df = ratios_df.copy()
+        df = ratios_df
         
         # Debt-to-equity score (lower is better, penalize >2.0)
         debt_equity_score = np.clip((2.0 - df['debt_to_equity']) / 2.0 * 100, 0, 100)
@@ -86,7 +86,7 @@ class CreditScorer:
         """
         Score based on efficiency metrics (0-100)
         """
-        df = ratios_df.copy()
+        df = ratios_df
         
         # Asset turnover score (higher is better, ideal: 1.5)
         asset_turnover_score = np.clip((df['asset_turnover'] / 1.5) * 100, 0, 100)
@@ -106,7 +106,7 @@ class CreditScorer:
         """
         Score based on growth metrics (0-100)
         """
-        df = ratios_df.copy()
+        df = ratios_df
         
         # Revenue growth score (positive growth = good, >20% = excellent)
         revenue_growth_score = np.clip((df['revenue_growth_mom'] + 20) / 40 * 100, 0, 100)
@@ -129,7 +129,7 @@ class CreditScorer:
         """
         logger.info("Calculating credit scores...")
         
-        df = ratios_df.copy()
+        df = ratios_df.copy(deep=False)
         
         # Calculate component scores
         df['profitability_score'] = self.calculate_profitability_score(df)
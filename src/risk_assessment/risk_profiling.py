@@ -8,6 +8,8 @@ import numpy as np
 import logging
 from typing import Dict, List
 
+from src.financial_engine.ratios import FinancialRatioCalculator
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,9 @@ logger = logging.getLogger(__name__)
 class RiskProfiler:
     """Profile and categorize business risks"""
     
+    # The only ratios the risk assessments read
+    REQUIRED_RATIOS = ['current_ratio', 'quick_ratio', 'net_profit_margin_pct', 'debt_to_equity']
+    
     def assess_liquidity_risk(self, ratios_df: pd.DataFrame) -> Dict:
         """Assess liquidity risk level"""
         latest = ratios_df.iloc[-1]
@@ -94,6 +99,14 @@ class RiskProfiler:
             'high_risk_areas': [r['category'] for r in risks if r['level'] == 'High']
         }
 
+    
+    def generate_risk_profile_from_financials(self, monthly_financials: pd.DataFrame,
+                                              monthly_cash_flow: pd.DataFrame) -> Dict:
+        """Generate the risk profile computing only the ratios it needs"""
+        ratios_df = FinancialRatioCalculator().calculate_ratios(
+            monthly_financials, monthly_cash_flow, self.REQUIRED_RATIOS)
+        return self.generate_risk_profile(ratios_df)
+
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""
+Unit Tests for Loan Amortization Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import pandas as pd
+import numpy as np
+from src.financial_engine.amortization import AmortizationSchedule, annuity_payment
+from src.financial_engine.synthetic_data import SyntheticDataGenerator
+
+
+class TestAmortization(unittest.TestCase):
+    """Test closed-form schedules and scenario DSCR"""
+
+    def _loop_schedule(self, amount, annual_rate, months, horizon):
+        """Reference schedule built one month at a time"""
+        rate, payment, balance, rows = annual_rate / 12, annuity_payment(amount, annual_rate, months / 12), amount, []
+        for month in range(horizon):
+            interest = balance * rate if month < months else 0.0
+            principal = payment - interest if month < months else 0.0
+            rows.append((balance, interest, principal))
+            balance = max(balance - principal, 0.0)
+        return np.array(rows)
+
+    def test_schedule_matches_monthly_loop(self):
+        """Test balance, interest and principal against an iterative schedule"""
+        schedule = AmortizationSchedule(250000, 0.12, 2, n_periods=30)
+        expected = self._loop_schedule(250000, 0.12, 24, 30)
+
+        np.testing.assert_allclose(schedule.opening_balance[0], expected[:, 0], atol=1e-6)
+        np.testing.assert_allclose(schedule.interest[0], expected[:, 1], atol=1e-6)
+        np.testing.assert_allclose(schedule.principal[0], expected[:, 2], atol=1e-6)
+        self.assertEqual(schedule.closing_balance[0, 23], 0.0)
+        self.assertTrue((schedule.payments[0, 24:] == 0).all())
+
+    def test_zero_rate_loan(self):
+        """Test an interest-free loan repays in equal instalments"""
+        schedule = AmortizationSchedule(1200, 0.0, 1)
+
+        np.testing.assert_allclose(schedule.payments[0], 100.0)
+        self.assertTrue((schedule.interest[0] == 0).all())
+        self.assertAlmostEqual(schedule.opening_balance[0, 6], 600.0)
+
+    def test_scenario_grid_and_dscr(self):
+        """Test every amount x rate x term scenario gets its own DSCR row"""
+        schedule = AmortizationSchedule.grid([100000, 200000], [0.08, 0.12, 0.16], [1, 3])
+        ebitda = np.full(36, 10000.0)
+        summary = schedule.dscr_summary(ebitda, threshold=1.25)
+
+        self.assertEqual(len(summary), 12)
+        self.assertEqual(schedule.payments.shape, (12, 36))
+        self.assertEqual(summary[['loan_amount', 'interest_rate', 'term_years']].iloc[1].tolist(), [100000, 0.08, 3])
+
+        # Coverage is EBITDA over that scenario's payment, undefined after repayment
+        coverage = schedule.dscr(ebitda)
+        self.assertAlmostEqual(coverage[0, 0], 10000 / schedule.payment[0])
+        self.assertTrue(np.isnan(coverage[0, 12:]).all())
+        self.assertEqual(summary['months_below_threshold'].iloc[0], 12)
+        self.assertTrue(summary['meets_threshold'].iloc[1])
+
+    def test_generate_loan_data_amortizes(self):
+        """Test the synthetic loan balance falls and payments stop after the term"""
+        financials = pd.DataFrame({'period': [f"2020-{m:02d}" for m in range(1, 13)] + ['2021-01', '2021-02'],
+                                   'ebitda': np.full(14, 50000.0)}, index=np.arange(14) + 100)
+        loan = SyntheticDataGenerator().generate_loan_data(financials, loan_amount=120000,
+                                                           interest_rate=0.12, term_years=1)
+
+        self.assertEqual(list(loan.index), list(financials.index))
+        self.assertTrue((np.diff(loan['loan_balance'].iloc[:12]) < 0).all())
+        np.testing.assert_allclose(loan['loan_interest'], loan['loan_balance'] * 0.01)
+        self.assertAlmostEqual(loan['loan_principal'].iloc[:12].sum(), 120000, places=4)
+        self.assertTrue((loan['loan_payment'].iloc[12:] == 0).all())
+        self.assertTrue(loan['dscr'].iloc[12:].isna().all())
+        self.assertNotIn('loan_balance', financials.columns)
+
+
+if __name__ == '__main__':
+    print("Running Amortization Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
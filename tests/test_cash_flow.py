@@ -75,6 +75,23 @@ class TestCashFlow(unittest.TestCase):
         # First day should have starting cash
         self.assertGreater(result['cash_balance'].iloc[0], 0)
     
+    def test_calendar_gaps_filled(self):
+        """Test days without sales keep their operating expenses and balance"""
+        gappy_sales = self.sample_sales.drop(index=range(10, 20))
+        result = self.cash_analyzer.generate_daily_cash_flow(gappy_sales, self.monthly_financials)
+        
+        self.assertEqual(len(result), 90)
+        self.assertEqual(int((~result['has_sales']).sum()), 10)
+        
+        gap_days = result.iloc[10:20]
+        self.assertTrue((gap_days['cash_inflow'] == 0).all())
+        self.assertTrue((gap_days['net_cash_flow'] < 0).all())
+        
+        # January's full operating expenses are charged despite the gap
+        monthly = self.cash_analyzer.calculate_monthly_cash_flow(result)
+        self.assertAlmostEqual(monthly['cash_outflow_operating'].iloc[0], 300000, places=4)
+        np.testing.assert_allclose(result['cash_balance'], 100000 + result['net_cash_flow'].cumsum())
+    
     def test_monthly_cash_flow_aggregation(self):
         """Test monthly cash flow aggregation"""
         daily = self.cash_analyzer.generate_daily_cash_flow(
@@ -153,7 +170,17 @@ class TestCashFlow(unittest.TestCase):
         # Counts should be non-negative
         self.assertGreaterEqual(issues['issue_count'], 0)
         self.assertGreaterEqual(issues['warning_count'], 0)
-
+    
+    def test_cash_flow_issues_without_date_column(self):
+        """Test streaks are counted in row order on a date-indexed frame"""
+        flows = [100.0] + [-10.0] * 9 + [50.0]
+        daily = pd.DataFrame({
+            'net_cash_flow': flows,
+            'cash_balance': 100000 + np.cumsum(flows),
+        }, index=pd.date_range('2021-01-01', periods=11, freq='D'))
+        
+        issues = self.cash_analyzer.identify_cash_flow_issues(daily)
+        self.assertIn("Maximum 9 consecutive days with negative cash flow", issues['warnings'])
 
 if __name__ == '__main__':
     print("Running Cash Flow Tests...")
@@ -0,0 +1,280 @@
+"""
+Unit Tests for Data Cleaning Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+from src.data_processing.cleaner import DataCleaner
+from src.data_processing.currency import CurrencyConverter
+from src.data_processing.outliers import OutlierDetector
+from src.data_processing.products import get_price_table, clear_price_tables, MAX_PRICE_TABLES
+from src.data_processing.sme_normalizer import SMERiskNormalizer
+
+
+class TestDataCleaner(unittest.TestCase):
+    """Test sales data cleaning"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.cleaner = DataCleaner()
+
+        self.products = pd.DataFrame({
+            'ProductKey': [1, 2, 3],
+            'Unit Price USD': ['$10.00 ', '$1,000.00 ', '$5.00 '],
+            'Unit Cost USD': ['$4.00 ', '$600.00 ', None],
+        })
+
+        self.sales = pd.DataFrame({
+            'Order Date': pd.to_datetime(['2020-01-01', '2020-01-02', '2020-01-03', '2020-02-01', None]),
+            'ProductKey': [1, 2, 3, 1, 2],
+            'Quantity': [2, 1, 4, 0, 1],
+            'Currency Code': ['USD', 'EUR', 'USD', 'EUR', 'USD'],
+        })
+
+        self.exchange_rates = pd.DataFrame({
+            'Date': pd.to_datetime(['2020-01-01', '2020-01-01', '2020-01-02']),
+            'Currency': ['USD', 'EUR', 'EUR'],
+            'Exchange': [1.0, 0.9, 0.8],
+        })
+
+    def test_clean_sales_data(self):
+        """Test invalid rows are dropped and revenue is computed"""
+        result = self.cleaner.clean_sales_data(self.sales, self.products)
+
+        # Zero quantity, missing date and unpriced product rows are removed
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result['revenue'].tolist(), [20.0, 1000.0])
+        self.assertEqual(result['gross_profit'].tolist(), [12.0, 400.0])
+        self.assertEqual(self.cleaner.cleaning_stats['sales']['removed_rows'], 3)
+
+    def test_calendar_fields(self):
+        """Test period fields are derived from one date conversion"""
+        sales = pd.DataFrame({
+            'Order Date': pd.to_datetime(['2019-12-31', '2020-01-15', '2020-04-01', '2019-12-01']),
+            'ProductKey': [1, 1, 1, 1],
+            'Quantity': [1, 1, 1, 1],
+        })
+        result = self.cleaner.clean_sales_data(sales, self.products)
+
+        self.assertEqual(result['period'].astype(str).tolist(), ['2019-12', '2020-01', '2020-04', '2019-12'])
+        self.assertEqual(list(result['period'].cat.categories), ['2019-12', '2020-01', '2020-04'])
+        self.assertEqual(result['year'].tolist(), [2019, 2020, 2020, 2019])
+        self.assertEqual(result['month'].tolist(), [12, 1, 4, 12])
+        self.assertEqual(result['quarter'].tolist(), [4, 1, 2, 4])
+        self.assertEqual(result['date'].iloc[0], pd.Timestamp('2019-12-31'))
+        self.assertEqual(result['date'].dtype, np.dtype('datetime64[ns]'))
+        self.assertEqual(self.cleaner.cleaning_stats['sales']['date_range'], '2019-12-01 to 2020-04-01')
+
+    def test_inputs_not_mutated(self):
+        """Test cleaning leaves the caller's frames untouched"""
+        sales_before = self.sales.copy()
+        sme = pd.DataFrame({'FL1': [1.0, np.nan, 4.0], 'FR1': [0.2, 0.4, 0.6]})
+        sme_before = sme.copy()
+
+        self.cleaner.clean_sales_data(self.sales, self.products)
+        cleaned_sme = self.cleaner.clean_sme_data(sme)
+
+        pd.testing.assert_frame_equal(self.sales, sales_before)
+        pd.testing.assert_frame_equal(sme, sme_before)
+        self.assertEqual(cleaned_sme['FL1'].tolist(), [0.25, 0.625, 1.0])
+
+    def test_peak_memory_reported(self):
+        """Test track_memory adds peak memory to the cleaning stats"""
+        cleaner = DataCleaner(track_memory=True)
+        cleaner.clean_sales_data(self.sales, self.products)
+
+        self.assertGreater(cleaner.cleaning_stats['sales']['peak_memory_mb'], 0)
+        self.assertNotIn('peak_memory_mb', self.cleaner.cleaning_stats.get('sales', {}))
+
+    def test_stage_metrics(self):
+        """Test every cleaning step records timing and row counts"""
+        cleaner = DataCleaner(track_memory=True)
+        cleaner.clean_sales_data(self.sales, self.products)
+        stages = cleaner.cleaning_stats['sales']['stages']
+
+        self.assertEqual(list(stages), ['product_table', 'critical_fields', 'quantity_coercion',
+                                        'product_lookup', 'price_filter', 'revenue', 'calendar',
+                                        'outlier_flag'])
+        self.assertEqual((stages['critical_fields']['rows_in'], stages['critical_fields']['rows_out']), (5, 4))
+        self.assertEqual(stages['quantity_coercion']['rows_out'], 3)
+        self.assertEqual(stages['price_filter']['rows_out'], 2)
+        self.assertGreaterEqual(stages['calendar']['wall_seconds'], 0)
+        self.assertIsNotNone(stages['revenue']['bytes_allocated'])
+
+        metrics = cleaner.get_stage_metrics()
+        self.assertEqual(metrics[0]['dataset'], 'sales')
+        for record in metrics:
+            for key in ['wall_seconds', 'cpu_seconds', 'rows_in', 'rows_out', 'calls']:
+                self.assertIsInstance(record[key], (int, float))
+
+    def test_chunk_stages_accumulate(self):
+        """Test chunked cleaning sums each stage over the chunks"""
+        list(self.cleaner.clean_sales_chunks([self.sales.iloc[:3], self.sales.iloc[3:]], self.products))
+        stages = self.cleaner.cleaning_stats['sales']['stages']
+
+        self.assertEqual(stages['critical_fields']['calls'], 2)
+        self.assertEqual(stages['critical_fields']['rows_in'], 5)
+        self.assertEqual(stages['price_filter']['rows_out'], 2)
+        self.assertIsNone(stages['revenue']['bytes_allocated'])
+
+    def test_parallel_matches_serial(self):
+        """Test process pool cleaning gives the serial rows, order and flags"""
+        rng = np.random.default_rng(3)
+        sales = pd.DataFrame({
+            'Order Date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 400, 500), unit='D'),
+            'ProductKey': rng.integers(1, 5, 500),
+            'Quantity': rng.integers(-1, 6, 500),
+        })
+
+        serial = self.cleaner.clean_sales_data(sales, self.products, outlier_detector=OutlierDetector())
+        detector = OutlierDetector()
+        parallel = DataCleaner().clean_sales_data(sales, self.products, outlier_detector=detector,
+                                                  parallel=True, max_workers=3)
+
+        pd.testing.assert_frame_equal(parallel, serial)
+        self.assertEqual(detector.sketch.count, len(serial))
+
+    def test_sme_normalizer_reused_for_new_batches(self):
+        """Test fitted SME medians and scales transform later batches without refitting"""
+        survey = pd.DataFrame({
+            'FL1': [1.0, np.nan, 4.0, 2.0],
+            'FR1': ['0.5', 'x', '0.1', '0.3'],
+            'RA1': [0, 1, 1, 0],
+            'Name': ['a', 'b', 'c', 'd'],
+        })
+        cleaned = self.cleaner.clean_sme_data(survey)
+        normalizer = self.cleaner.sme_normalizer
+
+        self.assertEqual(cleaned['FL1'].tolist(), [0.25, 0.5, 1.0, 0.5])
+        self.assertEqual(cleaned['FR1'].tolist(), [0.5, 0.3, 0.1, 0.3])
+        self.assertEqual(cleaned['RA1'].dtype, survey['RA1'].dtype)
+        self.assertEqual(self.cleaner.cleaning_stats['sme']['risk_columns_processed'], 3)
+
+        path = os.path.join(tempfile.mkdtemp(), 'sme_normalizer.json')
+        normalizer.save(path)
+        batch = pd.DataFrame({'FL1': [8.0, None], 'FR1': [None, '0.9'], 'RA1': [1, 1], 'Name': ['e', 'f']})
+        transformed = DataCleaner().clean_sme_data(batch, normalizer=SMERiskNormalizer.load(path))
+
+        self.assertEqual(transformed['FL1'].tolist(), [2.0, 0.5])
+        self.assertEqual(transformed['FR1'].tolist(), [0.3, 0.9])
+
+    def test_currency_normalization(self):
+        """Test order-currency amounts and reporting currency conversion"""
+        result = self.cleaner.clean_sales_data(self.sales, self.products,
+                                               exchange_rates_df=self.exchange_rates,
+                                               reporting_currency='EUR')
+
+        # Row 2 is on a day with its own EUR quote
+        self.assertAlmostEqual(result['revenue_local'].iloc[1], 800.0)
+        self.assertAlmostEqual(result['revenue_local'].iloc[0], 20.0)
+        self.assertAlmostEqual(result['revenue'].iloc[0], 18.0)
+        self.assertAlmostEqual(result['gross_profit'].iloc[1], 320.0)
+
+    def test_reporting_currency_requires_rates(self):
+        """Test a non-USD reporting currency without exchange rates is rejected"""
+        with self.assertRaises(ValueError):
+            self.cleaner.clean_sales_data(self.sales, self.products, reporting_currency='EUR')
+        with self.assertRaises(ValueError):
+            next(self.cleaner.clean_sales_chunks([self.sales], self.products, reporting_currency='EUR'))
+
+
+class TestProductPriceTable(unittest.TestCase):
+    """Test the memoized product price lookup"""
+
+    def setUp(self):
+        clear_price_tables()
+        self.products = pd.DataFrame({
+            'ProductKey': [3, 1, 7],
+            'Unit Price USD': ['$10.00 ', '$1,000.00 ', '$5.00 '],
+            'Unit Cost USD': ['$4.00 ', '$600.00 ', '$0.00 '],
+        })
+
+    def test_gather_by_product_key(self):
+        """Test prices come back in sales row order with NaN for unpriced keys"""
+        table = get_price_table(self.products)
+        prices, costs = table.gather(pd.Series([1, 3, 7, 99, 3]))
+
+        np.testing.assert_allclose(prices, [1000.0, 10.0, np.nan, np.nan, 10.0])
+        np.testing.assert_allclose(costs, [600.0, 4.0, np.nan, np.nan, 4.0])
+
+    def test_sparse_keys_use_sorted_lookup(self):
+        """Test a huge ProductKey does not size a dense array and still gathers"""
+        sparse = self.products.copy()
+        sparse.loc[0, 'ProductKey'] = 2 ** 31
+        table = get_price_table(sparse)
+        prices, costs = table.gather(pd.Series([1, 2 ** 31, 3, 7, -1, 2 ** 40]))
+
+        self.assertLess(len(table.prices), 10)
+        np.testing.assert_allclose(prices, [1000.0, 10.0, np.nan, np.nan, np.nan, np.nan])
+        np.testing.assert_allclose(costs, [600.0, 4.0, np.nan, np.nan, np.nan, np.nan])
+
+    def test_table_memoized_by_content(self):
+        """Test an identical catalog reuses the table and an edited one rebuilds"""
+        table = get_price_table(self.products)
+        self.assertIs(get_price_table(self.products.copy()), table)
+
+        edited = self.products.copy()
+        edited.loc[0, 'Unit Price USD'] = '$12.00 '
+        self.assertIsNot(get_price_table(edited), table)
+
+    def test_memo_is_bounded(self):
+        """Test the least recently used catalog is dropped once the memo is full"""
+        def catalog(price):
+            edited = self.products.copy()
+            edited.loc[0, 'Unit Price USD'] = f'${price}.00 '
+            return edited
+
+        first = get_price_table(self.products)
+        for price in range(MAX_PRICE_TABLES - 1):
+            get_price_table(catalog(price + 20))
+        self.assertIs(get_price_table(self.products), first)
+
+        # The first catalog was just used, so the oldest edited one goes
+        get_price_table(catalog(99))
+        self.assertIs(get_price_table(self.products), first)
+        for price in range(MAX_PRICE_TABLES):
+            get_price_table(catalog(price + 100))
+        self.assertIsNot(get_price_table(self.products), first)
+
+
+class TestCurrencyConverter(unittest.TestCase):
+    """Test the dense exchange rate table"""
+
+    def setUp(self):
+        self.converter = CurrencyConverter(pd.DataFrame({
+            'Date': pd.to_datetime(['2020-01-01', '2020-01-01', '2020-01-04']),
+            'Currency': ['CAD', 'EUR', 'CAD'],
+            'Exchange': [1.3, 0.9, 1.4],
+        }))
+
+    def test_rates_forward_filled(self):
+        """Test missing days reuse the previous quote"""
+        dates = pd.to_datetime(['2020-01-01', '2020-01-03', '2020-01-04', '2020-02-01'])
+        rates = self.converter.rates(dates, 'CAD')
+        np.testing.assert_allclose(rates, [1.3, 1.3, 1.4, 1.4])
+
+    def test_unknown_currency_and_early_dates(self):
+        """Test rates are NaN where no quote can apply"""
+        dates = pd.to_datetime(['2019-12-31', '2020-01-02', '2020-01-02'])
+        rates = self.converter.rates(dates, np.array(['CAD', 'GBP', 'USD']))
+        self.assertTrue(np.isnan(rates[0]))
+        self.assertTrue(np.isnan(rates[1]))
+        self.assertEqual(rates[2], 1.0)
+
+    def test_cross_currency_conversion(self):
+        """Test conversion between two non-base currencies"""
+        dates = pd.to_datetime(['2020-01-02'])
+        converted = self.converter.convert([130.0], dates, 'CAD', 'EUR')
+        np.testing.assert_allclose(converted, [90.0])
+
+
+if __name__ == '__main__':
+    print("Running Data Cleaner Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+"""
+Unit Tests for Data Loading Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import tempfile
+import shutil
+import pandas as pd
+from src.data_processing.loader import DataLoader
+from src.data_processing.schema import DatasetSchema
+
+REPO_RAW_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw')
+
+
+SALES_CSV = (
+    "Order Number,Line Item,Order Date,Delivery Date,CustomerKey,StoreKey,ProductKey,Quantity,Currency Code\n"
+    "366000,1,1/1/2016,,265598,10,1304,1,CAD\n"
+    "366001,1,1/1/2016,1/13/2016,1269051,0,1048,2,USD\n"
+    "366002,1,2/3/2016,2/12/2016,266019,0,1106,7,CAD\n"
+)
+
+PRODUCTS_CSV = (
+    "ProductKey,Product Name,Brand,Color,Unit Cost USD,Unit Price USD,SubcategoryKey,Subcategory,CategoryKey,Category\n"
+    "1048,Contoso Phone,Contoso,Silver,$6.62 ,$12.99 ,0101,MP4&MP3,01,Audio\n"
+    "1106,Contoso Radio,Contoso,Blue,\"$1,006.62 \",\"$2,012.99 \",0101,MP4&MP3,01,Audio\n"
+    "1304,Contoso Speaker,Contoso,White,$7.40 ,$14.52 ,0101,MP4&MP3,01,Audio\n"
+)
+
+
+class TestDataLoader(unittest.TestCase):
+    """Test data loading and caching"""
+
+    def setUp(self):
+        """Create a temporary data directory with small Maven files"""
+        self.data_dir = tempfile.mkdtemp()
+        self.raw_dir = os.path.join(self.data_dir, 'raw')
+        os.makedirs(self.raw_dir)
+        self._write('Sales.csv', SALES_CSV)
+        self._write('Products.csv', PRODUCTS_CSV)
+        shutil.copy(os.path.join(REPO_RAW_DIR, 'Data_Dictionary.csv'), self.raw_dir)
+        self.loader = DataLoader(self.data_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def _write(self, filename, content):
+        with open(os.path.join(self.raw_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_missing_files_are_skipped(self):
+        """Test that absent Maven files load as None"""
+        data = self.loader.load_maven_data()
+
+        self.assertEqual(len(data['sales']), 3)
+        self.assertIsNone(data['customers'])
+        self.assertIsNone(data['exchange_rates'])
+
+    def test_cache_round_trip(self):
+        """Test that a second load is served from the cache unchanged"""
+        first = self.loader.load_maven_data()
+        cached = DataLoader(self.data_dir).load_maven_data()
+
+        pd.testing.assert_frame_equal(first['sales'], cached['sales'])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(cached['sales']['Order Date']))
+        self.assertTrue(os.listdir(os.path.join(self.data_dir, 'cache')))
+
+    def test_cache_invalidated_on_change(self):
+        """Test that editing the source CSV invalidates the cached frame"""
+        self.loader.load_maven_data()
+
+        sales_path = os.path.join(self.raw_dir, 'Sales.csv')
+        self._write('Sales.csv', SALES_CSV + "366003,1,3/1/2016,,266019,0,1106,1,USD\n")
+        stat = os.stat(sales_path)
+        os.utime(sales_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        reloaded = DataLoader(self.data_dir).load_maven_data()
+        self.assertEqual(len(reloaded['sales']), 4)
+
+        sales_entries = [f for f in os.listdir(os.path.join(self.data_dir, 'cache')) if f.startswith('sales-')]
+        self.assertEqual(len(sales_entries), 1)
+
+    def test_cache_invalidated_on_schema_change(self):
+        """Test that a changed column declaration re-parses instead of serving the cached frame"""
+        self.loader.load_sales_data()
+        unchanged = DataLoader(self.data_dir)
+        unchanged.load_sales_data()
+        self.assertTrue(unchanged.load_stats['sales']['from_cache'])
+
+        loader = DataLoader(self.data_dir)
+        sales_schema = loader.schemas.get('sales')
+        loader.schemas.register(DatasetSchema('sales', {**sales_schema.columns, 'Quantity': 'float'}))
+        sales = loader.load_sales_data()
+
+        self.assertFalse(loader.load_stats['sales']['from_cache'])
+        self.assertEqual(sales['Quantity'].dtype, 'float32')
+
+    def test_declared_dtypes_applied(self):
+        """Test that the schema registry sets compact dtypes at parse time"""
+        sales = self.loader.load_sales_data()
+        products = self.loader.load_products_data()
+
+        self.assertEqual(sales['ProductKey'].dtype, 'int32')
+        self.assertEqual(sales['Currency Code'].dtype, 'category')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(sales['Delivery Date']))
+        self.assertTrue(pd.isna(sales['Delivery Date'].iloc[0]))
+
+        self.assertEqual(products['Unit Price USD'].dtype, 'float64')
+        self.assertAlmostEqual(products['Unit Price USD'].iloc[1], 2012.99)
+        self.assertEqual(products['Brand'].dtype, 'category')
+
+    def test_encoding_detected_from_sample(self):
+        """Test that late non-UTF-8 bytes and BOMs are found from a bounded sample"""
+        rows = ''.join(f"{i},Plain Name {i},SYDNEY,NSW\n" for i in range(20000))
+        content = "CustomerKey,Name,City,State Code\n" + rows + "99999,Šimon Müller,ŽILINA,ZA\n"
+        with open(os.path.join(self.raw_dir, 'Customers.csv'), 'wb') as f:
+            f.write(content.encode('cp1252'))
+        with open(os.path.join(self.raw_dir, 'sme_financial_decision.csv'), 'wb') as f:
+            f.write("FQ1,FL1\nYES,3\n".encode('utf-8-sig'))
+
+        customers = self.loader.load_customers_data()
+        sme = self.loader.load_kaggle_sme_data()
+
+        stats = self.loader.load_stats['customers']
+        self.assertEqual(stats['encoding'], 'cp1252')
+        self.assertLessEqual(stats['encoding_bytes_read'], self.loader.encoding_detector.sample_bytes)
+        self.assertLess(stats['encoding_bytes_read'], os.path.getsize(os.path.join(self.raw_dir, 'Customers.csv')))
+        self.assertEqual(customers['Name'].iloc[-1], 'Šimon Müller')
+
+        self.assertEqual(self.loader.load_stats['sme']['encoding'], 'utf-8-sig')
+        self.assertEqual(list(sme.columns), ['FQ1', 'FL1'])
+
+    def test_parallel_load_matches_serial(self):
+        """Test that the thread pool load returns the same datasets with timings"""
+        loader = DataLoader(self.data_dir, use_cache=False)
+        serial = loader.load_maven_data()
+        parallel = loader.load_maven_data(parallel=True, max_workers=3)
+
+        self.assertEqual(list(serial.keys()), list(parallel.keys()))
+        for key, df in serial.items():
+            if df is None:
+                self.assertIsNone(parallel[key])
+            else:
+                pd.testing.assert_frame_equal(df, parallel[key])
+
+        report = loader.get_load_report()
+        self.assertGreaterEqual(report['sales']['load_seconds'], 0)
+        self.assertIn('load_seconds', report['customers'])
+
+    def test_sales_streamed_by_month(self):
+        """Test that month partitions cover every sales row in period order"""
+        chunks = list(self.loader.iter_sales_chunks(chunksize=2))
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+
+        partitions = list(self.loader.iter_sales_by_month(chunksize=1))
+        self.assertEqual([period for period, _ in partitions], ['2016-01', '2016-02'])
+        self.assertEqual([len(df) for _, df in partitions], [2, 1])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(partitions[0][1]['Order Date']))
+
+    def test_lazy_access_parses_on_demand(self):
+        """Test that the lazy mapping only parses datasets that are accessed"""
+        data = self.loader.open_maven_data()
+
+        self.assertEqual(len(data['sales']), 3)
+        self.assertTrue(data.is_loaded('sales'))
+        self.assertFalse(data.is_loaded('products'))
+        self.assertNotIn('products', self.loader.load_stats)
+        self.assertIs(data['sales'], data['sales'])
+
+        everything = data.prefetch(parallel=True)
+        self.assertEqual(set(everything), set(data))
+        self.assertEqual(len(everything['products']), 3)
+        self.assertIsNone(everything['customers'])
+
+    def test_cache_can_be_disabled(self):
+        """Test that use_cache=False never writes cache files"""
+        DataLoader(self.data_dir, use_cache=False).load_maven_data()
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, 'cache')))
+
+
+if __name__ == '__main__':
+    print("Running Data Processing Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
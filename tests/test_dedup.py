@@ -0,0 +1,112 @@
+"""
+Unit Tests for Deduplication Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import tempfile
+import shutil
+import pandas as pd
+import numpy as np
+from src.data_processing.cleaner import DataCleaner
+from src.data_processing.dedup import FingerprintIndex, FingerprintStore, row_fingerprints
+
+
+class TestFingerprintIndex(unittest.TestCase):
+    """Test the persistent per-SME fingerprint index"""
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.upload = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-31', '2024-02-29', '2024-03-31']),
+            'revenue': [1000.0, 1200.0, 900.0],
+            'expenses': [800.0, 700.0, 950.0],
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.index_dir)
+
+    def test_fingerprints_ignore_column_order(self):
+        """Test the same rows hash alike whatever the column order"""
+        reordered = self.upload[['expenses', 'date', 'revenue']].astype({'expenses': 'int64'})
+        np.testing.assert_array_equal(row_fingerprints(self.upload), row_fingerprints(reordered))
+        self.assertEqual(row_fingerprints(self.upload).dtype, np.uint64)
+
+    def test_overlapping_upload_keeps_new_rows(self):
+        """Test only rows not seen in earlier uploads pass the filter"""
+        index = FingerprintStore(self.index_dir).index_for(7)
+        new_rows, fingerprints = index.filter_new(self.upload)
+        index.add(fingerprints)
+
+        overlap = pd.concat([self.upload.iloc[1:], pd.DataFrame({
+            'date': pd.to_datetime(['2024-04-30', '2024-04-30']),
+            'revenue': [1100.0, 1100.0],
+            'expenses': [600.0, 600.0],
+        })], ignore_index=True)
+        new_rows, fingerprints = index.filter_new(overlap)
+
+        self.assertEqual(len(new_rows), 1)
+        self.assertEqual(new_rows['revenue'].tolist(), [1100.0])
+        self.assertEqual(index.add(fingerprints), 1)
+        self.assertEqual(len(index), 4)
+
+    def test_index_persisted_sorted(self):
+        """Test a reopened index remembers earlier fingerprints"""
+        index = FingerprintStore(self.index_dir).index_for(7)
+        index.add(row_fingerprints(self.upload))
+
+        reopened = FingerprintIndex(os.path.join(self.index_dir, 'sme_7.npy'))
+        self.assertTrue(reopened.contains(row_fingerprints(self.upload)).all())
+        self.assertTrue(np.all(reopened.fingerprints[1:] >= reopened.fingerprints[:-1]))
+        self.assertEqual(len(FingerprintStore(self.index_dir).index_for(8)), 0)
+
+    def test_key_columns_ignore_side_columns(self):
+        """Test a re-upload with an extra notes column adds no rows"""
+        index = FingerprintStore(self.index_dir).index_for(7)
+        key = ['date', 'revenue', 'expenses']
+        index.add(index.filter_new(self.upload, key_columns=key)[1])
+
+        annotated = self.upload.assign(notes=['a', 'b', 'c'])
+        self.assertEqual(len(index.filter_new(annotated, key_columns=key)[0]), 0)
+        self.assertEqual(len(index.filter_new(annotated)[0]), 3)
+
+    def test_keep_repeats_within_upload(self):
+        """Test identical lines in one file are all kept, then all recognised on re-upload"""
+        index = FingerprintStore(self.index_dir).index_for(7)
+        doubled = pd.concat([self.upload, self.upload.iloc[:1]], ignore_index=True)
+
+        new_rows, fingerprints = index.filter_new(doubled, keep_repeats=True)
+        self.assertEqual(len(new_rows), 4)
+        self.assertEqual(index.add(fingerprints), 3)
+        self.assertEqual(len(index.filter_new(doubled, keep_repeats=True)[0]), 0)
+
+    def test_rebuild_from_saved_rows(self):
+        """Test an index that disagrees with the saved rows is replaced by theirs"""
+        index = FingerprintStore(self.index_dir).index_for(7)
+        index.add(row_fingerprints(self.upload))
+        saved = row_fingerprints(self.upload.iloc[:1])
+
+        self.assertFalse(index.matches(saved))
+        index.rebuild(saved)
+        self.assertTrue(index.matches(saved))
+        self.assertEqual(len(FingerprintIndex(os.path.join(self.index_dir, 'sme_7.npy'))), 1)
+
+    def test_remove_duplicates_with_index(self):
+        """Test the cleaner drops rows already recorded in the index"""
+        index = FingerprintStore(self.index_dir).index_for(1)
+        cleaner = DataCleaner()
+
+        first = cleaner.remove_duplicates(self.upload, index=index)
+        second = cleaner.remove_duplicates(self.upload, index=index)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 0)
+
+
+if __name__ == '__main__':
+    print("Running Deduplication Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
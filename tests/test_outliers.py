@@ -0,0 +1,96 @@
+"""
+Unit Tests for Outlier Detection Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import pandas as pd
+import numpy as np
+from src.data_processing.outliers import QuantileSketch, OutlierDetector
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """Test the relative-error quantile sketch"""
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.values = rng.lognormal(mean=5, sigma=1.5, size=50000)
+
+    def test_quantiles_within_relative_error(self):
+        """Test estimates stay within alpha of the exact pandas quantiles"""
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        sketch.update(self.values)
+
+        for q in [0.0, 0.25, 0.5, 0.9, 0.99, 1.0]:
+            exact = pd.Series(self.values).quantile(q)
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.01 * exact)
+
+    def test_merge_matches_single_pass(self):
+        """Test merged chunk sketches equal one sketch over all values"""
+        whole = QuantileSketch()
+        whole.update(self.values)
+
+        merged = QuantileSketch()
+        for chunk in np.array_split(self.values, 7):
+            part = QuantileSketch()
+            part.update(chunk)
+            merged.merge(part)
+
+        self.assertEqual(merged.positive, whole.positive)
+        self.assertEqual(merged.quantile(0.99), whole.quantile(0.99))
+
+    def test_negative_and_zero_values(self):
+        """Test values of both signs are ordered correctly"""
+        sketch = QuantileSketch()
+        sketch.update(np.array([-100.0, -1.0, 0.0, 0.0, 5.0, np.nan]))
+
+        self.assertEqual(sketch.count, 5)
+        self.assertAlmostEqual(sketch.quantile(0.0), -100.0, delta=0.5)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+
+
+class TestOutlierDetector(unittest.TestCase):
+    """Test streaming outlier flags"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.sales = pd.DataFrame({
+            'revenue': rng.lognormal(mean=5, sigma=1.5, size=20000),
+            'StoreKey': rng.integers(0, 4, size=20000),
+        })
+
+    def test_chunked_flags_match_exact(self):
+        """Test flags agree with the exact q99 outside the error band"""
+        detector = OutlierDetector(relative_accuracy=0.005)
+        for start in range(0, len(self.sales), 4000):
+            chunk = self.sales.iloc[start:start + 4000]
+            detector.update(chunk)
+
+        exact = self.sales['revenue'].quantile(0.99)
+        flags = detector.flag(self.sales)
+        expected = (self.sales['revenue'] > exact).to_numpy()
+
+        outside_band = (np.abs(self.sales['revenue'] - exact) > 0.005 * exact).to_numpy()
+        np.testing.assert_array_equal(flags[outside_band], expected[outside_band])
+
+    def test_per_group_thresholds(self):
+        """Test group thresholds, overrides and the global fallback"""
+        detector = OutlierDetector(group_by='StoreKey', group_quantiles={0: 0.5})
+        detector.update(self.sales)
+        thresholds = detector.thresholds()
+
+        store_0 = self.sales.loc[self.sales['StoreKey'] == 0, 'revenue']
+        self.assertLessEqual(abs(thresholds[0] - store_0.median()), 0.005 * store_0.median())
+        self.assertAlmostEqual(store_0.gt(thresholds[0]).mean(), 0.5, delta=0.01)
+
+        unseen = pd.DataFrame({'revenue': [1e9], 'StoreKey': [99]})
+        self.assertTrue(detector.flag(unseen)[0])
+
+
+if __name__ == '__main__':
+    print("Running Outlier Detection Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
@@ -0,0 +1,135 @@
+"""
+Unit Tests for Financial Ratios Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import pandas as pd
+import numpy as np
+from src.financial_engine.statements import FinancialStatementGenerator
+from src.financial_engine.cash_flow import CashFlowAnalyzer
+from src.financial_engine.ratios import FinancialRatioCalculator, RATIOS
+from src.risk_assessment.risk_profiling import RiskProfiler
+
+
+class TestFinancialRatios(unittest.TestCase):
+    """Test calculate_all_ratios against the step-by-step ratio methods"""
+
+    def setUp(self):
+        self.calculator = FinancialRatioCalculator()
+        self.cash_analyzer = CashFlowAnalyzer()
+
+        dates = pd.date_range('2020-01', periods=14, freq='MS')
+        rng = np.random.default_rng(3)
+        sales = pd.DataFrame({
+            'period': dates.strftime('%Y-%m'),
+            'revenue': rng.uniform(800000, 1200000, 14),
+            'cogs': rng.uniform(400000, 600000, 14),
+            'gross_profit': rng.uniform(-100000, 500000, 14),
+            'Quantity': rng.integers(1000, 5000, 14),
+        })
+        self.monthly = FinancialStatementGenerator().generate_monthly_financials(sales)
+        self.cash_flow = pd.DataFrame({
+            'period': self.monthly['period'].iloc[1:],
+            'ending_cash_balance': rng.uniform(50000, 150000, 13),
+        })
+
+    def _stepwise_ratios(self, monthly, cash_flow):
+        df = self.cash_analyzer.analyze_working_capital(monthly)
+        df = self.cash_analyzer.calculate_cash_conversion_cycle(df)
+        df = self.calculator.calculate_profitability_ratios(df)
+        df = self.calculator.calculate_liquidity_ratios(df, cash_flow)
+        df = self.calculator.calculate_efficiency_ratios(df)
+        df = self.calculator.calculate_leverage_ratios(df)
+        return self.calculator.calculate_growth_ratios(df)
+
+    def test_matches_stepwise_ratios(self):
+        """Test same columns, order and values, with a period missing from cash flow"""
+        expected = self._stepwise_ratios(self.monthly, self.cash_flow)
+        result = self.calculator.calculate_all_ratios(self.monthly, self.cash_flow)
+
+        self.assertEqual(list(result.columns), list(expected.columns))
+        pd.testing.assert_frame_equal(result, expected, rtol=1e-12)
+        self.assertTrue(np.isnan(result['ending_cash_balance'].iloc[0]))
+
+    def test_edge_values_match(self):
+        """Test zero revenue, missing profit and short histories behave alike"""
+        monthly = self.monthly.iloc[:6].copy()
+        monthly.loc[2, 'total_revenue'] = 0.0
+        monthly.loc[4, 'net_profit'] = np.nan
+        monthly.index = monthly.index + 10
+        monthly['ending_cash_balance'] = 75000.0
+
+        expected = self._stepwise_ratios(monthly, self.cash_flow)
+        result = self.calculator.calculate_all_ratios(monthly, self.cash_flow)
+
+        pd.testing.assert_frame_equal(result, expected, rtol=1e-12)
+        self.assertNotIn('revenue_growth_yoy', result.columns)
+
+    def test_input_not_modified(self):
+        """Test the monthly statement is left untouched"""
+        before = self.monthly.copy()
+        self.calculator.calculate_all_ratios(self.monthly, self.cash_flow)
+        pd.testing.assert_frame_equal(self.monthly, before)
+
+
+class TestRatioRegistry(unittest.TestCase):
+    """Test on-demand ratio subsets"""
+
+    def setUp(self):
+        self.calculator = FinancialRatioCalculator()
+        self.monthly = pd.DataFrame({
+            'period': ['2021-01', '2021-02', '2021-03'],
+            'total_revenue': [1000.0, 1200.0, 900.0],
+            'total_cogs': [600.0, 700.0, 650.0],
+            'gross_profit': [400.0, 500.0, 250.0],
+            'ebitda': [100.0, 150.0, -20.0],
+            'net_profit': [60.0, 90.0, -30.0],
+            'net_profit_margin': [0.06, 0.075, -1 / 30],
+            'interest_expense': [30.0, 36.0, 27.0],
+        })
+        self.cash_flow = pd.DataFrame({'period': ['2021-01', '2021-02', '2021-03'],
+                                       'ending_cash_balance': [500.0, 450.0, 300.0]})
+
+    def test_subset_matches_full_run(self):
+        """Test requested ratios equal the same columns of calculate_all_ratios"""
+        names = RiskProfiler.REQUIRED_RATIOS
+        subset = self.calculator.calculate_ratios(self.monthly, self.cash_flow, names)
+        full = self.calculator.calculate_all_ratios(self.monthly, self.cash_flow)
+
+        self.assertEqual(list(subset.columns), ['period'] + names)
+        pd.testing.assert_frame_equal(subset[names], full[names])
+
+    def test_only_dependencies_computed(self):
+        """Test a risk-only request skips growth and efficiency ratios"""
+        run = RATIOS.run(lambda name: self.monthly[name].to_numpy(dtype='float64')
+                         if name != 'ending_cash_balance' else self.cash_flow[name].to_numpy())
+        run.compute(['current_ratio', 'debt_to_equity'])
+
+        self.assertIn('inventory', run.values)
+        self.assertNotIn('revenue_growth_mom', run.values)
+        self.assertNotIn('asset_turnover', run.values)
+        self.assertNotIn('gross_profit', run.values)
+        self.assertEqual(RATIOS.dependencies(['quick_ratio'])[-1], 'quick_ratio')
+
+    def test_unknown_ratio_rejected(self):
+        """Test asking for an unregistered ratio fails loudly"""
+        with self.assertRaises(KeyError):
+            self.calculator.calculate_ratios(self.monthly, self.cash_flow, ['altman_z'])
+
+    def test_risk_profile_from_financials(self):
+        """Test the risk profiler gives the same profile from the ratio subset"""
+        full = self.calculator.calculate_all_ratios(self.monthly, self.cash_flow)
+        profiler = RiskProfiler()
+
+        self.assertEqual(profiler.generate_risk_profile_from_financials(self.monthly, self.cash_flow),
+                         profiler.generate_risk_profile(full))
+
+
+if __name__ == '__main__':
+    print("Running Financial Ratio Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
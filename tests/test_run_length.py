@@ -0,0 +1,92 @@
+"""
+Unit Tests for Run-Length Analysis Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import pandas as pd
+import numpy as np
+from src.financial_engine.run_length import (
+    find_runs, negative_flow_streaks, below_threshold_episodes, max_drawdown
+)
+
+
+class TestRunLength(unittest.TestCase):
+    """Test vectorized streak, episode and drawdown analysis"""
+
+    def setUp(self):
+        dates = pd.date_range('2021-01-01', periods=8, freq='D')
+        self.daily = pd.DataFrame({
+            'date': dates.append(dates),
+            'sme_id': [1] * 8 + [2] * 8,
+            'net_cash_flow': [5, -1, -2, 3, -4, -4, -1, 2,
+                              -1, -1, 1, -3, np.nan, -2, 4, -5],
+        })
+        self.daily['cash_balance'] = 10 + self.daily.groupby('sme_id')['net_cash_flow'].cumsum()
+
+    def test_runs_break_at_group_change(self):
+        """Test a run never spans two groups"""
+        runs = find_runs(np.array([True, True, True, False, True]), np.array([1, 1, 2, 2, 2]))
+
+        self.assertEqual(runs['start'].tolist(), [0, 2, 4])
+        self.assertEqual(runs['length'].tolist(), [2, 1, 1])
+
+    def test_negative_streaks_match_loop(self):
+        """Test streaks agree with a row-by-row scan, per SME"""
+        rng = np.random.default_rng(7)
+        daily = pd.DataFrame({
+            'date': np.tile(pd.date_range('2021-01-01', periods=500, freq='D'), 3),
+            'sme_id': np.repeat([3, 1, 2], 500),
+            'net_cash_flow': rng.normal(0, 1, 1500),
+        })
+        streaks = negative_flow_streaks(daily, group_column='sme_id')
+
+        for sme_id, flows in daily.groupby('sme_id')['net_cash_flow']:
+            longest, current = 0, 0
+            for flow in flows:
+                current = current + 1 if flow < 0 else 0
+                longest = max(longest, current)
+            sme_streaks = streaks[streaks['sme_id'] == sme_id]
+            self.assertEqual(sme_streaks['length'].max(), longest)
+            self.assertEqual(sme_streaks['length'].sum(), int((flows < 0).sum()))
+        self.assertEqual(streaks['sme_id'].iloc[0], 1)
+
+    def test_streak_depth_and_drawdown(self):
+        """Test each streak reports its worst day and total outflow"""
+        streaks = negative_flow_streaks(self.daily, group_column='sme_id')
+
+        self.assertEqual(streaks['length'].tolist(), [2, 3, 2, 1, 1, 1])
+        self.assertEqual(streaks['depth'].tolist()[:2], [-2, -4])
+        self.assertEqual(streaks['cumulative_drawdown'].tolist()[:2], [-3, -9])
+        self.assertEqual(streaks['start_date'].iloc[1], pd.Timestamp('2021-01-05'))
+
+    def test_below_threshold_episodes(self):
+        """Test episodes of low balance with their troughs"""
+        episodes = below_threshold_episodes(self.daily, threshold=8, group_column='sme_id')
+
+        # A missing balance ends an episode
+        self.assertEqual(episodes['sme_id'].tolist(), [1, 2, 2, 2])
+        self.assertEqual(episodes['length'].tolist(), [2, 1, 1, 1])
+        self.assertEqual(episodes['trough'].tolist(), [6, 6, 4, 3])
+
+    def test_max_drawdown(self):
+        """Test peak-to-trough decline per SME"""
+        drawdowns = max_drawdown(self.daily, group_column='sme_id')
+        sme_1 = drawdowns[drawdowns['sme_id'] == 1].iloc[0]
+
+        self.assertEqual(sme_1['max_drawdown'], 9)
+        self.assertEqual(sme_1['peak_date'], pd.Timestamp('2021-01-04'))
+        self.assertEqual(sme_1['trough_date'], pd.Timestamp('2021-01-07'))
+        self.assertAlmostEqual(sme_1['max_drawdown_pct'], 9 / 15)
+
+        single = max_drawdown(self.daily[self.daily['sme_id'] == 1])
+        self.assertEqual(single['max_drawdown'].tolist(), [9])
+
+
+if __name__ == '__main__':
+    print("Running Run-Length Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
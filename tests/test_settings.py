@@ -0,0 +1,103 @@
+"""
+Unit Tests for Settings Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import dataclasses
+import json
+import shutil
+import tempfile
+import yaml
+from src.financial_engine.settings import FinancialSettings, SettingsStore, get_settings, clear_settings
+from src.financial_engine.statements import FinancialStatementGenerator
+from src.financial_engine.synthetic_data import SyntheticDataGenerator
+
+
+class TestSettings(unittest.TestCase):
+    """Test shared, frozen financial settings"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp_dir, 'config.yaml')
+        self.ratios_path = os.path.join(self.tmp_dir, 'expense_ratios.json')
+        self._write_config(tax_rate=0.25)
+        with open(self.ratios_path, 'w') as f:
+            json.dump({'services': {'salaries': 0.35, 'rent': 0.1}}, f)
+        clear_settings()
+
+    def tearDown(self):
+        clear_settings()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write_config(self, tax_rate, mtime=None):
+        config = {'financial': {
+            'expense_ratios': {'salaries': 0.12, 'rent': 0.06},
+            'tax_rate': tax_rate, 'depreciation_rate': 0.02, 'interest_rate': 0.03,
+        }}
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+        if mtime is not None:
+            os.utime(self.config_path, (mtime, mtime))
+
+    def test_loaded_once_and_shared(self):
+        """Test repeated lookups return the same parsed settings object"""
+        first = get_settings(self.config_path, self.ratios_path)
+        second = get_settings(self.config_path, self.ratios_path)
+
+        self.assertIs(first, second)
+        self.assertEqual(dict(first.expense_ratios), {'salaries': 0.12, 'rent': 0.06})
+        self.assertEqual(dict(first.industry_expense_ratios['services']), {'salaries': 0.35, 'rent': 0.1})
+
+    def test_settings_are_frozen(self):
+        """Test settings and their ratio mappings cannot be modified"""
+        settings = get_settings(self.config_path, self.ratios_path)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            settings.tax_rate = 0.5
+        with self.assertRaises(TypeError):
+            settings.expense_ratios['rent'] = 0.5
+
+    def test_hot_reload_on_change(self):
+        """Test an edited file is re-read, and an invalid edit is ignored"""
+        store = SettingsStore(self.config_path, self.ratios_path)
+        self.assertEqual(store.get().tax_rate, 0.25)
+
+        self._write_config(tax_rate=0.3, mtime=os.path.getmtime(self.config_path) + 10)
+        self.assertEqual(store.get().tax_rate, 0.3)
+
+        self._write_config(tax_rate=1.5, mtime=os.path.getmtime(self.config_path) + 10)
+        self.assertEqual(store.get().tax_rate, 0.3)
+
+    def test_invalid_settings_rejected(self):
+        """Test rates and expense ratios are validated"""
+        with self.assertRaises(ValueError):
+            FinancialSettings.from_config({'financial': {'tax_rate': 0.25}})
+        with self.assertRaises(ValueError):
+            get_settings(self.config_path).with_overrides(expense_ratios={'rent': 0.95})
+
+    def test_defaults_without_files(self):
+        """Test missing files fall back to the built-in defaults"""
+        missing = os.path.join(self.tmp_dir, 'missing')
+        settings = get_settings(missing + '.yaml', missing + '.json')
+
+        self.assertEqual(settings.tax_rate, 0.25)
+        self.assertIn('retail_electronics', settings.industry_expense_ratios)
+
+    def test_tenant_settings_injected(self):
+        """Test generators use injected tenant settings instead of the shared ones"""
+        tenant = get_settings(self.config_path, self.ratios_path).with_overrides(
+            tax_rate=0.3, expense_ratios={'rent': 0.1})
+
+        statement_gen = FinancialStatementGenerator(settings=tenant)
+        self.assertEqual(statement_gen.tax_rate, 0.3)
+        self.assertEqual(dict(statement_gen.expense_ratios), {'salaries': 0.12, 'rent': 0.1})
+        self.assertIn('services', SyntheticDataGenerator(settings=tenant).expense_ratios)
+
+
+if __name__ == '__main__':
+    print("Running Settings Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)
@@ -10,6 +10,7 @@ import unittest
 import pandas as pd
 import numpy as np
 from src.financial_engine.statements import FinancialStatementGenerator
+from src.financial_engine.settings import FinancialSettings
 
 
 class TestFinancialStatements(unittest.TestCase):
@@ -59,6 +60,14 @@ class TestFinancialStatements(unittest.TestCase):
         self.assertTrue((expense_ratio > 0.2).all())
         self.assertTrue((expense_ratio < 0.5).all())
     
+    def test_no_expense_ratios(self):
+        """Test settings without expense ratios give zero operating expenses"""
+        settings = FinancialSettings(expense_ratios={}, tax_rate=0.25, depreciation_rate=0.02, interest_rate=0.03)
+        result = FinancialStatementGenerator(settings=settings).generate_monthly_financials(self.sample_sales)
+        
+        self.assertTrue((result['operating_expenses'] == 0).all())
+        np.testing.assert_allclose(result['ebitda'], result['gross_profit'])
+    
     def test_profit_calculations(self):
         """Test profit calculations are correct"""
         result = self.statement_gen.generate_monthly_financials(self.sample_sales)
@@ -107,6 +116,102 @@ class TestFinancialStatements(unittest.TestCase):
         expected_revenue = monthly['total_revenue'].sum()
         self.assertAlmostEqual(annual['total_revenue'].iloc[0], expected_revenue, places=2)
     
+    def test_rollups_leave_monthly_unchanged(self):
+        """Test quarterly and annual roll-ups do not add columns to the monthly frame"""
+        monthly = self.statement_gen.generate_monthly_financials(self.sample_sales)
+        before = monthly.copy()
+        
+        self.statement_gen.generate_quarterly_financials(monthly)
+        self.statement_gen.generate_annual_financials(monthly)
+        
+        pd.testing.assert_frame_equal(monthly, before)
+    
+    def test_fiscal_year_rollup(self):
+        """Test April-March fiscal years split a calendar year"""
+        cube = self.statement_gen.generate_pnl_cube(self.sample_sales, fiscal_year_start=4)
+        monthly = self.statement_gen.generate_monthly_financials(self.sample_sales)
+        fiscal = cube.rollup('fiscal_year')
+        
+        self.assertEqual(fiscal['fiscal_year'].tolist(), ['FY2019-20', 'FY2020-21'])
+        self.assertAlmostEqual(fiscal['total_revenue'].iloc[0], monthly['total_revenue'].iloc[:3].sum(), places=2)
+        self.assertEqual(fiscal['units_sold'].sum(), monthly['units_sold'].sum())
+        self.assertEqual(cube.rollup('month')['period'].tolist(), monthly['period'].tolist())
+        self.assertEqual(cube.rollup('year', fiscal_year_start=1)['year'].tolist(), [2020])
+    
+    def test_pnl_graph_updates_one_month(self):
+        """Test changing one month's revenue recomputes only that row"""
+        self.statement_gen.generate_monthly_financials(self.sample_sales)
+        graph = self.statement_gen.pnl_graph
+        
+        result = graph.update('total_revenue', 2000000.0, rows=[3])
+        
+        changed_sales = self.sample_sales.copy()
+        changed_sales.loc[3, 'revenue'] = 2000000.0
+        expected = FinancialStatementGenerator().generate_monthly_financials(changed_sales)
+        
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(graph.last_recompute['net_profit'], 1)
+        self.assertNotIn('total_revenue', graph.last_recompute)
+    
+    def test_pnl_graph_float_update_on_int_column(self):
+        """Test a fractional update to an integer source column is not truncated"""
+        monthly = self.statement_gen.generate_monthly_financials(self.sample_sales)
+        self.assertTrue(np.issubdtype(monthly['units_sold'].dtype, np.integer))
+        
+        result = self.statement_gen.pnl_graph.update('units_sold', 10.5, rows=[0])
+        self.assertEqual(result['units_sold'].iloc[0], 10.5)
+        self.assertEqual(result['units_sold'].iloc[1], monthly['units_sold'].iloc[1])
+    
+    def test_pnl_graph_parameter_change(self):
+        """Test a new tax rate recomputes only the lines below tax"""
+        self.statement_gen.generate_monthly_financials(self.sample_sales)
+        graph = self.statement_gen.pnl_graph
+        
+        result = graph.set_params(tax_rate=0.3)
+        
+        regenerated = FinancialStatementGenerator()
+        regenerated.tax_rate = 0.3
+        pd.testing.assert_frame_equal(result, regenerated.generate_monthly_financials(self.sample_sales))
+        self.assertEqual(set(graph.last_recompute), {'tax_expense', 'net_profit', 'net_profit_margin', 'roa'})
+    
+    def test_portfolio_financials_match_single_sme(self):
+        """Test batch statements equal per-SME runs, with per-tenant overrides"""
+        portfolio_sales = pd.concat([
+            self.sample_sales.assign(sme_id='A'),
+            self.sample_sales.assign(sme_id='B', revenue=self.sample_sales['revenue'] * 2),
+        ], ignore_index=True)
+        overrides = pd.DataFrame({'sme_id': ['B'], 'tax_rate': [0.3], 'expense_ratio_rent': [0.1]})
+        
+        result = self.statement_gen.generate_portfolio_financials(portfolio_sales, overrides)
+        
+        self.assertEqual(len(result), 24)
+        for sme_id, tax_rate, rent in [('A', self.statement_gen.tax_rate, self.statement_gen.expense_ratios['rent']),
+                                       ('B', 0.3, 0.1)]:
+            single = FinancialStatementGenerator()
+            single.tax_rate = tax_rate
+            single.expense_ratios = {**single.expense_ratios, 'rent': rent}
+            expected = single.generate_monthly_financials(portfolio_sales[portfolio_sales['sme_id'] == sme_id])
+            
+            tenant = result[result['sme_id'] == sme_id].drop(columns='sme_id').reset_index(drop=True)
+            pd.testing.assert_frame_equal(tenant, expected)
+    
+    def test_portfolio_rejects_unknown_parameters(self):
+        """Test tenant parameter tables are checked against the P&L parameters"""
+        sales = self.sample_sales.assign(sme_id=1)
+        with self.assertRaises(ValueError):
+            self.statement_gen.generate_portfolio_financials(sales, pd.DataFrame({'vat_rate': [0.2]}, index=[1]))
+    
+    def test_monthly_financials_from_chunks(self):
+        """Test that chunked aggregation matches the in-memory statement"""
+        expected = self.statement_gen.generate_monthly_financials(self.sample_sales)
+        
+        # Split a period across two chunks to exercise partial-sum merging
+        chunks = [self.sample_sales.iloc[:5], self.sample_sales.iloc[4:5], self.sample_sales.iloc[5:]]
+        chunks[1] = chunks[1].assign(revenue=0.0, cogs=0.0, gross_profit=0.0, Quantity=0)
+        result = self.statement_gen.generate_monthly_financials_from_chunks(iter(chunks))
+        
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    
     def test_financial_summary(self):
         """Test financial summary generation"""
         monthly = self.statement_gen.generate_monthly_financials(self.sample_sales)
@@ -0,0 +1,98 @@
+"""
+Unit Tests for Validation Rule Module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import pandas as pd
+import numpy as np
+from src.data_processing.cleaner import DataCleaner
+from src.data_processing.validation import RuleEngine, ValidationRule, financial_rule_engine
+
+
+class TestRuleEngine(unittest.TestCase):
+    """Test compiled validation rules"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Order Date': pd.to_datetime(['2020-01-01', None, '2020-01-03', '2020-01-04']),
+            'revenue': [100.0, -5.0, 50.0, np.nan],
+            'cogs': [40.0, 1.0, 80.0, 10.0],
+            'gross_profit': [60.0, -6.0, 10.0, 0.0],
+        }, index=[10, 11, 12, 13])
+
+    def test_masks_and_offending_rows(self):
+        """Test each rule reports a mask and the offending index labels"""
+        result = financial_rule_engine().validate(self.df)
+
+        self.assertEqual(result.counts, {
+            'negative_revenue': 1,
+            'cogs_exceeds_revenue': 2,
+            'gross_profit_mismatch': 1,
+            'invalid_dates': 1,
+        })
+        self.assertEqual(list(result.offending_rows['cogs_exceeds_revenue']), [11, 12])
+        self.assertEqual(list(result.offending_rows['gross_profit_mismatch']), [12])
+        self.assertEqual(result.invalid_mask.tolist(), [False, True, True, False])
+
+    def test_rules_skipped_without_columns(self):
+        """Test rules that reference absent columns are not evaluated"""
+        result = financial_rule_engine().validate(self.df[['revenue']])
+        self.assertEqual(list(result.masks), ['negative_revenue'])
+
+    def test_callable_rule_and_quarantine(self):
+        """Test callable rules and splitting off failing rows"""
+        engine = RuleEngine([
+            ValidationRule('positive_cogs', 'cogs > 0', "{count} rows with non-positive COGS"),
+            ValidationRule('small_orders', lambda df: df['revenue'].fillna(0) < 90,
+                           "{count} large orders", columns=['revenue']),
+        ])
+        valid, quarantined = engine.validate(self.df).quarantine(self.df)
+
+        self.assertEqual(list(valid.index), [11, 12, 13])
+        self.assertEqual(quarantined['failed_rules'].tolist(), ['small_orders'])
+
+    def test_chunk_results_merge(self):
+        """Test chunked validation gives the same masks as one pass"""
+        engine = financial_rule_engine()
+        results = [result for _, result in engine.validate_chunks([self.df.iloc[:2], self.df.iloc[2:]])]
+        merged = results[0].merge(results[1])
+
+        self.assertEqual(merged.counts, engine.validate(self.df).counts)
+        self.assertEqual(list(merged.index), list(self.df.index))
+
+    def test_chained_comparison(self):
+        """Test "a <= b <= c" is checked row by row"""
+        rule = ValidationRule('margin_range', '0 <= gross_profit <= revenue', "{count} rows out of range")
+        result = RuleEngine([rule]).validate(self.df)
+
+        self.assertEqual(rule.expression, '(0 <= gross_profit) & (gross_profit <= revenue)')
+        self.assertEqual(list(result.offending_rows['margin_range']), [11])
+
+    def test_unsafe_expression_rejected(self):
+        """Test expressions are limited to arithmetic over columns"""
+        with self.assertRaises(ValueError):
+            ValidationRule('bad', "__import__('os').getcwd()", "{count}")
+        with self.assertRaises(ValueError):
+            ValidationRule('bad', "revenue.max() > 0", "{count}")
+
+    def test_validate_financial_data_messages(self):
+        """Test the cleaner keeps its validation messages"""
+        is_valid, issues = DataCleaner().validate_financial_data(self.df)
+
+        self.assertFalse(is_valid)
+        self.assertEqual(issues, [
+            "1 rows with negative revenue",
+            "2 rows where COGS > Revenue",
+            "1 rows with gross profit calculation mismatch",
+            "1 rows with invalid dates",
+        ])
+
+
+if __name__ == '__main__':
+    print("Running Validation Tests...")
+    print("="*60)
+    unittest.main(verbosity=2)